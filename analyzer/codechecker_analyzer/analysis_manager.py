@@ -20,7 +20,7 @@ import time
 import traceback
 import zipfile
 
-from threading import Timer
+from threading import Event, Thread, Timer
 
 import psutil
 
@@ -31,7 +31,7 @@ from codechecker_common.logger import get_logger
 from codechecker_statistics_collector.collectors.special_return_value import \
     SpecialReturnValueCollector
 
-from . import gcc_toolchain
+from . import analysis_scheduler, gcc_toolchain, incremental
 
 from .analyzers import analyzer_types
 from .analyzers.config_handler import CheckerState
@@ -60,13 +60,44 @@ def print_analyzer_statistic_summary(metadata_analyzers, status, msg=None):
             LOG.info("  %s: %s", analyzer_type, res)
 
 
+def print_tu_statistic_summary(metadata_analyzers, top_n=5):
+    """
+    Print the translation units of which the analysis took the longest time
+    and used the most memory.
+    """
+    tu_statistics = []
+    for analyzer_type, analyzer in metadata_analyzers.items():
+        for source, stats in analyzer.get('tu_statistics', {}).items():
+            if 'wall_time' in stats:
+                tu_statistics.append((analyzer_type, source, stats))
+
+    if not tu_statistics:
+        return
+
+    LOG.info("Slowest analyses (wall time, user/sys CPU time):")
+    for analyzer_type, source, stats in sorted(
+            tu_statistics, key=lambda s: s[2]['wall_time'],
+            reverse=True)[:top_n]:
+        LOG.info("  %s: %s (%.2fs, %.2fs/%.2fs)", analyzer_type, source,
+                 stats['wall_time'], stats.get('user_time', 0),
+                 stats.get('sys_time', 0))
+
+    LOG.info("Analyses with the highest memory usage (max RSS):")
+    for analyzer_type, source, stats in sorted(
+            tu_statistics, key=lambda s: s[2].get('max_rss', 0),
+            reverse=True)[:top_n]:
+        LOG.info("  %s: %s (%d MiB)", analyzer_type, source,
+                 stats.get('max_rss', 0) // 1024)
+
+
 def worker_result_handler(results, metadata_tool, output_path,
                           analyzer_binaries):
     """ Print the analysis summary. """
     skipped_num = 0
     reanalyzed_num = 0
     metadata_analyzers = metadata_tool['analyzers']
-    for res, skipped, reanalyzed, analyzer_type, _, sources in results:
+    for res, skipped, reanalyzed, analyzer_type, _, sources, tu_stats \
+            in results:
         statistics = metadata_analyzers[analyzer_type]['analyzer_statistics']
         if skipped:
             skipped_num += 1
@@ -74,6 +105,10 @@ def worker_result_handler(results, metadata_tool, output_path,
             if reanalyzed:
                 reanalyzed_num += 1
 
+            if tu_stats:
+                metadata_analyzers[analyzer_type]['tu_statistics'] \
+                    .setdefault(sources, {}).update(tu_stats)
+
             if res == 0:
                 statistics['successful'] += 1
             else:
@@ -89,6 +124,8 @@ def worker_result_handler(results, metadata_tool, output_path,
                                      'failed',
                                      'Failed to analyze')
 
+    print_tu_statistic_summary(metadata_analyzers)
+
     if reanalyzed_num:
         LOG.info("Reanalyzed compilation commands: %d", reanalyzed_num)
     if skipped_num:
@@ -116,15 +153,230 @@ def worker_result_handler(results, metadata_tool, output_path,
     metadata_tool['result_source_files'].update(source_map)
 
 
+class MemoryReservation(object):
+    """
+    Memory reserved by a worker process for one analysis. The reservation
+    grows if the analyzer process uses more memory than it was expected.
+    """
+
+    def __init__(self, controller, slot, amount):
+        self.__controller = controller
+        self.slot = slot
+        self.amount = amount
+        self.rss = 0
+
+    def update(self, rss):
+        """ Update the reservation by the current memory usage. """
+        self.__controller.update(self, rss)
+
+    def release(self):
+        """ Give back the reserved memory when the analysis finished. """
+        self.__controller.release(self)
+
+
+class MemoryAdmissionController(object):
+    """
+    Delay starting analyzer processes while the memory usage of the running
+    ones would exceed the memory budget.
+
+    Before an analyzer process is started the expected peak memory usage of
+    it is reserved from the budget. If the reservation does not fit into the
+    budget or the system has no available memory for it, the worker waits
+    until some of the running analyses finish. An analysis is always admitted
+    if nothing else is running, so a translation unit which needs more memory
+    than the budget is still analyzed alone.
+
+    The reservations are recorded with the PID of the worker process which
+    made them. The reservations of the workers which were killed before they
+    could release them (e.g. by the OOM killer) are reclaimed by the waiting
+    workers. An analysis which waits longer than MAX_WAIT seconds is admitted
+    anyway, so a lost reservation can not stop the analysis.
+
+    The state is shared between the worker processes of the pool so it should
+    be passed to them on creation.
+    """
+
+    # Seconds between the checks of the memory usage.
+    POLL_INTERVAL = 0.5
+
+    # Seconds after an analysis is admitted even if it does not fit into the
+    # memory budget.
+    MAX_WAIT = 3600
+
+    # Number of fields of a reservation in the shared table: PID of the
+    # worker, reserved amount and the memory used by the analysis.
+    SLOT_FIELDS = 3
+
+    def __init__(self, budget, max_reservations=64):
+        self.budget = budget
+
+        self.__lock = multiprocessing.Lock()
+
+        # Reservations of the running analyses. A reservation slot is free
+        # if its PID is 0. The reserved memory which is not used yet by an
+        # analysis decreases the available system memory, because it will be
+        # allocated by the already running analysis.
+        self.__slots = multiprocessing.Array(
+            'q', max_reservations * self.SLOT_FIELDS, lock=False)
+
+    def __reservations(self):
+        """ Yield the slot, PID, amount and usage of the reservations. """
+        for slot in range(0, len(self.__slots), self.SLOT_FIELDS):
+            pid = self.__slots[slot]
+            if pid:
+                yield slot, pid, self.__slots[slot + 1], \
+                    self.__slots[slot + 2]
+
+    def __reclaim_dead(self):
+        """ Release the reservations of the terminated worker processes. """
+        for slot, pid, amount, _ in list(self.__reservations()):
+            if not psutil.pid_exists(pid):
+                LOG.warning("Worker process %d terminated without releasing "
+                            "its %d MiB memory reservation.", pid,
+                            amount // (1024 * 1024))
+                self.__slots[slot] = 0
+
+    def __can_admit(self, amount):
+        """ Returns True if an analysis with the given need can be started. """
+        reservations = list(self.__reservations())
+        if not reservations:
+            return True
+
+        if sum(r[2] for r in reservations) + amount > self.budget:
+            return False
+
+        pending = sum(r[2] - r[3] for r in reservations)
+        available = psutil.virtual_memory().available - pending
+        return available >= amount
+
+    def __reserve(self, amount):
+        """ Record a reservation and return its slot or None if full. """
+        for slot in range(0, len(self.__slots), self.SLOT_FIELDS):
+            if not self.__slots[slot]:
+                self.__slots[slot] = os.getpid()
+                self.__slots[slot + 1] = amount
+                self.__slots[slot + 2] = 0
+                return slot
+
+        return None
+
+    def acquire(self, amount):
+        """
+        Wait until the given amount of memory (in bytes) can be reserved and
+        return the reservation.
+        """
+        amount = min(amount, self.budget)
+
+        waiting_since = time.time()
+        waited = False
+        while True:
+            with self.__lock:
+                self.__reclaim_dead()
+
+                timed_out = time.time() - waiting_since > self.MAX_WAIT
+                if timed_out or self.__can_admit(amount):
+                    slot = self.__reserve(amount)
+                    if slot is not None:
+                        break
+
+            if timed_out:
+                # Every reservation slot is used by a running worker.
+                slot = None
+                break
+
+            if not waited:
+                waited = True
+                LOG.debug("Waiting for %d MiB memory to start the analysis.",
+                          amount // (1024 * 1024))
+
+            time.sleep(self.POLL_INTERVAL)
+
+        if timed_out:
+            LOG.warning("Analysis is started after waiting %d seconds for "
+                        "%d MiB memory, although it does not fit into the "
+                        "memory budget.", self.MAX_WAIT,
+                        amount // (1024 * 1024))
+        elif waited:
+            LOG.debug("Analysis was delayed by %.2f seconds due to the "
+                      "memory budget.", time.time() - waiting_since)
+
+        return MemoryReservation(self, slot, amount if slot is not None
+                                 else 0)
+
+    def update(self, reservation, rss):
+        """
+        Update the reservation by the current memory usage of the analyzer
+        process. If it exceeds the expected usage the reservation grows.
+        """
+        if reservation.slot is None:
+            return
+
+        with self.__lock:
+            reservation.rss = max(rss, reservation.rss)
+            reservation.amount = max(reservation.rss, reservation.amount)
+
+            self.__slots[reservation.slot + 1] = reservation.amount
+            self.__slots[reservation.slot + 2] = reservation.rss
+
+    def release(self, reservation):
+        """ Release the memory of a finished analysis. """
+        if reservation.slot is not None:
+            with self.__lock:
+                self.__slots[reservation.slot] = 0
+
+        reservation.slot = None
+        reservation.amount = 0
+        reservation.rss = 0
+
+    def watch_process(self, proc, reservation):
+        """
+        Update the reservation periodically by the memory usage of the given
+        process and its children until the process terminates.
+
+        Returns a function which stops the watching.
+        """
+        stop = Event()
+
+        def __watch():
+            try:
+                process = psutil.Process(proc.pid)
+                while not stop.wait(self.POLL_INTERVAL):
+                    rss = process.memory_info().rss
+                    for child in process.children(recursive=True):
+                        try:
+                            rss += child.memory_info().rss
+                        except psutil.Error:
+                            pass
+
+                    reservation.update(rss)
+            except psutil.Error:
+                # The process has already terminated.
+                pass
+
+        watcher = Thread(target=__watch)
+        watcher.daemon = True
+        watcher.start()
+
+        def __stop():
+            stop.set()
+            watcher.join()
+
+        return __stop
+
+
 # Progress reporting.
 progress_checked_num = None
 progress_actions = None
 
+# Memory admission control of the analyzer processes.
+memory_admission = None
+
 
-def init_worker(checked_num, action_num):
-    global progress_checked_num, progress_actions
+def init_worker(checked_num, action_num, memory_controller=None):
+    global progress_checked_num, progress_actions, memory_admission
     progress_checked_num = checked_num
     progress_actions = action_num
+    memory_admission = memory_controller
 
 
 def save_output(base_file_name, out, err):
@@ -220,13 +472,11 @@ def prepare_check(action, analyzer_config, output_dir, severity_map,
     return source_analyzer, rh
 
 
-def handle_success(rh, result_file, result_base, skip_handler,
-                   capture_analysis_output, success_dir):
+def handle_success(rh, result_file, result_base, capture_analysis_output,
+                   success_dir):
     """
     Result postprocessing is required if the analysis was
     successful (mainly clang tidy output conversion is done).
-
-    Skipping reports for header files is done here too.
     """
     if capture_analysis_output:
         save_output(os.path.join(success_dir, result_base),
@@ -238,11 +488,20 @@ def handle_success(rh, result_file, result_base, skip_handler,
     save_metadata(result_file, rh.analyzer_result_file,
                   rh.analyzed_source_file)
 
-    if skip_handler:
-        # We need to check the plist content because skipping
-        # reports in headers can be done only this way.
-        plist_parser.skip_report_from_plist(result_file,
-                                            skip_handler)
+
+def postprocess_result_file(rh, result_file, skip_handler):
+    """
+    Apply the skipping of reports in header files and the report hash
+    changes on the result file in a single pass and write the summary of the
+    reports next to it, so the result file is parsed only once here.
+    """
+    if rh.analyzer_result_plist is None and not os.path.exists(result_file):
+        return
+
+    plist_parser.postprocess_plist(result_file,
+                                   skip_handler,
+                                   rh.result_hash_type,
+                                   rh.analyzer_result_plist)
 
 
 def handle_failure(source_analyzer, rh, zip_file, result_base, actions_map):
@@ -479,11 +738,16 @@ def check(check_data):
         output_dir, skip_handler, quiet_output_on_stdout, \
         capture_analysis_output, analysis_timeout, \
         analyzer_environment, ctu_reanalyze_on_failure, \
-        output_dirs, statistics_data = check_data
+        output_dirs, statistics_data, memory_estimate = check_data
 
     failed_dir = output_dirs["failed"]
     success_dir = output_dirs["success"]
 
+    # The memory usage of the running analyzer process is watched to grow
+    # the memory reservation if it was underestimated.
+    reservation = None
+    memory_watch_stop = [lambda: None]
+
     try:
         # If one analysis fails the check fails.
         return_codes = 0
@@ -503,6 +767,33 @@ def check(check_data):
         # Construct the analyzer cmd.
         analyzer_cmd = source_analyzer.construct_analyzer_cmd(rh)
 
+        manifest_dir = output_dirs.get('incremental')
+        if manifest_dir:
+            result_file = rh.analyzer_result_file.replace(r'\ ', ' ')
+            manifest_file = incremental.get_manifest_file(manifest_dir,
+                                                          result_file)
+            config_hash = incremental.get_config_hash(analyzer_cmd,
+                                                      rh.report_hash_type,
+                                                      skip_handler)
+
+            if incremental.is_up_to_date(manifest_file, config_hash,
+                                         result_file):
+                LOG.info("[%d/%d] %s analysis of %s is up to date.",
+                         progress_checked_num.value, progress_actions.value,
+                         action.analyzer_type,
+                         os.path.basename(action.source))
+                progress_checked_num.value += 1
+
+                return 0, True, False, action.analyzer_type, \
+                    result_file, action.source, None
+
+            manifest = incremental.collect_manifest(config_hash, action)
+
+        # Wait until the expected memory usage of the analysis fits into the
+        # memory budget.
+        if memory_admission:
+            reservation = memory_admission.acquire(memory_estimate)
+
         # The analyzer invocation calls __create_timeout as a callback
         # when the analyzer starts. This callback creates the timeout
         # watcher over the analyzer process, which in turn returns a
@@ -529,11 +820,22 @@ def check(check_data):
                 # shouldn't do anything.
                 pass
 
+        def __watch_memory(analyzer_process):
+            if reservation:
+                memory_watch_stop[0] = memory_admission.watch_process(
+                    analyzer_process, reservation)
+
+        def __start_analysis(analyzer_process):
+            __create_timeout(analyzer_process)
+            __watch_memory(analyzer_process)
+
         result_file_exists = os.path.exists(rh.analyzer_result_file)
 
         # Fills up the result handler with the analyzer information.
         source_analyzer.analyze(analyzer_cmd, rh, analyzer_environment,
-                                __create_timeout)
+                                __start_analysis)
+        memory_watch_stop[0]()
+        tu_stats = rh.analyzer_resource_usage
 
         # If execution reaches this line, the analyzer process has quit.
         if timeout_cleanup[0]():
@@ -583,8 +885,7 @@ def check(check_data):
 
         if rh.analyzer_returncode == 0:
             handle_success(rh, result_file, result_base,
-                           skip_handler, capture_analysis_output,
-                           success_dir)
+                           capture_analysis_output, success_dir)
             LOG.info("[%d/%d] %s analyzed %s successfully.",
                      progress_checked_num.value, progress_actions.value,
                      action.analyzer_type, source_file_name)
@@ -622,13 +923,14 @@ def check(check_data):
                 # the analyzer information.
                 source_analyzer.analyze(analyzer_cmd,
                                         rh,
-                                        analyzer_environment)
+                                        analyzer_environment,
+                                        __watch_memory)
+                memory_watch_stop[0]()
 
                 return_codes = rh.analyzer_returncode
                 if rh.analyzer_returncode == 0:
                     handle_success(rh, result_file, result_base,
-                                   skip_handler, capture_analysis_output,
-                                   success_dir)
+                                   capture_analysis_output, success_dir)
 
                     LOG.info("[%d/%d] %s analyzed %s without"
                              " CTU successfully.",
@@ -651,15 +953,19 @@ def check(check_data):
                     handle_failure(source_analyzer, rh, zip_file,
                                    result_base, actions_map)
 
+        # We need to check the plist content because skipping
+        # reports in headers can be done only this way.
+        postprocess_result_file(rh, result_file, skip_handler)
+
+        if manifest_dir:
+            if rh.analyzer_returncode == 0:
+                incremental.write_manifest(manifest_file, manifest)
+            else:
+                incremental.remove_manifest(manifest_file)
+
         collect_ctu_involved_files(rh, source_analyzer,
                                    output_dirs['ctu_connections'])
 
-        if skip_handler and os.path.exists(result_file):
-            # We need to check the plist content because skipping
-            # reports in headers can be done only this way.
-            plist_parser.skip_report_from_plist(result_file,
-                                                skip_handler)
-
         if not quiet_output_on_stdout:
             if rh.analyzer_returncode:
                 LOG.error('\n%s', rh.analyzer_stdout)
@@ -671,13 +977,17 @@ def check(check_data):
         progress_checked_num.value += 1
 
         return return_codes, False, reanalyzed, action.analyzer_type, \
-            result_file, action.source
+            result_file, action.source, tu_stats
 
     except Exception as e:
         LOG.debug_analyzer(str(e))
         traceback.print_exc(file=sys.stdout)
         return 1, False, reanalyzed, action.analyzer_type, None, \
-            action.source
+            action.source, None
+    finally:
+        memory_watch_stop[0]()
+        if reservation:
+            reservation.release()
 
 
 def skip_cpp(compile_actions, skip_handler):
@@ -705,10 +1015,18 @@ def start_workers(actions_map, actions, context, analyzer_config_map,
                   jobs, output_path, skip_handler, metadata_tool,
                   quiet_analyze, capture_analysis_output, timeout,
                   ctu_reanalyze_on_failure, statistics_data, manager,
-                  compile_cmd_count):
+                  compile_cmd_count, incremental_analysis=False,
+                  max_memory=None):
     """
     Start the workers in the process pool.
     For every build action there is worker which makes the analysis.
+
+    If incremental_analysis is True only those build actions are analyzed
+    of which the configuration or any file of the translation unit changed
+    since the last successful analysis.
+
+    If max_memory is given (in bytes) the analyzer processes are started only
+    if their expected memory usage fits into this budget.
     """
 
     # Handle SIGINT to stop this script running.
@@ -721,13 +1039,36 @@ def start_workers(actions_map, actions, context, analyzer_config_map,
 
     signal.signal(signal.SIGINT, signal_handler)
     actions, skipped_actions = skip_cpp(actions, skip_handler)
+
+    # Start the analysis of the most expensive translation units first based
+    # on the analysis times recorded by the previous analysis.
+    tu_statistics = analysis_scheduler.load_tu_statistics(
+        os.path.join(output_path, 'metadata.json'))
+    actions = analysis_scheduler.order_by_predicted_cost(actions,
+                                                         tu_statistics)
+
+    # The peak memory usage of the analyses recorded by the previous
+    # analysis is reserved from the memory budget. Without any recorded
+    # value the budget is shared equally by the workers.
+    memory_controller = None
+    memory_estimates = [None] * len(actions)
+    if max_memory:
+        memory_controller = MemoryAdmissionController(max_memory,
+                                                      max(jobs, 1))
+        memory_estimates = analysis_scheduler.get_predicted_memory(
+            actions, tu_statistics, max_memory // max(jobs, 1))
+
+        LOG.info("Analyzer processes are started within a memory budget "
+                 "of %d MiB.", max_memory // (1024 * 1024))
+
     # Start checking parallel.
     checked_var = multiprocessing.Value('i', 1)
     actions_num = multiprocessing.Value('i', len(actions))
     pool = multiprocessing.Pool(jobs,
                                 initializer=init_worker,
                                 initargs=(checked_var,
-                                          actions_num))
+                                          actions_num,
+                                          memory_controller))
 
     # If the analysis has failed, we help debugging.
     failed_dir = os.path.join(output_path, "failed")
@@ -746,7 +1087,15 @@ def start_workers(actions_map, actions, context, analyzer_config_map,
 
     output_dirs = {'success': success_dir,
                    'failed': failed_dir,
-                   'ctu_connections': ctu_connections_dir}
+                   'ctu_connections': ctu_connections_dir,
+                   'incremental': None}
+
+    # Manifests of the translation units for incremental analysis.
+    if incremental_analysis:
+        manifest_dir = os.path.join(output_path, "incremental")
+        if not os.path.exists(manifest_dir):
+            os.makedirs(manifest_dir)
+        output_dirs['incremental'] = manifest_dir
 
     # Construct analyzer env.
     analyzer_environment = env.extend(context.path_env_extra,
@@ -764,8 +1113,10 @@ def start_workers(actions_map, actions, context, analyzer_config_map,
                          analyzer_environment,
                          ctu_reanalyze_on_failure,
                          output_dirs,
-                         statistics_data)
-                        for build_action in actions]
+                         statistics_data,
+                         memory_estimate)
+                        for build_action, memory_estimate
+                        in zip(actions, memory_estimates)]
 
     if analyzed_actions:
         try:
@@ -778,15 +1129,22 @@ def start_workers(actions_map, actions, context, analyzer_config_map,
 
             # FIXME: Ensure all shared data structures are wrapped in manager
             #        proxy objects before passing them to other processes via
-            #        map_async.
+            #        imap_unordered.
             #        Note that even deep-copying is known to be insufficient.
-            pool.map_async(check,
-                           analyzed_actions,
-                           1,
-                           callback=lambda results: worker_result_handler(
-                               results, metadata_tool, output_path,
-                               context.analyzer_binaries)
-                           ).get(31557600)
+
+            # The actions are handed out one by one to the worker which
+            # becomes idle first, so a few long analyses can not hold back
+            # the queue of a single worker.
+            results = []
+            result_it = pool.imap_unordered(check, analyzed_actions, 1)
+            while True:
+                try:
+                    results.append(result_it.next(31557600))
+                except StopIteration:
+                    break
+
+            worker_result_handler(results, metadata_tool, output_path,
+                                  context.analyzer_binaries)
 
             pool.close()
         except Exception:
@@ -0,0 +1,183 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Order the build actions by their predicted analysis time.
+
+If a long analysis is started at the end of the analysis most of the workers
+are idle while it is running. Starting the most expensive translation units
+first lets the cheap ones fill up the gaps at the end, so the wall clock time
+of the analysis gets close to the total CPU time divided by the number of
+jobs.
+
+The same prediction is used to balance the build actions between the shards
+of an analysis which is distributed to multiple machines.
+"""
+
+
+import os
+
+from codechecker_common.util import load_json_or_empty
+
+
+def load_tu_statistics(metadata_file):
+    """
+    Load the per translation unit statistics of a previous analysis from the
+    given metadata file.
+
+    Returns a dict where the key is a pair of the analyzer name and the
+    analyzed source file and the value is the statistics dict of this
+    analysis.
+    """
+    if not os.path.exists(metadata_file):
+        return {}
+
+    metadata = load_json_or_empty(metadata_file, {})
+
+    tu_statistics = {}
+    for tool in metadata.get('tools', []):
+        for analyzer_type, analyzer in tool.get('analyzers', {}).items():
+            for source, stats in analyzer.get('tu_statistics', {}).items():
+                tu_statistics[(analyzer_type, source)] = stats
+
+    return tu_statistics
+
+
+def __get_source_size(source):
+    """ Get the size of the source file or 0 if it is not available. """
+    try:
+        return os.path.getsize(source)
+    except OSError:
+        return 0
+
+
+def get_predicted_costs(actions, tu_statistics):
+    """
+    Predict the analysis time of the given build actions.
+
+    The analysis time recorded by the previous analysis is used if it is
+    available. For the other actions the analysis time is estimated from the
+    size of the source file. The size is converted to seconds by the median
+    analysis speed of the actions with known analysis time, so the recorded
+    and estimated values are comparable.
+
+    Returns a list of predicted costs in the same order as the actions.
+    """
+    durations = []
+    for action in actions:
+        stats = tu_statistics.get((action.analyzer_type, action.source), {})
+        durations.append(stats.get('wall_time'))
+
+    return __predict_costs(actions, durations)
+
+
+def get_predicted_tu_costs(actions, tu_statistics):
+    """
+    Predict the time of all the analyses of the given build actions.
+
+    Unlike get_predicted_costs() the actions are not bound to an analyzer,
+    so the recorded analysis times of every analyzer are summed up for the
+    source file of the action.
+
+    Returns a list of predicted costs in the same order as the actions.
+    """
+    source_durations = {}
+    for (_, source), stats in tu_statistics.items():
+        if stats.get('wall_time') is not None:
+            source_durations[source] = \
+                source_durations.get(source, 0) + stats['wall_time']
+
+    return __predict_costs(actions,
+                           [source_durations.get(action.source)
+                            for action in actions])
+
+
+def __predict_costs(actions, durations):
+    """
+    Complete the given recorded analysis times of the actions where it is
+    None by an estimation from the size of the source file.
+    """
+    sizes = [__get_source_size(action.source) for action in actions]
+
+    speeds = sorted(duration / size for duration, size
+                    in zip(durations, sizes) if duration and size)
+
+    # If there is no recorded analysis time the sizes are compared only.
+    seconds_per_byte = speeds[len(speeds) // 2] if speeds else 1
+
+    return [duration if duration is not None else size * seconds_per_byte
+            for duration, size in zip(durations, sizes)]
+
+
+def partition_by_predicted_cost(actions, shard_count, tu_statistics):
+    """
+    Partition the build actions into the given number of shards so the
+    predicted analysis time of the shards is balanced.
+
+    The most expensive action is always assigned to the shard with the
+    lowest total cost so far. The result depends only on the actions and the
+    statistics, so every machine computes the same partition from the same
+    compilation database.
+
+    Returns a list of shards, each of them is a list of actions in their
+    original order.
+    """
+    costs = get_predicted_tu_costs(actions, tu_statistics)
+
+    # The order of actions with the same cost must not depend on the order
+    # of the compilation database entries.
+    order = sorted(range(len(actions)),
+                   key=lambda i: (-costs[i], actions[i].source,
+                                  actions[i].directory,
+                                  actions[i].original_command))
+
+    loads = [0] * shard_count
+    shards = [[] for _ in range(shard_count)]
+    for i in order:
+        shard = min(range(shard_count), key=lambda s: (loads[s], s))
+        shards[shard].append(i)
+        loads[shard] += costs[i]
+
+    return [[actions[i] for i in sorted(shard)] for shard in shards]
+
+
+def order_by_predicted_cost(actions, tu_statistics):
+    """
+    Return the build actions ordered by their predicted analysis time, the
+    most expensive first. Actions with the same predicted cost keep their
+    original order.
+    """
+    costs = get_predicted_costs(actions, tu_statistics)
+
+    return [action for _, action in
+            sorted(zip(costs, actions), key=lambda c: c[0], reverse=True)]
+
+
+def get_predicted_memory(actions, tu_statistics, default):
+    """
+    Predict the peak memory usage (in bytes) of the analysis of the given
+    build actions.
+
+    The peak memory usage recorded by the previous analysis is used if it is
+    available. For the other actions the median of the recorded values is
+    used, or the given default if no peak memory usage was recorded.
+
+    Returns a list of predicted memory usages in the same order as the
+    actions.
+    """
+    # The maximum resident set size is recorded in KiB.
+    peaks = []
+    for action in actions:
+        stats = tu_statistics.get((action.analyzer_type, action.source), {})
+        max_rss = stats.get('max_rss')
+        peaks.append(max_rss * 1024 if max_rss else None)
+
+    known_peaks = sorted(peak for peak in peaks if peak)
+    if known_peaks:
+        default = known_peaks[len(known_peaks) // 2]
+
+    return [peak if peak else default for peak in peaks]
@@ -29,6 +29,7 @@ from codechecker_statistics_collector.collectors.return_value import \
 from . import analysis_manager, pre_analysis_manager, env, checkers
 from .analyzers import analyzer_types
 from .analyzers.config_handler import CheckerState
+from .analyzers.clangsa import ctu_manager
 from .analyzers.clangsa.analyzer import ClangSA
 
 from .makefile import MakeFileCreator
@@ -156,7 +157,8 @@ def __get_ctu_data(config_map, ctu_dir):
     return {'ctu_dir': ctu_dir,
             'ctu_func_map_cmd': ctu_capability.mapping_tool_path,
             'ctu_func_map_file': ctu_capability.mapping_file_name,
-            'ctu_temp_fnmap_folder': 'tmpExternalFnMaps'}
+            'ctu_func_map_from_ast': ctu_capability.mapping_tool_reads_ast,
+            'ctu_temp_fnmap_folder': ctu_manager.TEMP_FNMAP_FOLDER}
 
 
 def perform_analysis(args, skip_handler, context, actions, metadata_tool,
@@ -182,8 +184,13 @@ def perform_analysis(args, skip_handler, context, actions, metadata_tool,
     ctu_collect = False
     ctu_analyze = False
     ctu_dir = ''
+
+    # The CTU-dir given by the user is cleared by the analyze command before
+    # the analysis if needed and it is kept after the analysis.
+    user_ctu_dir = 'ctu_dir' in args
     if 'ctu_phases' in args:
-        ctu_dir = os.path.join(args.output_path, 'ctu-dir')
+        ctu_dir = args.ctu_dir if 'ctu_dir' in args \
+            else os.path.join(args.output_path, 'ctu-dir')
         args.ctu_dir = ctu_dir
         if ClangSA.ANALYZER_NAME not in analyzers:
             LOG.error("CTU can only be used with the clang static analyzer.")
@@ -251,7 +258,8 @@ def perform_analysis(args, skip_handler, context, actions, metadata_tool,
                 "failed": 0,
                 "failed_sources": [],
                 "successful": 0,
-                "version": None}}
+                "version": None},
+            'tu_statistics': {}}
 
         for check, data in config_map[analyzer].checks().items():
             state, _ = data
@@ -282,7 +290,7 @@ def perform_analysis(args, skip_handler, context, actions, metadata_tool,
         makefile_creator.create(actions)
         return
 
-    if ctu_collect:
+    if ctu_collect and not user_ctu_dir:
         shutil.rmtree(ctu_dir, ignore_errors=True)
     elif ctu_analyze and not os.path.exists(ctu_dir):
         LOG.error("CTU directory: '%s' does not exist.", ctu_dir)
@@ -306,7 +314,14 @@ def perform_analysis(args, skip_handler, context, actions, metadata_tool,
     if ctu_collect or statistics_data:
         ctu_data = None
         if ctu_collect or ctu_analyze:
-            ctu_data = manager.dict(__get_ctu_data(config_map, ctu_dir))
+            ctu_data = __get_ctu_data(config_map, ctu_dir)
+
+            # The function maps of the shards are merged by the
+            # "CodeChecker merge" command, because a function defined in
+            # multiple shards should be left out from the merged map.
+            ctu_data['ctu_keep_temp_fnmap'] = 'shard' in args
+
+            ctu_data = manager.dict(ctu_data)
 
         pre_analyze = [a for a in actions
                        if a.analyzer_type == ClangSA.ANALYZER_NAME]
@@ -321,14 +336,21 @@ def perform_analysis(args, skip_handler, context, actions, metadata_tool,
         clangsa_config = config_map.get(ClangSA.ANALYZER_NAME)
 
         if clangsa_config is not None:
-            pre_analysis_manager.run_pre_analysis(pre_analyze,
-                                                  context,
-                                                  clangsa_config,
-                                                  args.jobs,
-                                                  pre_anal_skip_handler,
-                                                  ctu_data,
-                                                  statistics_data,
-                                                  manager)
+            pre_analysis_statistics = pre_analysis_manager.run_pre_analysis(
+                pre_analyze,
+                context,
+                clangsa_config,
+                args.jobs,
+                pre_anal_skip_handler,
+                ctu_data,
+                statistics_data,
+                manager)
+
+            tu_statistics = \
+                metadata_tool['analyzers'][ClangSA.ANALYZER_NAME][
+                    'tu_statistics']
+            for source, stats in pre_analysis_statistics.items():
+                tu_statistics.setdefault(source, {})['pre_analysis'] = stats
         else:
             LOG.error("Can not run pre analysis without clang "
                       "static analyzer configuration.")
@@ -339,6 +361,15 @@ def perform_analysis(args, skip_handler, context, actions, metadata_tool,
     if 'stats_dir' in args and args.stats_dir:
         statistics_data = manager.dict({'stats_out_dir': args.stats_dir})
 
+    # The result of a CTU or statistical analysis depends on other
+    # translation units too, so they can not be analyzed incrementally.
+    incremental_analysis = 'incremental' in args
+    if incremental_analysis and (ctu_analyze or statistics_data):
+        LOG.warning("Incremental analysis is not supported in case of CTU "
+                    "or statistical analysis, all the translation units "
+                    "will be analyzed.")
+        incremental_analysis = False
+
     if ctu_analyze or statistics_data or (not ctu_analyze and not ctu_collect):
 
         LOG.info("Starting static analysis ...")
@@ -354,7 +385,10 @@ def perform_analysis(args, skip_handler, context, actions, metadata_tool,
                                        ctu_reanalyze_on_failure,
                                        statistics_data,
                                        manager,
-                                       compile_cmd_count)
+                                       compile_cmd_count,
+                                       incremental_analysis,
+                                       args.max_memory if 'max_memory' in args
+                                       else None)
         LOG.info("Analysis finished.")
         LOG.info("To view results in the terminal use the "
                  "\"CodeChecker parse\" command.")
@@ -369,7 +403,7 @@ def perform_analysis(args, skip_handler, context, actions, metadata_tool,
     metadata_tool['timestamps'] = {'begin': start_time,
                                    'end': end_time}
 
-    if ctu_collect and ctu_analyze:
+    if ctu_collect and ctu_analyze and not user_ctu_dir:
         shutil.rmtree(ctu_dir, ignore_errors=True)
 
     manager.shutdown()
@@ -15,6 +15,8 @@ import os
 import signal
 import subprocess
 import sys
+import threading
+import time
 
 from codechecker_common.logger import get_logger
 
@@ -86,14 +88,16 @@ class SourceAnalyzer(object, metaclass=ABCMeta):
 
         res_handler.analyzer_cmd = analyzer_cmd
         try:
-            ret_code, stdout, stderr \
-                = SourceAnalyzer.run_proc(analyzer_cmd,
-                                          env,
-                                          res_handler.buildaction.directory,
-                                          proc_callback)
+            ret_code, stdout, stderr, resource_usage \
+                = SourceAnalyzer.run_proc_with_resource_usage(
+                    analyzer_cmd,
+                    env,
+                    res_handler.buildaction.directory,
+                    proc_callback)
             res_handler.analyzer_returncode = ret_code
             res_handler.analyzer_stdout = stdout
             res_handler.analyzer_stderr = stderr
+            res_handler.analyzer_resource_usage = resource_usage
             return res_handler
 
         except Exception as ex:
@@ -114,6 +118,24 @@ class SourceAnalyzer(object, metaclass=ABCMeta):
         Just run the given command and return the return code
         and the stdout and stderr outputs of the process.
         """
+        ret_code, stdout, stderr, _ = \
+            SourceAnalyzer.run_proc_with_resource_usage(command, env, cwd,
+                                                        proc_callback)
+        return ret_code, stdout, stderr
+
+    @staticmethod
+    def run_proc_with_resource_usage(command, env=None, cwd=None,
+                                     proc_callback=None):
+        """
+        Run the given command and return the return code, the stdout and
+        stderr outputs and the resource usage of the process.
+
+        The resource usage is a dict with the wall clock time, the user and
+        system CPU time in seconds and the maximum resident set size of the
+        process in kilobytes. The process is waited for by os.wait4(), so
+        the resource usage belongs to this process only and not to the
+        previously finished children of the current process.
+        """
 
         def signal_handler(signum, frame):
             # Clang does not kill its child processes, so I have to.
@@ -137,9 +159,44 @@ class SourceAnalyzer(object, metaclass=ABCMeta):
             encoding="utf-8",
             errors="ignore")
 
+        start_time = time.time()
+
         # Send the created analyzer process' object if somebody wanted it.
         if proc_callback:
             proc_callback(proc)
 
-        stdout, stderr = proc.communicate()
-        return proc.returncode, stdout, stderr
+        # The outputs are read on separate threads to avoid deadlock if the
+        # process fills up one of the pipes while we are reading the other.
+        outputs = {}
+
+        def read_output(name, stream):
+            outputs[name] = stream.read()
+            stream.close()
+
+        readers = [threading.Thread(target=read_output, args=(name, stream))
+                   for name, stream in [('stdout', proc.stdout),
+                                        ('stderr', proc.stderr)]]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+
+        _, status, rusage = os.wait4(proc.pid, 0)
+
+        if os.WIFSIGNALED(status):
+            proc.returncode = -os.WTERMSIG(status)
+        else:
+            proc.returncode = os.WEXITSTATUS(status)
+
+        # The maximum resident set size is given in bytes on macOS.
+        max_rss = rusage.ru_maxrss
+        if sys.platform == 'darwin':
+            max_rss //= 1024
+
+        resource_usage = {'wall_time': time.time() - start_time,
+                          'user_time': rusage.ru_utime,
+                          'sys_time': rusage.ru_stime,
+                          'max_rss': max_rss}
+
+        return proc.returncode, outputs['stdout'], outputs['stderr'], \
+            resource_usage
@@ -120,6 +120,18 @@ class CTUAutodetection(object):
             return tool_path
         return False
 
+    @property
+    def mapping_tool_reads_ast(self):
+        """
+        Returns True if the mapping tool can collect the function definitions
+        from an AST dump instead of parsing the source file again. Mapping
+        tools of Clang 14 and newer are capable of this.
+        """
+        if not self.analyzer_version_info:
+            return False
+
+        return self.analyzer_version_info.major_version >= 14
+
     @property
     def display_progress(self):
         """
@@ -28,10 +28,38 @@ from . import ctu_triple_arch
 
 LOG = get_logger('analyzer')
 
+# Folder of the function maps of the individual translation units in the
+# directory of a target architecture.
+TEMP_FNMAP_FOLDER = 'tmpExternalFnMaps'
+
+# Files and folders generated by the collect phase of CTU analysis in the
+# directory of a target architecture.
+CTU_DIR_CONTENT = {'externalDefMap.txt', 'externalFnMap.txt',
+                   'invocation-list.yml', 'ast', TEMP_FNMAP_FOLDER}
+
+
+def is_ctu_dir(ctu_dir):
+    """
+    Returns True if the directory is empty or it contains only the files
+    generated by the collect phase of CTU analysis, so it can be cleared
+    safely.
+    """
+    for triple_arch in os.listdir(ctu_dir):
+        triple_path = os.path.join(ctu_dir, triple_arch)
+        if not os.path.isdir(triple_path) or \
+                not set(os.listdir(triple_path)) <= CTU_DIR_CONTENT:
+            return False
+
+    return True
+
 
 def merge_clang_extdef_mappings(ctu_dir, ctu_func_map_file,
-                                ctu_temp_fnmap_folder):
-    """ Merge individual function maps into a global one."""
+                                ctu_temp_fnmap_folder, keep_temp=False):
+    """ Merge individual function maps into a global one.
+
+    If keep_temp is True the individual function maps are not removed, so
+    they can be merged with the function maps of other shards later.
+    """
 
     triple_arches = glob.glob(os.path.join(ctu_dir, '*'))
     for triple_path in triple_arches:
@@ -47,14 +75,20 @@ def merge_clang_extdef_mappings(ctu_dir, ctu_func_map_file,
         merge(fnmap_dir, merged_fn_map)
 
         # Remove all temporary files.
-        shutil.rmtree(fnmap_dir, ignore_errors=True)
+        if not keep_temp:
+            shutil.rmtree(fnmap_dir, ignore_errors=True)
 
 
-def generate_ast_cmd(action, config, triple_arch, source):
-    """ Command to generate AST (or PCH) file. """
+def get_ast_path(config, triple_arch, source):
+    """ Path of the AST dump of the given source file. """
     ast_joined_path = os.path.join(config.ctu_dir, triple_arch, 'ast',
                                    os.path.realpath(source)[1:] + '.ast')
-    ast_path = os.path.abspath(ast_joined_path)
+    return os.path.abspath(ast_joined_path)
+
+
+def generate_ast_cmd(action, config, triple_arch, source):
+    """ Command to generate AST (or PCH) file. """
+    ast_path = get_ast_path(config, triple_arch, source)
     ast_dir = os.path.dirname(ast_path)
 
     cmd = ctu_triple_arch.get_compile_command(action, config, source)
@@ -99,7 +133,8 @@ def generate_invocation_list(triple_arch, action, source, config, env):
 
 def generate_ast(triple_arch, action, source, config, env):
     """ Generates ASTs for the current compilation command. Used during
-    ast-dump based analysis. """
+    ast-dump based analysis. Returns the path of the AST dump (None if the
+    generation failed) and the resource usage of the AST dump. """
 
     cmd, ast_dir = generate_ast_cmd(action, config, triple_arch, source)
 
@@ -111,12 +146,16 @@ def generate_ast(triple_arch, action, source, config, env):
 
     cmdstr = ' '.join(cmd)
     LOG.debug_analyzer("Generating AST using '%s'", cmdstr)
-    ret_code, _, err = \
-        analyzer_base.SourceAnalyzer.run_proc(cmd, env, action.directory)
+    ret_code, _, err, resource_usage = \
+        analyzer_base.SourceAnalyzer.run_proc_with_resource_usage(
+            cmd, env, action.directory)
 
     if ret_code != 0:
         LOG.error("Error generating AST.\n\ncommand:\n\n%s\n\nstderr:\n\n%s",
                   cmdstr, err)
+        return None, resource_usage
+
+    return get_ast_path(config, triple_arch, source), resource_usage
 
 
 def ast_dump_path(source_path):
@@ -152,6 +191,20 @@ def func_map_list_src_to_ast(func_src_list, ctu_on_demand):
     return func_ast_list
 
 
+def func_map_list_ast_to_relative(func_ast_list, ast_path, triple_arch_dir):
+    """ Turns the absolute path of the AST dump in the function map list
+    generated from the AST dump into the path relative to the CTU-DIR
+    directory of the target architecture, the same way as the paths are
+    mapped by func_map_list_src_to_ast in case of AST-dump based analysis. """
+
+    suffix = " " + ast_path
+    relative_path = os.path.relpath(ast_path, triple_arch_dir)
+
+    return [fn_ast_txt[:-len(ast_path)] + relative_path
+            if fn_ast_txt.endswith(suffix) else fn_ast_txt
+            for fn_ast_txt in func_ast_list]
+
+
 def get_extdef_mapping_cmd(action, config, source, func_map_cmd):
     """ Get command to create CTU index file. """
 
@@ -163,32 +216,57 @@ def get_extdef_mapping_cmd(action, config, source, func_map_cmd):
 
 
 def map_functions(triple_arch, action, source, config, env,
-                  func_map_cmd, temp_fnmap_folder):
+                  func_map_cmd, temp_fnmap_folder, ast_path=None):
     """ Generate function map file for the current source.
 
         On-demand CTU analysis requires the *mangled name* to *source file*
         mapping. However in case of pre-processed ast-dumps, *mangled name* to
         *ast dump* mapping must be provided.
-    """
 
-    cmd = get_extdef_mapping_cmd(action, config, source, func_map_cmd)
+        If the path of the already generated AST dump of the source is given,
+        the function definitions are read from the AST dump instead of parsing
+        the source file again. This requires Clang 14 or newer, if it fails
+        the source file is parsed.
 
-    cmdstr = ' '.join(cmd)
-    LOG.debug_analyzer("Generating function map using '%s'", cmdstr)
-    ret_code, stdout, err \
-        = analyzer_base.SourceAnalyzer.run_proc(cmd,
-                                                env,
-                                                action.directory)
-    if ret_code != 0:
-        LOG.error("Error generating function map."
-                  "\n\ncommand:\n\n%s\n\nstderr:\n\n%s", cmdstr, err)
-        return
-
-    func_src_list = stdout.splitlines()
-    func_ast_list = func_map_list_src_to_ast(
-        func_src_list, config.ctu_on_demand)
-    extern_fns_map_folder = os.path.join(config.ctu_dir, triple_arch,
-                                         temp_fnmap_folder)
+        Returns the resource usage of the function map generation.
+    """
+    triple_arch_dir = os.path.join(config.ctu_dir, triple_arch)
+
+    func_ast_list = None
+    if ast_path:
+        cmd = [func_map_cmd, ast_path]
+
+        cmdstr = ' '.join(cmd)
+        LOG.debug_analyzer("Generating function map from the AST dump using "
+                           "'%s'", cmdstr)
+        ret_code, stdout, err, resource_usage \
+            = analyzer_base.SourceAnalyzer.run_proc_with_resource_usage(
+                cmd, env, action.directory)
+        if ret_code == 0:
+            func_ast_list = func_map_list_ast_to_relative(
+                stdout.splitlines(), ast_path, triple_arch_dir)
+        else:
+            LOG.debug("Failed to generate function map from the AST dump, "
+                      "parsing the source file instead.\n%s", err)
+
+    if func_ast_list is None:
+        cmd = get_extdef_mapping_cmd(action, config, source, func_map_cmd)
+
+        cmdstr = ' '.join(cmd)
+        LOG.debug_analyzer("Generating function map using '%s'", cmdstr)
+        ret_code, stdout, err, resource_usage \
+            = analyzer_base.SourceAnalyzer.run_proc_with_resource_usage(
+                cmd, env, action.directory)
+        if ret_code != 0:
+            LOG.error("Error generating function map."
+                      "\n\ncommand:\n\n%s\n\nstderr:\n\n%s", cmdstr, err)
+            return resource_usage
+
+        func_src_list = stdout.splitlines()
+        func_ast_list = func_map_list_src_to_ast(
+            func_src_list, config.ctu_on_demand)
+
+    extern_fns_map_folder = os.path.join(triple_arch_dir, temp_fnmap_folder)
     if not os.path.isdir(extern_fns_map_folder):
         try:
             os.makedirs(extern_fns_map_folder)
@@ -201,3 +279,5 @@ def map_functions(triple_arch, action, source, config, env,
                                          delete=False,
                                          encoding='utf-8') as out_file:
             out_file.write("\n".join(func_ast_list) + "\n")
+
+    return resource_usage
@@ -9,10 +9,8 @@
 Result handler for Clang Static Analyzer.
 """
 
-import os
-
 from codechecker_common.logger import get_logger
-from codechecker_report_hash.hash import HashType, replace_report_hash
+from codechecker_report_hash.hash import HashType
 
 from ..result_handler_base import ResultHandler
 
@@ -24,12 +22,13 @@ class ResultHandlerClangSA(ResultHandler):
     Use context free hash if enabled.
     """
 
-    def postprocess_result(self):
+    @property
+    def result_hash_type(self):
         """
         Override the context sensitive issue hash in the plist files to
         context insensitive if it is enabled during analysis.
         """
-        if self.report_hash_type in ['context-free', 'context-free-v2'] and \
-                os.path.exists(self.analyzer_result_file):
-            replace_report_hash(self.analyzer_result_file,
-                                HashType.CONTEXT_FREE)
+        if self.report_hash_type in ['context-free', 'context-free-v2']:
+            return HashType.CONTEXT_FREE
+
+        return None
@@ -11,7 +11,7 @@ Result handler for Clang Tidy.
 
 
 from codechecker_common.logger import get_logger
-from codechecker_report_hash.hash import HashType, replace_report_hash
+from codechecker_report_hash.hash import HashType
 
 from ..result_handler_base import ResultHandler
 
@@ -20,9 +20,9 @@ from . import output_converter
 LOG = get_logger('report')
 
 
-def generate_plist_from_tidy_result(output_file, tidy_stdout):
+def generate_plist_from_tidy_result(tidy_stdout):
     """
-    Generate a plist file from the clang tidy analyzer results.
+    Generate the plist content from the clang tidy analyzer results.
     """
     parser = output_converter.OutputParser()
 
@@ -31,7 +31,7 @@ def generate_plist_from_tidy_result(output_file, tidy_stdout):
     plist_converter = output_converter.PListConverter()
     plist_converter.add_messages(messages)
 
-    plist_converter.write_to_file(output_file)
+    return plist_converter.plist
 
 
 class ClangTidyPlistToFile(ResultHandler):
@@ -41,19 +41,26 @@ class ClangTidyPlistToFile(ResultHandler):
 
     def postprocess_result(self):
         """
-        Generate plist file which can be parsed and processed for
-        results which can be stored into the database.
+        Generate plist content which can be parsed and processed for
+        results which can be stored into the database. The content is
+        written into the result file by the postprocessing of the results.
         """
-        output_file = self.analyzer_result_file
         LOG.debug_analyzer(self.analyzer_stdout)
         tidy_stdout = self.analyzer_stdout.splitlines()
-        generate_plist_from_tidy_result(output_file, tidy_stdout)
-
-        # In the earlier versions of CodeChecker Clang Tidy never used context
-        # free hash even if we enabled it with '--report-hash context-free'
-        # when calling the analyze command. To do not break every hash
-        # automatically when using this option we introduced a new choice for
-        # --report-hash option ('context-free-v2') and we still do not use
-        # context free hash for 'context-free' choice.
+        self.analyzer_result_plist = \
+            generate_plist_from_tidy_result(tidy_stdout)
+
+    @property
+    def result_hash_type(self):
+        """
+        In the earlier versions of CodeChecker Clang Tidy never used context
+        free hash even if we enabled it with '--report-hash context-free'
+        when calling the analyze command. To do not break every hash
+        automatically when using this option we introduced a new choice for
+        --report-hash option ('context-free-v2') and we still do not use
+        context free hash for 'context-free' choice.
+        """
         if self.report_hash_type == 'context-free-v2':
-            replace_report_hash(output_file, HashType.CONTEXT_FREE)
+            return HashType.CONTEXT_FREE
+
+        return None
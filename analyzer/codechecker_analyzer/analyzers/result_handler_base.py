@@ -56,6 +56,11 @@ class ResultHandler(object, metaclass=ABCMeta):
         self.skiplist_handler = None
         self.analyzed_source_file = None
         self.analyzer_returncode = 1
+        self.analyzer_resource_usage = None
+
+        # Content of the result file if it was produced in memory by the
+        # postprocessing and is not written into the result file yet.
+        self.analyzer_result_plist = None
         self.__buildaction = action
 
         self.__result_file = None
@@ -174,6 +179,14 @@ class ResultHandler(object, metaclass=ABCMeta):
         """
         pass
 
+    @property
+    def result_hash_type(self):
+        """
+        Type of the report hash which replaces the one generated by the
+        analyzer in the result file. None if the generated hash is kept.
+        """
+        return None
+
     def handle_results(self, client):
         """
         Handle the results and return report statistics.
@@ -9,6 +9,7 @@
 
 
 import argparse
+import re
 
 
 class OrderedCheckersAction(argparse.Action):
@@ -39,3 +40,47 @@ class OrderedCheckersAction(argparse.Action):
         ordered_checkers.append((value, self.dest == 'enable'))
 
         namespace.ordered_checkers = ordered_checkers
+
+
+def memory_size(value):
+    """
+    Convert a memory size given on the command line to bytes. The size is
+    a number with an optional K, M, G or T unit suffix (e.g. '64G'). Numbers
+    without unit are interpreted in MiB.
+    """
+    match = re.match(r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*$', value,
+                     re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(
+            "Invalid memory size '{0}'. Use a number with an optional K, M, "
+            "G or T unit (e.g. 64G).".format(value))
+
+    number, unit = match.groups()
+    exponent = 'KMGT'.index(unit.upper()) + 1 if unit else 2
+
+    size = int(float(number) * 1024 ** exponent)
+    if size <= 0:
+        raise argparse.ArgumentTypeError(
+            "Memory size should be positive: '{0}'.".format(value))
+
+    return size
+
+
+def shard(value):
+    """
+    Convert a shard given on the command line in '<INDEX>/<COUNT>' format
+    (e.g. '2/4') to an (index, count) pair. The index is 1-based.
+    """
+    match = re.match(r'^\s*(\d+)\s*/\s*(\d+)\s*$', value)
+    if not match:
+        raise argparse.ArgumentTypeError(
+            "Invalid shard '{0}'. Use the <INDEX>/<COUNT> format "
+            "(e.g. 2/4).".format(value))
+
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(
+            "Shard index should be between 1 and the number of shards: "
+            "'{0}'.".format(value))
+
+    return index, count
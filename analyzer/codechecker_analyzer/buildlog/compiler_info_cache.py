@@ -0,0 +1,158 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Persistent cache for the implicit compiler information probes.
+
+Detecting the implicit include paths, the target and the default standard of
+a compiler requires executing the compiler. The results of these probes are
+stored on the disk so they can be reused by later analysis runs. Every entry
+is addressed by the hash of the compiler binary's path, modification time and
+size, the kind of the probe, the compiler flags and the environment variables
+which affect its result, so an entry is never reused once the compiler binary
+or its environment changes. Failed probes are not cached.
+"""
+
+
+import hashlib
+import json
+import os
+import tempfile
+
+# pylint: disable=no-name-in-module
+from distutils.spawn import find_executable
+
+from codechecker_common.logger import get_logger
+
+LOG = get_logger('buildlogger')
+
+# Version of the cache entry format. Increase it if the format or the meaning
+# of the stored values changes.
+CACHE_VERSION = 2
+
+# Environment variables which change the implicit include paths, the target
+# or the default standard reported by the compilers.
+COMPILER_ENV_VARS = ['CPATH', 'C_INCLUDE_PATH', 'CPLUS_INCLUDE_PATH',
+                     'OBJC_INCLUDE_PATH', 'OBJCPLUS_INCLUDE_PATH',
+                     'COMPILER_PATH', 'GCC_EXEC_PREFIX', 'SDKROOT',
+                     'CCC_OVERRIDE_OPTIONS']
+
+
+def get_cache_dir():
+    """
+    Return the directory of the compiler information cache.
+
+    The location can be set by the CC_COMPILER_INFO_CACHE_DIR environment
+    variable. If it is set to an empty string caching is disabled and None is
+    returned.
+    """
+    cache_dir = os.environ.get('CC_COMPILER_INFO_CACHE_DIR')
+    if cache_dir is not None:
+        return cache_dir if cache_dir else None
+
+    cache_home = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(cache_home, 'codechecker', 'compiler_info')
+
+
+def get_key(compiler, probe, *args):
+    """
+    Return the content address of a probe result or None if the compiler
+    binary can not be found.
+
+    compiler -- The compiler binary which is probed.
+    probe -- Name of the probe (e.g. 'includes', 'target', 'standard').
+    args -- Further values which affect the result of the probe like the
+            language or the relevant compiler flags.
+    """
+    compiler_path = find_executable(compiler)
+    if not compiler_path:
+        return None
+
+    try:
+        compiler_path = os.path.realpath(compiler_path)
+        stat = os.stat(compiler_path)
+    except OSError:
+        return None
+
+    env = {var: os.environ[var] for var in COMPILER_ENV_VARS
+           if var in os.environ}
+
+    key = json.dumps([CACHE_VERSION, compiler_path, stat.st_mtime_ns,
+                      stat.st_size, probe, args, env], sort_keys=True)
+
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def get(key):
+    """
+    Return the cached value for the given key or None if it is not cached.
+    """
+    cache_dir = get_cache_dir()
+    if not key or not cache_dir:
+        return None
+
+    try:
+        with open(os.path.join(cache_dir, key), 'r',
+                  encoding='utf-8', errors='ignore') as entry:
+            return json.load(entry)['value']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def put(key, value):
+    """
+    Store the given value in the cache.
+
+    The entry is written to a temporary file first and moved to its place, so
+    concurrent analysis processes never see partially written entries.
+    Failing to write the cache is not an error, the probe will be executed
+    again next time.
+    """
+    cache_dir = get_cache_dir()
+    if not key or not cache_dir:
+        return
+
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.tmp_')
+        with os.fdopen(fd, 'w', encoding='utf-8', errors='ignore') as entry:
+            json.dump({'value': value}, entry)
+
+        os.replace(tmp_path, os.path.join(cache_dir, key))
+    except OSError as oerr:
+        LOG.debug("Failed to write compiler info cache entry to '%s': %s",
+                  cache_dir, oerr)
+
+
+def cached(probe, compiler, args, probe_func):
+    """
+    Return the result of the given probe from the cache if it is available,
+    otherwise execute the probe and store its result.
+
+    probe -- Name of the probe.
+    compiler -- The compiler binary which is probed.
+    args -- List of values which (besides the compiler) affect the result.
+    probe_func -- Function without arguments executing the probe. It returns
+                  None if the compiler could not be executed, so the result
+                  is not cached.
+    """
+    key = get_key(compiler, probe, *args)
+
+    value = get(key)
+    if value is not None:
+        LOG.debug("Using cached '%s' compiler info of '%s'.", probe, compiler)
+        return value
+
+    value = probe_func()
+    if value is not None:
+        put(key, value)
+
+    return value
@@ -11,8 +11,10 @@ from collections import defaultdict
 # pylint: disable=no-name-in-module
 from distutils.spawn import find_executable
 
+import concurrent.futures
 import glob
 import json
+import multiprocessing
 import os
 import re
 import shlex
@@ -27,10 +29,15 @@ from codechecker_common.logger import get_logger
 from codechecker_common.util import load_json_or_empty
 
 from .. import gcc_toolchain
+from . import compiler_info_cache
 from .build_action import BuildAction
 
 LOG = get_logger('buildlogger')
 
+# Maximum number of compilation database entries which are sent to a worker
+# process at once when the compilation database is parsed in parallel.
+PARSE_CHUNK_SIZE = 256
+
 SOURCE_EXTENSIONS = {".c", ".cc", ".cp", ".cpp", ".cxx", ".c++", ".o", ".so",
                      ".a"}
 
@@ -381,12 +388,19 @@ class ImplicitCompilerInfo(object):
         cmd = compiler + " " + ' '.join(extra_opts) \
             + " -E -x " + language + " - -v "
 
-        LOG.debug("Retrieving default includes via '" + cmd + "'")
-        ICI = ImplicitCompilerInfo
-        include_dirs = \
-            ICI.__parse_compiler_includes(ICI.__get_compiler_err(cmd))
+        def probe():
+            LOG.debug("Retrieving default includes via '" + cmd + "'")
+            ICI = ImplicitCompilerInfo
+            err = ICI.__get_compiler_err(cmd)
+            if err is None:
+                return None
+
+            include_dirs = ICI.__parse_compiler_includes(err)
 
-        return list(map(os.path.normpath, include_dirs))
+            return list(map(os.path.normpath, include_dirs))
+
+        return compiler_info_cache.cached(
+            'includes', compiler, [language, extra_opts], probe) or []
 
     @staticmethod
     def get_compiler_target(compiler):
@@ -396,20 +410,24 @@ class ImplicitCompilerInfo(object):
         compiler -- The compiler binary of which the target architecture is
                     fetched.
         """
-        lines = ImplicitCompilerInfo.__get_compiler_err(compiler + ' -v')
+        def probe():
+            lines = ImplicitCompilerInfo.__get_compiler_err(compiler + ' -v')
+
+            if lines is None:
+                return None
 
-        if lines is None:
-            return ""
+            target_label = "Target:"
+            target = ""
 
-        target_label = "Target:"
-        target = ""
+            for line in lines.splitlines(True):
+                line = line.strip().split()
+                if len(line) > 1 and line[0] == target_label:
+                    target = line[1]
 
-        for line in lines.splitlines(True):
-            line = line.strip().split()
-            if len(line) > 1 and line[0] == target_label:
-                target = line[1]
+            return target
 
-        return target
+        return compiler_info_cache.cached('target', compiler, [], probe) \
+            or ""
 
     @staticmethod
     def get_compiler_standard(compiler, language):
@@ -462,33 +480,39 @@ class ImplicitCompilerInfo(object):
 #endif
         """
 
-        standard = ""
-        with tempfile.NamedTemporaryFile(
-                mode='w+',
-                suffix=('.c' if language == 'c' else '.cpp'),
-                encoding='utf-8') as source:
+        def probe():
+            standard = ""
+            with tempfile.NamedTemporaryFile(
+                    mode='w+',
+                    suffix=('.c' if language == 'c' else '.cpp'),
+                    encoding='utf-8') as source:
+
+                with source.file as f:
+                    f.write(VERSION_C if language == 'c' else VERSION_CPP)
 
-            with source.file as f:
-                f.write(VERSION_C if language == 'c' else VERSION_CPP)
+                err = ImplicitCompilerInfo.\
+                    __get_compiler_err(" ".join([compiler, source.name]))
 
-            err = ImplicitCompilerInfo.\
-                __get_compiler_err(" ".join([compiler, source.name]))
+                if err is None:
+                    return None
 
-            if err is not None:
                 finding = re.search('CC_FOUND_STANDARD_VER#(.+)', err)
                 if finding:
                     standard = finding.group(1)
 
-        if standard:
-            if standard == '94':
-                # Special case for C94 standard.
-                standard = '-std=iso9899:199409'
-            else:
-                standard = '-std=gnu' \
-                    + ('' if language == 'c' else '++') \
-                    + standard
+            if standard:
+                if standard == '94':
+                    # Special case for C94 standard.
+                    standard = '-std=iso9899:199409'
+                else:
+                    standard = '-std=gnu' \
+                        + ('' if language == 'c' else '++') \
+                        + standard
+
+            return standard
 
-        return standard
+        return compiler_info_cache.cached(
+            'standard', compiler, [language], probe) or ""
 
     @staticmethod
     def load_compiler_info(filename, compiler):
@@ -552,23 +576,37 @@ class ImplicitCompilerInfo(object):
             if not ICI.compiler_info.get(compiler):
                 ICI.compiler_info[compiler] = defaultdict(dict)
 
+                # The probes are independent compiler invocations (or cache
+                # lookups) so they are executed concurrently.
+                with concurrent.futures.ThreadPoolExecutor() as executor:
+                    c_includes = executor.submit(
+                        ICI.get_compiler_includes, compiler, ICI.c(),
+                        details['analyzer_options'])
+                    cpp_includes = executor.submit(
+                        ICI.get_compiler_includes, compiler, ICI.cpp(),
+                        details['analyzer_options'])
+                    target = executor.submit(
+                        ICI.get_compiler_target, compiler)
+                    c_standard = executor.submit(
+                        ICI.get_compiler_standard, compiler, ICI.c())
+                    cpp_standard = executor.submit(
+                        ICI.get_compiler_standard, compiler, ICI.cpp())
+
                 # Collect for C
                 ICI.compiler_info[compiler][ICI.c()]['compiler_includes'] = \
-                    ICI.get_compiler_includes(compiler, ICI.c(),
-                                              details['analyzer_options'])
+                    c_includes.result()
                 ICI.compiler_info[compiler][ICI.c()]['target'] = \
-                    ICI.get_compiler_target(compiler)
+                    target.result()
                 ICI.compiler_info[compiler][ICI.c()]['compiler_standard'] = \
-                    ICI.get_compiler_standard(compiler, ICI.c())
+                    c_standard.result()
 
                 # Collect for C++
                 ICI.compiler_info[compiler][ICI.cpp()]['compiler_includes'] = \
-                    ICI.get_compiler_includes(compiler, ICI.cpp(),
-                                              details['analyzer_options'])
+                    cpp_includes.result()
                 ICI.compiler_info[compiler][ICI.cpp()]['target'] = \
-                    ICI.get_compiler_target(compiler)
+                    target.result()
                 ICI.compiler_info[compiler][ICI.cpp()]['compiler_standard'] = \
-                    ICI.get_compiler_standard(compiler, ICI.cpp())
+                    cpp_standard.result()
 
         def set_details_from_ICI(key, lang):
             """Set compiler related information in the 'details' dictionary.
@@ -1200,6 +1238,76 @@ class CompileCommandEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, o)
 
 
+def __parse_entry(params):
+    """
+    Parse a single compilation database entry in a worker process.
+
+    Returns the build action together with the implicit compiler information
+    which was detected by this worker while parsing the entry, so it can be
+    merged back into the parent process.
+    """
+    entry, compiler_info_file, keep_gcc_include_fixed, keep_gcc_intrin, \
+        env, analyzer_clang_version = params
+
+    known_compilers = set(ImplicitCompilerInfo.compiler_info)
+
+    action = parse_options(entry,
+                           compiler_info_file,
+                           keep_gcc_include_fixed,
+                           keep_gcc_intrin,
+                           clangsa.version.get,
+                           env,
+                           analyzer_clang_version)
+
+    new_compiler_info = {
+        compiler: info for compiler, info
+        in ImplicitCompilerInfo.compiler_info.items()
+        if compiler not in known_compilers}
+
+    return action, new_compiler_info
+
+
+def __parse_entries(entries, jobs, compiler_info_file,
+                    keep_gcc_include_fixed, keep_gcc_intrin, env,
+                    analyzer_clang_version):
+    """
+    Parse the given compilation database entries and yield the build actions
+    in the same order as the entries.
+
+    If more than one job is given the entries are parsed in chunks by a
+    process pool and the build actions of the first chunk are yielded as soon
+    as it is ready, so the consumer does not have to wait for the whole
+    compilation database to be parsed.
+    """
+    if jobs <= 1 or len(entries) <= 1:
+        for entry in entries:
+            yield parse_options(entry,
+                                compiler_info_file,
+                                keep_gcc_include_fixed,
+                                keep_gcc_intrin,
+                                clangsa.version.get,
+                                env,
+                                analyzer_clang_version)
+        return
+
+    params = [(entry, compiler_info_file, keep_gcc_include_fixed,
+               keep_gcc_intrin, env, analyzer_clang_version)
+              for entry in entries]
+
+    # Use smaller chunks than an even split so the first results arrive early
+    # and the workers stay balanced if some compilers are slow to probe.
+    chunk_size = max(1, min(PARSE_CHUNK_SIZE, len(entries) // (jobs * 4)))
+
+    with multiprocessing.Pool(jobs) as pool:
+        for action, new_compiler_info in \
+                pool.imap(__parse_entry, params, chunk_size):
+            for compiler, info in new_compiler_info.items():
+                if not ImplicitCompilerInfo.compiler_info.get(compiler):
+                    ImplicitCompilerInfo.compiler_info[compiler] = info
+
+            yield action
+
+
 class CompileActionUniqueingType(object):
     NONE = 0  # Full Action text
     SOURCE_ALPHA = 1  # Based on source file, uniqueing by
@@ -1218,7 +1326,8 @@ def parse_unique_log(compilation_database,
                      pre_analysis_skip_handler=None,
                      ctu_or_stats_enabled=False,
                      env=None,
-                     analyzer_clang_version=None):
+                     analyzer_clang_version=None,
+                     jobs=1):
     """
     This function reads up the compilation_database
     and returns with a list of build actions that is
@@ -1270,6 +1379,9 @@ def parse_unique_log(compilation_database,
     env -- Is the environment where a subprocess call should be executed.
     analyzer_clang_version -- version information about the clang which is
                               used to execute the analysis
+    jobs -- Number of processes used to parse the compilation database
+            entries. Uniqueing is done in the order of the entries in the
+            compilation database independently of this value.
     """
     try:
         uniqued_build_actions = dict()
@@ -1286,6 +1398,7 @@ def parse_unique_log(compilation_database,
 
         skipped_cmp_cmd_count = 0
 
+        entries = []
         for entry in extend_compilation_database_entries(compilation_database):
             # Normalization needs to be done here, because the skip regex
             # won't match properly in the skiplist handler.
@@ -1302,14 +1415,15 @@ def parse_unique_log(compilation_database,
                 skipped_cmp_cmd_count += 1
                 continue
 
-            action = parse_options(entry,
-                                   compiler_info_file,
-                                   keep_gcc_include_fixed,
-                                   keep_gcc_intrin,
-                                   clangsa.version.get,
-                                   env,
-                                   analyzer_clang_version)
+            entries.append(entry)
 
+        for action in __parse_entries(entries,
+                                      jobs,
+                                      compiler_info_file,
+                                      keep_gcc_include_fixed,
+                                      keep_gcc_intrin,
+                                      env,
+                                      analyzer_clang_version):
             if not action.lang:
                 continue
             if action.action_type != BuildAction.COMPILE:
@@ -18,9 +18,12 @@ import re
 import shutil
 import sys
 
-from codechecker_analyzer import analyzer, analyzer_context, arg, env
+from codechecker_analyzer import analysis_scheduler, analyzer, \
+    analyzer_context, arg, env
 from codechecker_analyzer.analyzers import analyzer_types, clangsa
-from codechecker_analyzer.arg import OrderedCheckersAction
+from codechecker_analyzer.analyzers.clangsa import ctu_manager
+from codechecker_analyzer.arg import OrderedCheckersAction, memory_size, \
+    shard
 from codechecker_analyzer.buildlog import log_parser
 
 from codechecker_common import arg, logger, skiplist_handler, cmd_config
@@ -60,6 +63,12 @@ Environment variables
                            variable.
   CC_SEVERITY_MAP_FILE     Path of the checker-severity mapping config file.
                            Default: {}
+  CC_COMPILER_INFO_CACHE_DIR
+                           Directory where the implicit include paths, target
+                           and standard of the compilers are cached between
+                           analysis runs. Set it to an empty value to disable
+                           the cache.
+                           Default: ~/.cache/codechecker/compiler_info
 
 
 Issue hashes
@@ -146,6 +155,58 @@ def add_arguments_to_parser(parser):
                              "threads mean faster analysis at the cost of "
                              "using more memory.")
 
+    parser.add_argument('--max-memory',
+                        type=memory_size,
+                        dest="max_memory",
+                        required=False,
+                        default=argparse.SUPPRESS,
+                        help="Memory budget of the parallel analysis, e.g. "
+                             "'200G'. Numbers without unit are interpreted "
+                             "in MiB. A new analyzer process is started only "
+                             "if its expected memory usage fits into the "
+                             "budget and into the available memory of the "
+                             "system. The expected memory usage of a "
+                             "translation unit is its peak memory usage "
+                             "recorded by the previous analysis into the "
+                             "output directory. This way a high number of "
+                             "jobs can be used safely.")
+
+    parser.add_argument('--shard',
+                        type=shard,
+                        dest="shard",
+                        metavar='INDEX/COUNT',
+                        required=False,
+                        default=argparse.SUPPRESS,
+                        help="Analyze only one shard of the compilation "
+                             "commands, e.g. '2/4' analyzes the second "
+                             "quarter. This way the analysis can be "
+                             "distributed to multiple machines which run the "
+                             "same command with different shard indices. The "
+                             "compilation commands are partitioned by their "
+                             "predicted analysis time. The output directories "
+                             "of the shards can be merged by the "
+                             "'CodeChecker merge' command. In case of CTU "
+                             "analysis run the '--ctu-collect' phase on every "
+                             "shard into its own output directory, merge "
+                             "their output directories and run the "
+                             "'--ctu-analyze' phase on the shards with the "
+                             "'--ctu-dir' of the merged directory.")
+
+    parser.add_argument('--shard-statistics',
+                        type=str,
+                        dest="shard_statistics",
+                        metavar='METADATA_FILE',
+                        required=False,
+                        default=argparse.SUPPRESS,
+                        help="The 'metadata.json' file of a previous "
+                             "(merged) analysis. The analysis times recorded "
+                             "in this file are used to balance the shards. "
+                             "If it is not given the shards are balanced by "
+                             "the size of the source files. Every shard must "
+                             "use the same file, otherwise they could "
+                             "partition the compilation commands "
+                             "differently.")
+
     skip_mode = parser.add_mutually_exclusive_group()
     skip_mode.add_argument('-i', '--ignore', '--skip',
                            dest="skipfile",
@@ -247,6 +308,21 @@ def add_arguments_to_parser(parser):
                              "reports and overwrites only those files that "
                              "were update by the current build command).")
 
+    parser.add_argument('--incremental',
+                        dest="incremental",
+                        required=False,
+                        action='store_true',
+                        default=argparse.SUPPRESS,
+                        help="Analyze only those translation units of which "
+                             "the analyzer command, the analysis "
+                             "configuration or the content of any source or "
+                             "header file changed since the last successful "
+                             "analysis into the output directory. The files "
+                             "of the translation units are recorded in the "
+                             "'<OUTPUT_DIR>/incremental' directory. This "
+                             "option is ignored in case of CTU or "
+                             "statistical analysis.")
+
     parser.add_argument('--compile-uniqueing',
                         type=str,
                         dest="compile_uniqueing",
@@ -497,6 +573,23 @@ Cross-TU analysis. By default, no CTU analysis is run when
                                     "'<OUTPUT_DIR>/ctu-dir'. (These files "
                                     "will not be cleaned up in this mode.)")
 
+        ctu_opts.add_argument('--ctu-dir',
+                              type=str,
+                              dest='ctu_dir',
+                              default=argparse.SUPPRESS,
+                              help="Directory of the files generated by the "
+                                   "'collect' phase of Cross-TU analysis. "
+                                   "The 'analyze' phase of multiple shards "
+                                   "can use the same directory created by "
+                                   "'CodeChecker merge'. The 'collect' "
+                                   "phase of a shard can not use this "
+                                   "option, because the shards can not "
+                                   "collect into the same directory. The "
+                                   "'collect' phase clears this directory "
+                                   "only if it contains CTU data only, and "
+                                   "it is not removed after the analysis. "
+                                   "(default: '<OUTPUT_DIR>/ctu-dir')")
+
         ctu_opts.add_argument('--ctu-reanalyze-on-failure',
                               action='store_true',
                               dest='ctu_reanalyze_on_failure',
@@ -780,6 +873,49 @@ def __get_result_source_files(metadata):
     return result_src_files
 
 
+def __update_tu_statistics(metadata_prev, metadata_tool):
+    """
+    Keep the statistics of the translation units which were not analyzed in
+    this run (e.g. they were up to date in incremental mode), so they can be
+    used to schedule the next analysis.
+    """
+    if not metadata_prev:
+        return
+
+    for tool in metadata_prev.get('tools', []):
+        for analyzer_type, analyzer in tool.get('analyzers', {}).items():
+            if analyzer_type not in metadata_tool['analyzers']:
+                continue
+
+            tu_statistics = metadata_tool['analyzers'][analyzer_type] \
+                .setdefault('tu_statistics', {})
+            for source, stats in analyzer.get('tu_statistics', {}).items():
+                if os.path.exists(source):
+                    tu_statistics.setdefault(source, stats)
+
+
+def __get_shard_actions(args, actions):
+    """
+    Get the build actions which belong to the shard given in the command
+    line arguments.
+    """
+    shard_index, shard_count = args.shard
+
+    tu_statistics = {}
+    if 'shard_statistics' in args:
+        tu_statistics = analysis_scheduler.load_tu_statistics(
+            args.shard_statistics)
+
+    shards = analysis_scheduler.partition_by_predicted_cost(
+        actions, shard_count, tu_statistics)
+
+    LOG.info("Shard %d/%d: %d of %d compilation commands will be analyzed.",
+             shard_index, shard_count, len(shards[shard_index - 1]),
+             len(actions))
+
+    return shards[shard_index - 1]
+
+
 def __have_new_report(plist_timestamps, output_path):
     """
     This is a lightweight implementation of checking whether new reports are
@@ -909,13 +1045,55 @@ def main(args):
     # logged by the logger.
     all_cmp_cmd_count = len(compile_commands)
 
+    if 'shard' in args and 'ctu_phases' in args and \
+            args.ctu_phases[0] and args.ctu_phases[1]:
+        LOG.error("CTU analysis of a shard requires the CTU data of every "
+                  "shard. Run the '--ctu-collect' phase on the shards, merge "
+                  "them by 'CodeChecker merge' and run the '--ctu-analyze' "
+                  "phase on the shards with the '--ctu-dir' of the merged "
+                  "output directory.")
+        sys.exit(1)
+
+    if 'shard' in args and 'ctu_dir' in args and 'ctu_phases' in args and \
+            args.ctu_phases[0]:
+        LOG.error("The shards can not collect their CTU data into the same "
+                  "directory, because they would overwrite each other's "
+                  "files. Run the '--ctu-collect' phase of every shard "
+                  "without '--ctu-dir', so each of them collects into its "
+                  "own output directory, and merge them by 'CodeChecker "
+                  "merge'.")
+        sys.exit(1)
+
+    if 'shard_statistics' in args and \
+            not os.path.isfile(args.shard_statistics):
+        LOG.error("The specified shard statistics file '%s' does not exist!",
+                  args.shard_statistics)
+        sys.exit(1)
+
     # We clear the output directory in the following cases.
-    ctu_dir = os.path.join(args.output_path, 'ctu-dir')
-    if 'ctu_phases' in args and args.ctu_phases[0] and \
-            os.path.isdir(ctu_dir):
-        # Clear the CTU-dir if the user turned on the collection phase.
-        LOG.debug("Previous CTU contents have been deleted.")
-        shutil.rmtree(ctu_dir)
+    if 'ctu_dir' in args:
+        args.ctu_dir = os.path.abspath(args.ctu_dir)
+        if 'ctu_phases' in args and args.ctu_phases[0] and \
+                os.path.isdir(args.ctu_dir):
+            # The CTU-dir given by the user is cleared only if it contains
+            # CTU data only.
+            if not ctu_manager.is_ctu_dir(args.ctu_dir):
+                LOG.error("The CTU directory '%s' contains files which were "
+                          "not generated by CTU analysis. Please specify an "
+                          "empty or a CTU directory by '--ctu-dir'.",
+                          args.ctu_dir)
+                sys.exit(1)
+
+            LOG.info("Previous CTU contents in '%s' have been deleted.",
+                     args.ctu_dir)
+            shutil.rmtree(args.ctu_dir)
+    else:
+        ctu_dir = os.path.join(args.output_path, 'ctu-dir')
+        if 'ctu_phases' in args and args.ctu_phases[0] and \
+                os.path.isdir(ctu_dir):
+            # Clear the CTU-dir if the user turned on the collection phase.
+            LOG.debug("Previous CTU contents have been deleted.")
+            shutil.rmtree(ctu_dir)
 
     if 'clean' in args and os.path.isdir(args.output_path):
         LOG.info("Previous analysis results in '%s' have been removed, "
@@ -957,7 +1135,14 @@ def main(args):
         pre_analysis_skip_handler,
         ctu_or_stats_enabled,
         analyzer_env,
-        analyzer_clang_version)
+        analyzer_clang_version,
+        args.jobs)
+
+    # Number of compile commands remained after uniqueing.
+    unique_cmp_cmd_count = len(actions)
+
+    if 'shard' in args:
+        actions = __get_shard_actions(args, actions)
 
     if not actions:
         LOG.info("No analysis is required.\nThere were no compilation "
@@ -990,6 +1175,10 @@ def main(args):
     if 'name' in args:
         metadata_tool['run_name'] = args.name
 
+    if 'shard' in args:
+        metadata_tool['shard'] = {'index': args.shard[0],
+                                  'count': args.shard[1]}
+
     # Update metadata dictionary with old values.
     metadata_file = os.path.join(args.output_path, 'metadata.json')
     metadata_prev = None
@@ -1004,9 +1193,10 @@ def main(args):
     cmp_cmd_to_be_uniqued = all_cmp_cmd_count - skipped_cmp_cmd_count
 
     # Number of compile commands removed during uniqueing.
-    removed_during_uniqueing = cmp_cmd_to_be_uniqued - len(actions)
+    removed_during_uniqueing = cmp_cmd_to_be_uniqued - unique_cmp_cmd_count
 
-    all_to_be_analyzed = cmp_cmd_to_be_uniqued - removed_during_uniqueing
+    # Only the compile commands of the current shard are analyzed.
+    all_to_be_analyzed = len(actions)
 
     compile_cmd_count = CompileCmdParseCount(
         total=all_cmp_cmd_count,
@@ -1028,6 +1218,7 @@ def main(args):
                               compile_cmd_count)
 
     __update_skip_file(args)
+    __update_tu_statistics(metadata_prev, metadata_tool)
     __cleanup_metadata(metadata_prev, metadata)
 
     LOG.debug("Analysis metadata write to '%s'", metadata_file)
@@ -19,7 +19,7 @@ import tempfile
 
 from codechecker_analyzer import analyzer_context
 from codechecker_analyzer.analyzers import analyzer_types
-from codechecker_analyzer.arg import OrderedCheckersAction
+from codechecker_analyzer.arg import OrderedCheckersAction, memory_size
 
 from codechecker_common import arg, logger
 from codechecker_common.source_code_comment_handler import REVIEW_STATUS_VALUES
@@ -58,6 +58,12 @@ Environment variables
                            variable.
   CC_SEVERITY_MAP_FILE     Path of the checker-severity mapping config file.
                            Default: {}
+  CC_COMPILER_INFO_CACHE_DIR
+                           Directory where the implicit include paths, target
+                           and standard of the compilers are cached between
+                           analysis runs. Set it to an empty value to disable
+                           the cache.
+                           Default: ~/.cache/codechecker/compiler_info
   CC_LOGGER_DEBUG_FILE     If -b and -o flags are used with debug logs, the
                            logging phase emits its debug logs in
                            'codechecker.logger.debug' under the output
@@ -225,6 +231,19 @@ used to generate a log file on the fly.""")
                                     "More threads mean faster analysis at "
                                     "the cost of using more memory.")
 
+    analyzer_opts.add_argument('--max-memory',
+                               type=memory_size,
+                               dest="max_memory",
+                               required=False,
+                               default=argparse.SUPPRESS,
+                               help="Memory budget of the parallel analysis, "
+                                    "e.g. '200G'. Numbers without unit are "
+                                    "interpreted in MiB. A new analyzer "
+                                    "process is started only if its expected "
+                                    "memory usage fits into the budget and "
+                                    "into the available memory of the "
+                                    "system.")
+
     analyzer_opts.add_argument('-c', '--clean',
                                dest="clean",
                                required=False,
@@ -236,6 +255,20 @@ used to generate a log file on the fly.""")
                                     "overwrites only those files that were "
                                     "update by the current build command).")
 
+    analyzer_opts.add_argument('--incremental',
+                               dest="incremental",
+                               required=False,
+                               action='store_true',
+                               default=argparse.SUPPRESS,
+                               help="Analyze only those translation units of "
+                                    "which the analyzer command, the "
+                                    "analysis configuration or the content "
+                                    "of any source or header file changed "
+                                    "since the last successful analysis into "
+                                    "the output directory. This option is "
+                                    "ignored in case of CTU or statistical "
+                                    "analysis.")
+
     parser.add_argument('--compile-uniqueing',
                         type=str,
                         dest="compile_uniqueing",
@@ -827,6 +860,8 @@ def main(args):
                           'ordered_checkers',  # --enable and --disable.
                           'timeout',
                           'compile_uniqueing',
+                          'incremental',
+                          'max_memory',
                           'report_hash',
                           'enable_z3',
                           'enable_z3_refutation']
@@ -0,0 +1,113 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Defines a subcommand for CodeChecker which merges the output directories of
+the shards of a distributed analysis.
+"""
+
+
+import argparse
+import os
+import sys
+
+from codechecker_analyzer import result_merger
+
+from codechecker_common import arg, logger
+
+LOG = logger.get_logger('analyzer')
+
+
+def get_argparser_ctor_args():
+    """
+    This method returns a dict containing the kwargs for constructing an
+    argparse.ArgumentParser (either directly or as a subparser).
+    """
+
+    return {
+        'prog': 'CodeChecker merge',
+        'formatter_class': arg.RawDescriptionDefaultHelpFormatter,
+
+        # Description is shown when the command's help is queried directly
+        'description': """
+Merge the output directories of the shards of an analysis which was
+distributed to multiple machines by the '--shard' option of 'CodeChecker
+analyze'. The merged output directory can be used by the 'CodeChecker parse'
+and 'CodeChecker store' commands like the output of a single analysis.
+
+If the shards contain the result of the '--ctu-collect' phase of CTU analysis,
+the merged output directory will contain the CTU data of the whole project in
+its 'ctu-dir' directory. This directory can be used by the '--ctu-analyze'
+phase of every shard through the '--ctu-dir' option.
+
+Example:
+  # On the i-th machine of N.
+  CodeChecker analyze compile_commands.json --shard i/N -o reports_i
+
+  # After the analysis of every shard finished.
+  CodeChecker merge reports_1 ... reports_N -o reports""",
+
+        # Help is shown when the "parent" CodeChecker command lists the
+        # individual subcommands.
+        'help': "Merge the output directories of the shards of a distributed "
+                "analysis."
+    }
+
+
+def add_arguments_to_parser(parser):
+    """
+    Add the subcommand's arguments to the given argparse.ArgumentParser.
+    """
+
+    parser.add_argument('input',
+                        type=str,
+                        nargs='+',
+                        metavar='folder',
+                        help="The output directories of the shards of the "
+                             "analysis.")
+
+    parser.add_argument('-o', '--output',
+                        dest="output_path",
+                        required=True,
+                        default=argparse.SUPPRESS,
+                        help="Store the merged analysis output in the given "
+                             "folder.")
+
+    logger.add_verbose_arguments(parser)
+    parser.set_defaults(func=main)
+
+
+def main(args):
+    """
+    Merge the output directories of the shards.
+    """
+    logger.setup_logger(args.verbose if 'verbose' in args else None)
+
+    output_path = os.path.abspath(args.output_path)
+    if os.path.exists(output_path) and not os.path.isdir(output_path):
+        LOG.error("The given output path is not a directory: %s",
+                  output_path)
+        sys.exit(1)
+
+    input_dirs = []
+    for input_path in args.input:
+        input_path = os.path.abspath(input_path)
+        if not os.path.isdir(input_path):
+            LOG.error("The given input path is not a directory: %s",
+                      input_path)
+            sys.exit(1)
+
+        if input_path == output_path:
+            LOG.error("The output directory can not be one of the merged "
+                      "directories: %s", input_path)
+            sys.exit(1)
+
+        input_dirs.append(input_path)
+
+    result_merger.merge_result_dirs(input_dirs, output_path)
+
+    LOG.info("Merged output directories are stored in '%s'.", output_path)
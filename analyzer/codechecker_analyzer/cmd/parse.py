@@ -13,13 +13,16 @@ human-readable format.
 
 from collections import defaultdict
 import argparse
-import json
+import io
 import math
+import multiprocessing
 import os
 from operator import itemgetter
+import shutil
 import sys
+import tempfile
 import traceback
-from typing import List, Dict, Tuple, Set
+from typing import Iterator, List, Dict, TextIO, Tuple, Set
 
 from plist_to_html import PlistToHtml
 
@@ -30,14 +33,14 @@ from codechecker_common.output import json as out_json, twodim, \
     codeclimate, gerrit
 from codechecker_common.skiplist_handler import SkipListHandler
 from codechecker_common.source_code_comment_handler import \
-    REVIEW_STATUS_VALUES, SourceCodeCommentHandler, SpellException
+    REVIEW_STATUS_VALUES, SpellException, get_source_code_comment_index
 from codechecker_common.report import Report
 
 from codechecker_report_hash.hash import get_report_path_hash
 
 LOG = logger.get_logger('system')
 
-EXPORT_TYPES = ['html', 'json', 'codeclimate', 'gerrit']
+EXPORT_TYPES = ['html', 'json', 'jsonl', 'codeclimate', 'gerrit']
 
 
 class PlistToPlaintextFormatter(object):
@@ -130,7 +133,8 @@ class PlistToPlaintextFormatter(object):
         """
         files, reports = {}, []
         try:
-            files, reports = plist_parser.parse_plist_file(plist_file)
+            files, reports = plist_parser.parse_plist_file(plist_file,
+                                                           use_cache=True)
         except Exception as ex:
             traceback.print_stack()
             LOG.error('The generated plist is not valid!')
@@ -138,29 +142,26 @@ class PlistToPlaintextFormatter(object):
         finally:
             return files, reports
 
-    def write(self,
-              file_report_map: Dict[str, List[Report]],
-              output=sys.stdout):
+    def get_unique_reports(
+        self,
+        file_report_map: Dict[str, List[Report]]
+    ) -> List[Tuple[str, List[Report]]]:
         """
-        Format an already parsed plist report file to a more
-        human readable format.
-        The formatted text is written to the output.
-        During writing the output statistics are collected.
+        Returns the reports of the source files in the order they are written
+        out. The files are sorted by their report count and the reports by
+        their line.
 
-        Write out the bugs to the output and collect report statistics.
+        Deduplications of an already processed report are dropped. The
+        deduplication depends only on this order, so the returned source files
+        can be formatted independently of each other.
         """
-
-        severity_stats = defaultdict(int)
-        file_stats = defaultdict(int)
-        report_count = defaultdict(int)
-
+        unique_reports = []
         for file_path in sorted(file_report_map,
                                 key=lambda key: len(file_report_map[key])):
-
-            non_suppressed = 0
             sorted_reports = sorted(file_report_map[file_path],
                                     key=lambda r: r.main['location']['line'])
 
+            reports = []
             for report in sorted_reports:
                 path_hash = get_report_path_hash(report)
                 if path_hash in self._processed_path_hashes:
@@ -171,134 +172,244 @@ class PlistToPlaintextFormatter(object):
                     continue
 
                 self._processed_path_hashes.add(path_hash)
+                reports.append(report)
 
-                events = [i for i in report.bug_path
-                          if i.get('kind') == 'event']
-                f_path = report.files[events[-1]['location']['file']]
-                if self.skiplist_handler and \
-                        self.skiplist_handler.should_skip(f_path):
-                    LOG.debug("Skipped report in '%s'", f_path)
-                    LOG.debug(report)
-                    continue
+            unique_reports.append((file_path, reports))
 
-                last_report_event = report.bug_path[-1]
-                source_file = \
-                    report.files[last_report_event['location']['file']]
+        return unique_reports
 
-                report_line = last_report_event['location']['line']
-                report_hash = \
-                    report.main['issue_hash_content_of_line_in_context']
-                checker_name = report.main['check_name']
+    def write(self,
+              file_report_map: Dict[str, List[Report]],
+              output=sys.stdout,
+              jobs: int = 1):
+        """
+        Format an already parsed plist report file to a more
+        human readable format.
+        The formatted text is written to the output.
+        During writing the output statistics are collected.
 
-                skip, source_code_comments = \
-                    skip_report(report_hash,
-                                source_file,
-                                report_line,
-                                checker_name,
-                                self.src_comment_handler,
-                                self.src_comment_status_filter)
+        Write out the bugs to the output and collect report statistics.
 
-                if skip:
-                    continue
+        If jobs is greater than 1 the source files are formatted in parallel
+        and their output is written in the same order as sequentially.
+        """
 
-                if self._trim_path_prefixes:
-                    report.trim_path_prefixes(self._trim_path_prefixes)
+        severity_stats = defaultdict(int)
+        file_stats = defaultdict(int)
+        report_count = defaultdict(int)
 
-                trimmed_source_file = \
-                    report.files[last_report_event['location']['file']]
+        unique_reports = self.get_unique_reports(file_report_map)
+
+        if jobs > 1 and len(unique_reports) > 1:
+            chunksize = max(len(unique_reports) // (jobs * 4), 1)
+            with multiprocessing.Pool(jobs,
+                                      initializer=_init_worker,
+                                      initargs=(self,)) as pool:
+                results = pool.imap(_format_source_file_reports,
+                                    unique_reports,
+                                    chunksize)
+
+                for text, stats in results:
+                    output.write(text)
+                    _add_stats(stats, severity_stats, file_stats,
+                               report_count)
+        else:
+            for file_path, reports in unique_reports:
+                stats = self.write_source_file_reports(file_path, reports,
+                                                       output)
+                _add_stats(stats, severity_stats, file_stats, report_count)
 
-                file_stats[f_path] += 1
-                severity = self.__severity_map.get(checker_name)
-                severity_stats[severity] += 1
-                report_count["report_count"] += 1
+        return {"severity": severity_stats,
+                "files":  file_stats,
+                "reports": report_count}
 
-                review_status = None
-                if len(source_code_comments) == 1:
-                    review_status = source_code_comments[0]['status']
+    def write_source_file_reports(self,
+                                  file_path: str,
+                                  reports: List[Report],
+                                  output=sys.stdout):
+        """
+        Write out the already deduplicated reports of the given source file
+        and return their statistics.
+        """
+        severity_stats = defaultdict(int)
+        file_stats = defaultdict(int)
+        report_count = defaultdict(int)
 
-                output.write(self.__format_bug_event(checker_name,
-                                                     severity,
-                                                     last_report_event,
-                                                     trimmed_source_file,
-                                                     review_status))
+        non_suppressed = 0
+        for report in reports:
+            events = [i for i in report.bug_path
+                      if i.get('kind') == 'event']
+            f_path = report.files[events[-1]['location']['file']]
+            if self.skiplist_handler and \
+                    self.skiplist_handler.should_skip(f_path):
+                LOG.debug("Skipped report in '%s'", f_path)
+                LOG.debug(report)
+                continue
+
+            last_report_event = report.bug_path[-1]
+            source_file = \
+                report.files[last_report_event['location']['file']]
+
+            report_line = last_report_event['location']['line']
+            report_hash = \
+                report.main['issue_hash_content_of_line_in_context']
+            checker_name = report.main['check_name']
+
+            skip, source_code_comments = \
+                skip_report(report_hash,
+                            source_file,
+                            report_line,
+                            checker_name,
+                            self.src_comment_handler,
+                            self.src_comment_status_filter)
+
+            if skip:
+                continue
+
+            if self._trim_path_prefixes:
+                report.trim_path_prefixes(self._trim_path_prefixes)
+
+            trimmed_source_file = \
+                report.files[last_report_event['location']['file']]
+
+            file_stats[f_path] += 1
+            severity = self.__severity_map.get(checker_name)
+            severity_stats[severity] += 1
+            report_count["report_count"] += 1
+
+            review_status = None
+            if len(source_code_comments) == 1:
+                review_status = source_code_comments[0]['status']
+
+            output.write(self.__format_bug_event(checker_name,
+                                                 severity,
+                                                 last_report_event,
+                                                 trimmed_source_file,
+                                                 review_status))
+            output.write('\n')
+
+            # Print source code comments.
+            for source_code_comment in source_code_comments:
+                output.write(source_code_comment['line'].rstrip())
                 output.write('\n')
 
-                # Print source code comments.
-                for source_code_comment in source_code_comments:
-                    output.write(source_code_comment['line'].rstrip())
-                    output.write('\n')
+            output.write(self.__format_location(last_report_event,
+                                                source_file))
+            output.write('\n')
 
-                output.write(self.__format_location(last_report_event,
-                                                    source_file))
-                output.write('\n')
+            if self.print_steps:
+                output.write('  Report hash: ' + report_hash + '\n')
 
-                if self.print_steps:
-                    output.write('  Report hash: ' + report_hash + '\n')
-
-                    # Print out macros.
-                    macros = report.macro_expansions
-                    if macros:
-                        output.write('  Macro expansions:\n')
-
-                        index_format = '    %%%dd, ' % \
-                                       int(math.floor(
-                                           math.log10(len(macros))) + 1)
-
-                        for index, macro in enumerate(macros):
-                            output.write(index_format % (index + 1))
-                            source = report.files[
-                                macro['location']['file']]
-                            output.write(self.__format_macro_expansion(macro,
-                                                                       source))
-                            output.write('\n')
-
-                    # Print out notes.
-                    notes = report.notes
-                    if notes:
-                        output.write('  Notes:\n')
-
-                        index_format = '    %%%dd, ' % \
-                                       int(math.floor(
-                                           math.log10(len(notes))) + 1)
-
-                        for index, note in enumerate(notes):
-                            output.write(index_format % (index + 1))
-                            source_file = report.files[
-                                note['location']['file']]
-                            output.write(self.__format_bug_note(note,
-                                                                source_file))
-                            output.write('\n')
-
-                    output.write('  Steps:\n')
+                # Print out macros.
+                macros = report.macro_expansions
+                if macros:
+                    output.write('  Macro expansions:\n')
 
                     index_format = '    %%%dd, ' % \
-                                   int(math.floor(math.log10(len(events))) + 1)
+                                   int(math.floor(
+                                       math.log10(len(macros))) + 1)
 
-                    for index, event in enumerate(events):
+                    for index, macro in enumerate(macros):
                         output.write(index_format % (index + 1))
-                        source_file = report.files[event['location']['file']]
-                        output.write(
-                            self.__format_bug_event(None,
-                                                    None,
-                                                    event,
-                                                    source_file))
+                        source = report.files[
+                            macro['location']['file']]
+                        output.write(self.__format_macro_expansion(macro,
+                                                                   source))
                         output.write('\n')
-                output.write('\n')
 
-                non_suppressed += 1
+                # Print out notes.
+                notes = report.notes
+                if notes:
+                    output.write('  Notes:\n')
 
-            base_file = os.path.basename(file_path)
-            if non_suppressed == 0:
-                output.write('Found no defects in %s\n' % base_file)
-            else:
-                output.write('Found %d defect(s) in %s\n\n' %
-                             (non_suppressed, base_file))
+                    index_format = '    %%%dd, ' % \
+                                   int(math.floor(
+                                       math.log10(len(notes))) + 1)
+
+                    for index, note in enumerate(notes):
+                        output.write(index_format % (index + 1))
+                        source_file = report.files[
+                            note['location']['file']]
+                        output.write(self.__format_bug_note(note,
+                                                            source_file))
+                        output.write('\n')
+
+                output.write('  Steps:\n')
+
+                index_format = '    %%%dd, ' % \
+                               int(math.floor(math.log10(len(events))) + 1)
+
+                for index, event in enumerate(events):
+                    output.write(index_format % (index + 1))
+                    source_file = report.files[event['location']['file']]
+                    output.write(
+                        self.__format_bug_event(None,
+                                                None,
+                                                event,
+                                                source_file))
+                    output.write('\n')
+            output.write('\n')
+
+            non_suppressed += 1
+
+        base_file = os.path.basename(file_path)
+        if non_suppressed == 0:
+            output.write('Found no defects in %s\n' % base_file)
+        else:
+            output.write('Found %d defect(s) in %s\n\n' %
+                         (non_suppressed, base_file))
 
         return {"severity": severity_stats,
                 "files":  file_stats,
                 "reports": report_count}
 
 
+# Formatter of the worker processes of a parallel parse.
+_PLIST_PLTF = None
+
+
+def _init_worker(plist_pltf):
+    """ Set the formatter used by the worker process. """
+    global _PLIST_PLTF
+    _PLIST_PLTF = plist_pltf
+
+
+def _format_source_file_reports(params):
+    """ Format the reports of a source file in a worker process. """
+    file_path, reports = params
+
+    output = io.StringIO()
+    stats = _PLIST_PLTF.write_source_file_reports(file_path, reports, output)
+
+    return output.getvalue(), stats
+
+
+def _parse_plist_file(params):
+    """
+    Parse a plist file in a worker process. Returns the changed source files
+    and the reports of the source files.
+    """
+    plist_file, metadata = params
+
+    file_report_map = {}
+    changed_files = parse_with_plt_formatter(plist_file, metadata,
+                                             _PLIST_PLTF, file_report_map)
+
+    return changed_files, file_report_map
+
+
+def _add_stats(stats, severity_stats, file_stats, report_count):
+    """ Add the statistics of a source file to the total statistics. """
+    for severity, count in stats['severity'].items():
+        severity_stats[severity] += count
+
+    for file_path, count in stats['files'].items():
+        file_stats[file_path] += count
+
+    for key, count in stats['reports'].items():
+        report_count[key] += count
+
+
 def skip_report(report_hash, source_file, report_line, checker_name,
                 src_comment_handler=None, src_comment_status_filter=None):
     """
@@ -312,20 +423,18 @@ def skip_report(report_hash, source_file, report_line, checker_name,
                   report_line, checker_name, report_hash)
         return True, []
 
-    sc_handler = SourceCodeCommentHandler()
-
     src_comment_data = []
-    # Check for source code comment.
-    with open(source_file, encoding='utf-8', errors='ignore') as sf:
-        try:
-            src_comment_data = sc_handler.filter_source_line_comments(
-                sf,
-                report_line,
-                checker_name)
-        except SpellException as ex:
-            LOG.warning("%s contains %s",
-                        os.path.basename(source_file),
-                        str(ex))
+    # Check for source code comment. The source code comments of the file
+    # are indexed once for all of its reports.
+    comment_index = get_source_code_comment_index(source_file)
+    try:
+        src_comment_data = comment_index.filter_source_line_comments(
+            report_line,
+            checker_name)
+    except SpellException as ex:
+        LOG.warning("%s contains %s",
+                    os.path.basename(source_file),
+                    str(ex))
 
     if not src_comment_data:
         skip = True if src_comment_status_filter and \
@@ -440,6 +549,8 @@ def add_arguments_to_parser(parser):
                              required=False,
                              choices=EXPORT_TYPES,
                              help="R|Specify extra output format type.\n"
+                                  "'jsonl' format writes the reports of the "
+                                  "'json' format one per line.\n"
                                   "'codeclimate' format can be used for "
                                   "Code Climate and for GitLab integration. "
                                   "For more information see:\n"
@@ -509,6 +620,17 @@ def add_arguments_to_parser(parser):
                              "If multiple prefix is given, the longest match "
                              "will be removed.")
 
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        dest="jobs",
+                        required=False,
+                        default=1,
+                        help="Number of processes to use for parsing the "
+                             "result files and formatting the reports. The "
+                             "reports are printed in the same order "
+                             "regardless of the number of processes. It is "
+                             "not used by the 'html' export.")
+
     parser.add_argument('--review-status',
                         nargs='*',
                         dest="review_status",
@@ -554,6 +676,13 @@ def parse_with_plt_formatter(plist_file: str,
         if analyzed_source_file not in file_report_map:
             file_report_map[analyzed_source_file] = []
 
+    # The summary written by the analysis tells if there is any report in
+    # the plist file without parsing it.
+    summary = plist_parser.load_summary(plist_file)
+    if summary and not summary['report_count'] and not summary['files']:
+        LOG.debug("No reports in '%s'.", plist_file)
+        return set()
+
     files, reports = plist_pltf.parse(plist_file)
     plist_mtime = util.get_last_mod_time(plist_file)
 
@@ -587,16 +716,54 @@ def parse_with_plt_formatter(plist_file: str,
     return changed_files
 
 
-def parse_convert_reports(input_dirs: List[str],
-                          out_format: str,
-                          severity_map: Dict,
-                          trim_path_prefixes: List[str]) -> Dict:
-    """Parse and convert the reports from the input dirs to the out_format.
+def parse_plist_files(plist_files: List[str],
+                      metadata: Dict,
+                      plist_pltf: PlistToPlaintextFormatter,
+                      file_report_map: Dict[str, List[Report]],
+                      jobs: int = 1) -> Set:
+    """Parse the plist files with plaintext formatter in jobs processes.
 
-    Retuns a dictionary which can be converted to the out_format type of
-    json to be printed out or saved on the disk.
+    The reports are collected into the file_report_map in the order of the
+    plist files. Returns the changed source files.
     """
+    changed_files = set()
+
+    if jobs > 1 and len(plist_files) > 1:
+        chunksize = max(len(plist_files) // (jobs * 4), 1)
+        with multiprocessing.Pool(jobs,
+                                  initializer=_init_worker,
+                                  initargs=(plist_pltf,)) as pool:
+            results = pool.imap(_parse_plist_file,
+                                [(plist_file, metadata)
+                                 for plist_file in plist_files],
+                                chunksize)
+
+            for f_change, plist_report_map in results:
+                changed_files.update(f_change)
+                for file_path, reports in plist_report_map.items():
+                    if file_path not in file_report_map:
+                        file_report_map[file_path] = []
+
+                    file_report_map[file_path].extend(reports)
+    else:
+        for plist_file in plist_files:
+            f_change = parse_with_plt_formatter(plist_file,
+                                                metadata,
+                                                plist_pltf,
+                                                file_report_map)
+            changed_files.update(f_change)
+
+    return changed_files
 
+
+def iter_reports(input_dirs: List[str],
+                 skip_bug_path: bool,
+                 trim_path_prefixes: List[str]) -> Iterator[Report]:
+    """Iterate over the reports of the plist files in the input dirs.
+
+    The plist files are parsed one by one in the order of their paths and
+    the reports are yielded as soon as they are parsed.
+    """
     input_files = set()
     for input_path in input_dirs:
         input_path = os.path.abspath(input_path)
@@ -608,28 +775,50 @@ def parse_convert_reports(input_dirs: List[str],
                            in file_names]
             input_files.update(input_paths)
 
-    all_reports = []
-    for input_file in input_files:
+    for input_file in sorted(input_files):
         if not input_file.endswith('.plist'):
             continue
-        _, reports = plist_parser.parse_plist_file(input_file)
-        all_reports.extend(reports)
 
-    if trim_path_prefixes:
-        for report in all_reports:
-            report.trim_path_prefixes(trim_path_prefixes)
+        for report in plist_parser.iter_plist_reports(input_file,
+                                                      skip_bug_path,
+                                                      use_cache=True):
+            if trim_path_prefixes:
+                report.trim_path_prefixes(trim_path_prefixes)
+            yield report
+
+
+def write_converted_reports(input_dirs: List[str],
+                            out_format: str,
+                            severity_map: Dict,
+                            trim_path_prefixes: List[str],
+                            output: TextIO) -> int:
+    """Parse and write the reports from the input dirs in the out_format.
+
+    The reports are converted and written while the plist files are parsed,
+    so they are not collected in the memory (except for the review comments
+    of the gerrit format which are grouped by files). Returns the number of
+    the written reports.
+    """
+    # The bug path is needed only by the json formats.
+    skip_bug_path = out_format not in ["json", "jsonl"]
+
+    reports = iter_reports(input_dirs, skip_bug_path, trim_path_prefixes)
 
     if out_format == "codeclimate":
-        return codeclimate.convert(all_reports)
+        return codeclimate.write(reports, output)
 
     if out_format == "gerrit":
-        return gerrit.convert(all_reports, severity_map)
+        return gerrit.write(reports, severity_map, output)
 
     if out_format == "json":
-        return [out_json.convert_to_parse(r) for r in all_reports]
+        return out_json.write(reports, output)
+
+    if out_format == "jsonl":
+        return out_json.write_lines(
+            (out_json.convert_to_parse(r) for r in reports), output)
 
     LOG.error(f"Unknown export format: {out_format}")
-    return {}
+    return 0
 
 
 def main(args):
@@ -693,6 +882,12 @@ def main(args):
 
     processed_path_hashes = set()
 
+    jobs = max(args.jobs, 1) if 'jobs' in args else 1
+
+    # The source code suppressions are written to the suppress file while
+    # the reports are formatted, so they are formatted sequentially.
+    write_jobs = 1 if 'create_suppress' in args else jobs
+
     skip_handler = None
     if 'skipfile' in args:
         with open(args.skipfile, 'r',
@@ -709,27 +904,53 @@ def main(args):
 
         # The HTML part will be handled separately below.
         if export != 'html':
+            reports_file = None
+            if 'output_path' in args:
+                output_path = os.path.abspath(args.output_path)
+
+                if not os.path.exists(output_path):
+                    os.mkdir(output_path)
+
+                reports_file = os.path.join(
+                    output_path,
+                    'reports.jsonl' if export == 'jsonl' else 'reports.json')
+
+            # The reports are written to a temporary file while the plist
+            # files are parsed, so a parse error does not leave a truncated
+            # output behind.
+            if reports_file:
+                tmp_file = reports_file + '.tmp'
+            else:
+                tmp_fd, tmp_file = tempfile.mkstemp(prefix='reports_')
+                os.close(tmp_fd)
+
             try:
-                res = parse_convert_reports(args.input,
+                with open(tmp_file, mode='w',
+                          encoding='utf-8', errors="ignore") as output_f:
+                    write_converted_reports(args.input,
                                             export,
                                             context.severity_map,
-                                            trim_path_prefixes)
-                if 'output_path' in args:
-                    output_path = os.path.abspath(args.output_path)
+                                            trim_path_prefixes,
+                                            output_f)
 
-                    if not os.path.exists(output_path):
-                        os.mkdir(output_path)
+                # The written file is printed without parsing the reports
+                # again.
+                with open(tmp_file, mode='r',
+                          encoding='utf-8', errors="ignore") as output_f:
+                    shutil.copyfileobj(output_f, sys.stdout)
 
-                    reports_json = os.path.join(output_path, 'reports.json')
-                    with open(reports_json,
-                              mode='w',
-                              encoding='utf-8', errors="ignore") as output_f:
-                        output_f.write(json.dumps(res))
+                if export != 'jsonl':
+                    sys.stdout.write('\n')
 
-                return print(json.dumps(res))
+                if reports_file:
+                    os.replace(tmp_file, reports_file)
+                return
             except Exception as ex:
                 LOG.error(ex)
                 sys.exit(1)
+            finally:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
 
     def trim_path_prefixes_handler(source_file):
         """
@@ -839,14 +1060,13 @@ def main(args):
                                                src_comment_status_filter)
         plist_pltf.print_steps = 'print_steps' in args
 
-        for file_path in files:
-            f_change = parse_with_plt_formatter(file_path,
-                                                metadata_dict,
-                                                plist_pltf,
-                                                file_report_map)
-            file_change = file_change.union(f_change)
+        file_change.update(parse_plist_files(files,
+                                             metadata_dict,
+                                             plist_pltf,
+                                             file_report_map,
+                                             jobs))
 
-        report_stats = plist_pltf.write(file_report_map)
+        report_stats = plist_pltf.write(file_report_map, jobs=write_jobs)
         sev_stats = report_stats.get('severity')
         for severity in sev_stats:
             severity_stats[severity] += sev_stats[severity]
@@ -0,0 +1,165 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Manifests for incremental analysis.
+
+After a successful analysis a manifest is written for the analyzed
+translation unit. It contains the hash of the analysis configuration (the
+analyzer command line, the analyzer binary, the skip list and the report hash
+type) and the content hash of every file the translation unit consists of.
+A translation unit has to be analyzed again only if its configuration or the
+content of any of these files changed.
+"""
+
+
+import hashlib
+import json
+import os
+
+from codechecker_common.logger import get_logger
+
+LOG = get_logger('analyzer')
+
+# Version of the manifest format. Manifests with a different version are
+# considered to be outdated.
+MANIFEST_VERSION = 1
+
+
+def get_manifest_file(manifest_dir, result_file):
+    """ Get the manifest file path which belongs to the given result file. """
+    return os.path.join(manifest_dir, os.path.basename(result_file) + '.json')
+
+
+def get_file_hash(file_path):
+    """ Get the SHA-256 hash of the file content. """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+
+    return sha.hexdigest()
+
+
+def get_config_hash(analyzer_cmd, report_hash_type, skip_handler):
+    """
+    Get the hash of the configuration which influences the analysis result
+    of a translation unit besides the content of the analyzed files.
+    """
+    config = [MANIFEST_VERSION, analyzer_cmd, report_hash_type,
+              skip_handler.skip_file_lines if skip_handler else []]
+
+    # The analyzer binary can be replaced by a different version without
+    # changing the analyzer command.
+    if analyzer_cmd:
+        try:
+            stat = os.stat(os.path.realpath(analyzer_cmd[0]))
+            config.extend([stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            pass
+
+    return hashlib.sha256(json.dumps(config).encode('utf-8')).hexdigest()
+
+
+def is_up_to_date(manifest_file, config_hash, result_file):
+    """
+    Returns True if the translation unit belonging to the given manifest does
+    not need to be analyzed again.
+
+    The content of a file is hashed only if its size or modification time
+    differs from the one recorded in the manifest.
+    """
+    if not os.path.exists(manifest_file) or not os.path.exists(result_file):
+        return False
+
+    try:
+        with open(manifest_file, 'r',
+                  encoding='utf-8', errors='ignore') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as ex:
+        LOG.debug("Failed to load manifest file %s: %s", manifest_file, ex)
+        return False
+
+    if manifest.get('config_hash') != config_hash:
+        LOG.debug("Analysis configuration of %s changed.",
+                  manifest.get('source'))
+        return False
+
+    for file_path, (mtime, size, content_hash) in \
+            manifest.get('files', {}).items():
+        try:
+            stat = os.stat(file_path)
+            if stat.st_mtime_ns == mtime and stat.st_size == size:
+                continue
+
+            if get_file_hash(file_path) != content_hash:
+                LOG.debug("File %s of %s changed.", file_path,
+                          manifest.get('source'))
+                return False
+        except OSError:
+            LOG.debug("File %s of %s is missing.", file_path,
+                      manifest.get('source'))
+            return False
+
+    return True
+
+
+def collect_manifest(config_hash, action):
+    """
+    Collect the files of the translation unit of the given build action and
+    return the manifest of the translation unit.
+
+    It should be called before the analysis, so a file modified during the
+    analysis will be detected by the next run. If the files of the
+    translation unit can not be collected None is returned, so the
+    translation unit will be analyzed again next time.
+    """
+    from tu_collector import tu_collector
+
+    dependencies, error = tu_collector.get_dependent_headers(
+        action.original_command, action.directory)
+
+    if error:
+        LOG.debug("Failed to collect the files of %s, it will be analyzed "
+                  "again next time.", action.source)
+        return None
+
+    dependencies.add(action.source)
+
+    files = {}
+    try:
+        for dependency in dependencies:
+            file_path = os.path.normpath(dependency)
+            stat = os.stat(file_path)
+            files[file_path] = [stat.st_mtime_ns, stat.st_size,
+                                get_file_hash(file_path)]
+    except OSError as oerr:
+        LOG.debug("Failed to hash the files of %s: %s", action.source, oerr)
+        return None
+
+    return {'version': MANIFEST_VERSION,
+            'source': action.source,
+            'config_hash': config_hash,
+            'files': files}
+
+
+def write_manifest(manifest_file, manifest):
+    """ Write the manifest of a successfully analyzed translation unit. """
+    if not manifest:
+        remove_manifest(manifest_file)
+        return
+
+    with open(manifest_file, 'w', encoding='utf-8', errors='ignore') as f:
+        json.dump(manifest, f)
+
+
+def remove_manifest(manifest_file):
+    """ Remove the manifest so the translation unit will be reanalyzed. """
+    try:
+        os.remove(manifest_file)
+    except OSError:
+        pass
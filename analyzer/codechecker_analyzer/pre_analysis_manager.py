@@ -83,18 +83,26 @@ def init_worker(checked_num, action_num):
 
 
 def pre_analyze(params):
+    """
+    Run the pre analysis of the given build action.
+
+    Returns the analyzed source file and the resource usage of the CTU pre
+    analysis steps or None if nothing was executed.
+    """
     action, context, clangsa_config, skip_handler, \
         ctu_data, statistics_data = params
 
+    pre_analysis_stats = {}
+
     analyzer_environment = env.extend(context.path_env_extra,
                                       context.ld_lib_path_extra)
 
     progress_checked_num.value += 1
 
     if skip_handler and skip_handler.should_skip(action.source):
-        return
+        return None
     if action.analyzer_type != ClangSA.ANALYZER_NAME:
-        return
+        return None
 
     _, source_filename = os.path.split(action.source)
 
@@ -115,23 +123,34 @@ def pre_analyze(params):
 
             # TODO: reorganize the various ctu modes parameters
             # Dump-based analysis requires serialized ASTs.
+            ast_path = None
             if clangsa_config.ctu_on_demand:
                 ctu_manager.generate_invocation_list(triple_arch, action,
                                                      action.source,
                                                      clangsa_config,
                                                      analyzer_environment)
             else:
-                ctu_manager.generate_ast(triple_arch, action, action.source,
-                                         clangsa_config, analyzer_environment)
+                ast_path, pre_analysis_stats['ctu_generate_ast'] = \
+                    ctu_manager.generate_ast(triple_arch, action,
+                                             action.source, clangsa_config,
+                                             analyzer_environment)
             # On-demand analysis does not require AST-dumps.
             # We map the function names to corresponding sources of ASTs.
             # In case of On-demand analysis this source is the original source
             # code. In case of AST-dump based analysis these sources are the
-            # generated AST-dumps.
-            ctu_manager.map_functions(triple_arch, action, action.source,
-                                      clangsa_config, analyzer_environment,
-                                      ctu_func_map_cmd,
-                                      ctu_temp_fnmap_folder)
+            # generated AST-dumps. If the mapping tool is capable of it, the
+            # function definitions are collected from the AST-dump, so the
+            # translation unit is parsed only once.
+            if not ctu_data.get('ctu_func_map_from_ast'):
+                ast_path = None
+
+            pre_analysis_stats['ctu_map_functions'] = \
+                ctu_manager.map_functions(triple_arch, action, action.source,
+                                          clangsa_config,
+                                          analyzer_environment,
+                                          ctu_func_map_cmd,
+                                          ctu_temp_fnmap_folder,
+                                          ast_path)
 
     except Exception as ex:
         LOG.debug_analyzer(str(ex))
@@ -152,11 +171,36 @@ def pre_analyze(params):
         traceback.print_exc(file=sys.stdout)
         raise
 
+    return action.source, pre_analysis_stats
+
+
+def log_step_durations(pre_analysis_statistics):
+    """
+    Log the total wall clock time of the individual pre analysis steps of
+    the translation units.
+    """
+    durations = {}
+    for pre_analysis_stats in pre_analysis_statistics.values():
+        for step, resource_usage in pre_analysis_stats.items():
+            if not resource_usage or 'wall_time' not in resource_usage:
+                continue
+
+            count, wall_time = durations.get(step, (0, 0.0))
+            durations[step] = (count + 1,
+                               wall_time + resource_usage['wall_time'])
+
+    for step, (count, wall_time) in sorted(durations.items()):
+        LOG.info("Pre-analysis step '%s' took %.2f seconds for %d "
+                 "translation unit(s).", step, wall_time, count)
+
 
 def run_pre_analysis(actions, context, clangsa_config,
                      jobs, skip_handler, ctu_data, statistics_data, manager):
     """
     Run multiple pre analysis jobs before the actual analysis.
+
+    Returns a dict which maps the source files to the resource usage of
+    their CTU pre analysis steps.
     """
     LOG.info('Pre-analysis started.')
     if ctu_data:
@@ -202,22 +246,39 @@ def run_pre_analysis(actions, context, clangsa_config,
                            for build_action in actions]
         # FIXME: Ensure all shared data structures are wrapped in manager
         #        proxy objects before passing them to other processes via
-        #        map_async.
+        #        imap_unordered.
         #        Note that even deep-copying is known to be insufficient.
-        pool.map_async(pre_analyze, collect_actions)
+        result_it = pool.imap_unordered(pre_analyze, collect_actions)
         pool.close()
+
+        pre_analysis_statistics = {}
+        while True:
+            try:
+                result = result_it.next()
+            except StopIteration:
+                break
+            except Exception:
+                # The error was already logged by the failed worker.
+                continue
+
+            if result and result[1]:
+                source, pre_analysis_stats = result
+                pre_analysis_statistics[source] = pre_analysis_stats
     except Exception:
         pool.terminate()
         raise
     finally:
         pool.join()
 
+    log_step_durations(pre_analysis_statistics)
+
     # Postprocessing the pre analysis results.
     if ctu_data:
         ctu_manager.merge_clang_extdef_mappings(
                 ctu_data.get('ctu_dir'),
                 ctu_data.get('ctu_func_map_file'),
-                ctu_data.get('ctu_temp_fnmap_folder'))
+                ctu_data.get('ctu_temp_fnmap_folder'),
+                ctu_data.get('ctu_keep_temp_fnmap', False))
 
     if statistics_data:
 
@@ -234,3 +295,5 @@ def run_pre_analysis(actions, context, clangsa_config,
             LOG.debug('Cleaning up temporary statistics directory')
             shutil.rmtree(stats_in)
     LOG.info('Pre-analysis finished.')
+
+    return pre_analysis_statistics
@@ -0,0 +1,274 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Merge the output directories of the shards of a distributed analysis into a
+single output directory.
+"""
+
+
+import copy
+import json
+import os
+import shutil
+
+from codechecker_common.logger import get_logger
+from codechecker_common.util import load_json_or_empty
+
+from .analyzers.clangsa import ctu_manager
+
+LOG = get_logger('analyzer')
+
+# Subdirectories of the output directory of which the content is merged.
+RESULT_SUBDIRS = ['failed', 'success', 'fixit', 'ctu_connections']
+
+# Files of the output directory which are merged instead of copied.
+MERGED_FILES = ['metadata.json', 'unique_compile_commands.json']
+
+CTU_DIR = 'ctu-dir'
+INVOCATION_LIST = 'invocation-list.yml'
+
+
+def __copy_tree(src_dir, dst_dir):
+    """
+    Copy the content of the source directory into the destination directory.
+    Existing files are overwritten.
+    """
+    for root, _, files in os.walk(src_dir):
+        target_dir = os.path.join(dst_dir, os.path.relpath(root, src_dir))
+        if not os.path.isdir(target_dir):
+            os.makedirs(target_dir)
+
+        for f in files:
+            shutil.copy2(os.path.join(root, f), os.path.join(target_dir, f))
+
+
+def __get_codechecker_tool(metadata):
+    """ Get the tool section of the metadata written by CodeChecker. """
+    for tool in metadata.get('tools', []):
+        if tool.get('name') == 'codechecker':
+            return tool
+    return None
+
+
+def __check_shards(tools):
+    """ Warn if the merged output directories are not a complete analysis. """
+    shards = [tool['shard'] for tool in tools if 'shard' in tool]
+    if not shards:
+        return
+
+    counts = set(shard['count'] for shard in shards)
+    if len(counts) > 1:
+        LOG.warning("The output directories belong to analyses with different "
+                    "number of shards: %s",
+                    ', '.join(str(c) for c in sorted(counts)))
+        return
+
+    indices = [shard['index'] for shard in shards]
+    missing = sorted(set(range(1, counts.pop() + 1)) - set(indices))
+    if missing:
+        LOG.warning("The output directories of the following shards are "
+                    "missing: %s", ', '.join(str(i) for i in missing))
+
+    duplicates = sorted(set(i for i in indices if indices.count(i) > 1))
+    if duplicates:
+        LOG.warning("The following shards are merged multiple times: %s",
+                    ', '.join(str(i) for i in duplicates))
+
+
+def merge_metadata(metadata_list, output_dir):
+    """
+    Merge the metadata of the shards into the metadata of a single analysis
+    into the given output directory.
+    """
+    tools = [tool for tool in map(__get_codechecker_tool, metadata_list)
+             if tool]
+    if not tools:
+        return {}
+
+    __check_shards(tools)
+
+    merged = copy.deepcopy(tools[0])
+    merged.pop('shard', None)
+    merged['output_path'] = output_dir
+    merged['action_num'] = sum(tool.get('action_num', 0) for tool in tools)
+    merged['skipped'] = sum(tool.get('skipped', 0) for tool in tools)
+
+    # Result files are referred by their path in the output directory.
+    merged['result_source_files'] = {}
+    for tool in tools:
+        for plist, source in tool.get('result_source_files', {}).items():
+            plist = os.path.join(output_dir, os.path.basename(plist))
+            merged['result_source_files'][plist] = source
+
+    timestamps = [tool['timestamps'] for tool in tools if 'timestamps' in tool]
+    if timestamps:
+        merged['timestamps'] = {
+            'begin': min(t['begin'] for t in timestamps),
+            'end': max(t['end'] for t in timestamps)}
+
+    merged['analyzers'] = {}
+    for tool in tools:
+        for analyzer_type, analyzer in tool.get('analyzers', {}).items():
+            if analyzer_type not in merged['analyzers']:
+                merged['analyzers'][analyzer_type] = {
+                    'checkers': {},
+                    'analyzer_statistics': {
+                        'failed': 0,
+                        'failed_sources': [],
+                        'successful': 0,
+                        'version': None},
+                    'tu_statistics': {}}
+
+            merged_analyzer = merged['analyzers'][analyzer_type]
+
+            checkers = merged_analyzer['checkers']
+            for checker, enabled in analyzer.get('checkers', {}).items():
+                checkers[checker] = checkers.get(checker, False) or enabled
+
+            statistics = merged_analyzer['analyzer_statistics']
+            shard_statistics = analyzer.get('analyzer_statistics', {})
+            statistics['failed'] += shard_statistics.get('failed', 0)
+            statistics['failed_sources'].extend(
+                shard_statistics.get('failed_sources', []))
+            statistics['successful'] += shard_statistics.get('successful', 0)
+            if not statistics['version']:
+                statistics['version'] = shard_statistics.get('version')
+
+            merged_analyzer['tu_statistics'].update(
+                analyzer.get('tu_statistics', {}))
+
+    return {'version': 2, 'tools': [merged]}
+
+
+def __merge_ctu_dirs(ctu_dirs, output_ctu_dir):
+    """
+    Merge the CTU directories of the shards. The function maps of the
+    translation units are merged again, so a function defined in multiple
+    shards is left out from the merged map just like in case of a single
+    analysis.
+    """
+    shutil.rmtree(output_ctu_dir, ignore_errors=True)
+
+    map_file_names = set()
+
+    for shard_num, ctu_dir in enumerate(ctu_dirs):
+        for triple_arch in os.listdir(ctu_dir):
+            triple_path = os.path.join(ctu_dir, triple_arch)
+            if not os.path.isdir(triple_path):
+                continue
+
+            output_triple_path = os.path.join(output_ctu_dir, triple_arch)
+            fnmap_dir = os.path.join(output_triple_path,
+                                     ctu_manager.TEMP_FNMAP_FOLDER)
+            if not os.path.isdir(fnmap_dir):
+                os.makedirs(fnmap_dir)
+
+            has_fnmaps = False
+            shard_map_file = None
+            for entry in os.listdir(triple_path):
+                path = os.path.join(triple_path, entry)
+                if entry == ctu_manager.TEMP_FNMAP_FOLDER:
+                    for fnmap in os.listdir(path):
+                        shutil.copy2(os.path.join(path, fnmap),
+                                     os.path.join(fnmap_dir, '{0}_{1}'.format(
+                                         shard_num, fnmap)))
+                    has_fnmaps = True
+                elif os.path.isdir(path):
+                    __copy_tree(path, os.path.join(output_triple_path, entry))
+                elif entry == INVOCATION_LIST:
+                    with open(path, 'r',
+                              encoding='utf-8', errors='ignore') as src, \
+                            open(os.path.join(output_triple_path, entry), 'a',
+                                 encoding='utf-8', errors='ignore') as dst:
+                        shutil.copyfileobj(src, dst)
+                else:
+                    shard_map_file = path
+                    map_file_names.add(entry)
+
+            # The individual function maps are not available if the shard
+            # was not collected with the --shard option. In this case its
+            # already merged function map is used.
+            if not has_fnmaps and shard_map_file:
+                LOG.warning("Individual function maps are missing in '%s', "
+                            "functions defined in multiple shards may "
+                            "remain in the merged function map.", ctu_dir)
+                shutil.copy2(shard_map_file,
+                             os.path.join(fnmap_dir, '{0}_{1}'.format(
+                                 shard_num,
+                                 os.path.basename(shard_map_file))))
+
+    if len(map_file_names) != 1:
+        LOG.warning("Failed to determine the name of the CTU function map "
+                    "file from: %s", ', '.join(sorted(map_file_names)))
+        return
+
+    ctu_manager.merge_clang_extdef_mappings(output_ctu_dir,
+                                            map_file_names.pop(),
+                                            ctu_manager.TEMP_FNMAP_FOLDER)
+
+
+def merge_result_dirs(input_dirs, output_dir):
+    """
+    Merge the output directories of the analysis of multiple shards into the
+    given output directory.
+    """
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    metadata_list = []
+    compile_commands = []
+    ctu_dirs = []
+
+    for input_dir in input_dirs:
+        LOG.info("Merging '%s'...", input_dir)
+
+        metadata_file = os.path.join(input_dir, 'metadata.json')
+        if os.path.exists(metadata_file):
+            metadata_list.append(load_json_or_empty(metadata_file, {}))
+        else:
+            LOG.warning("Metadata file is missing from '%s'.", input_dir)
+
+        compile_commands_file = os.path.join(input_dir,
+                                             'unique_compile_commands.json')
+        if os.path.exists(compile_commands_file):
+            compile_commands.extend(
+                load_json_or_empty(compile_commands_file, []))
+
+        for entry in os.listdir(input_dir):
+            path = os.path.join(input_dir, entry)
+            output_path = os.path.join(output_dir, entry)
+
+            if os.path.isdir(path):
+                if entry in RESULT_SUBDIRS:
+                    __copy_tree(path, output_path)
+                elif entry == CTU_DIR:
+                    ctu_dirs.append(path)
+            elif entry.endswith('.plist'):
+                if os.path.exists(output_path):
+                    LOG.warning("Result file '%s' is found in multiple "
+                                "output directories.", entry)
+                shutil.copy2(path, output_path)
+            elif entry not in MERGED_FILES and \
+                    not os.path.exists(output_path):
+                # The compilation database, the skip file, etc. are the same
+                # in every shard.
+                shutil.copy2(path, output_path)
+
+    with open(os.path.join(output_dir, 'unique_compile_commands.json'), 'w',
+              encoding='utf-8', errors='ignore') as f:
+        json.dump(compile_commands, f)
+
+    metadata = merge_metadata(metadata_list, output_dir)
+    if metadata:
+        with open(os.path.join(output_dir, 'metadata.json'), 'w',
+                  encoding='utf-8', errors='ignore') as f:
+            json.dump(metadata, f)
+
+    if ctu_dirs:
+        LOG.info("Merging CTU data of %d shards...", len(ctu_dirs))
+        __merge_ctu_dirs(ctu_dirs, os.path.join(output_dir, CTU_DIR))
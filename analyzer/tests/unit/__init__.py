@@ -18,5 +18,8 @@ PKG_ROOT = os.path.join(REPO_ROOT, 'build', 'CodeChecker')
 
 sys.path.append(REPO_ROOT)
 sys.path.append(os.path.join(REPO_ROOT, 'tools', 'codechecker_report_hash'))
+sys.path.append(os.path.join(REPO_ROOT, 'tools', 'plist_to_html'))
 sys.path.append(os.path.join(REPO_ROOT, 'analyzer', 'tools',
                              'statistics_collector'))
+sys.path.append(os.path.join(REPO_ROOT, 'analyzer', 'tools',
+                             'merge_clang_extdef_mappings'))
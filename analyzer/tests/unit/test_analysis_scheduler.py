@@ -0,0 +1,143 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Test ordering the build actions by their predicted analysis time.
+"""
+
+
+from collections import namedtuple
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from codechecker_analyzer import analysis_scheduler
+
+
+Action = namedtuple('Action', 'analyzer_type, source')
+BuildAction = namedtuple('BuildAction', 'source, directory, original_command')
+
+
+class AnalysisSchedulerTest(unittest.TestCase):
+    """
+    Test the longest job first scheduling of the analysis.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+        # Source file name and its size.
+        self.sources = {}
+        for name, size in [('small.cpp', 10), ('medium.cpp', 100),
+                           ('large.cpp', 1000), ('other.cpp', 100)]:
+            path = os.path.join(self.tmp_dir, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('x' * size)
+            self.sources[name] = path
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def __action(self, name, analyzer_type='clangsa'):
+        return Action(analyzer_type, self.sources[name])
+
+    def test_order_by_size(self):
+        """ Without previous statistics the largest source is first. """
+        actions = [self.__action('small.cpp'),
+                   self.__action('medium.cpp'),
+                   self.__action('large.cpp'),
+                   self.__action('other.cpp')]
+
+        ordered = analysis_scheduler.order_by_predicted_cost(actions, {})
+
+        # Actions with the same cost keep their original order.
+        self.assertEqual(ordered, [self.__action('large.cpp'),
+                                   self.__action('medium.cpp'),
+                                   self.__action('other.cpp'),
+                                   self.__action('small.cpp')])
+
+    def test_order_by_previous_analysis_time(self):
+        """ Recorded analysis times take precedence over the file size. """
+        metadata_file = os.path.join(self.tmp_dir, 'metadata.json')
+        with open(metadata_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': 2, 'tools': [{'analyzers': {
+                'clangsa': {'tu_statistics': {
+                    self.sources['small.cpp']: {'wall_time': 50.0},
+                    self.sources['large.cpp']: {'wall_time': 20.0},
+                    self.sources['other.cpp']: {'wall_time': 2.0}}},
+                'clang-tidy': {'tu_statistics': {
+                    self.sources['medium.cpp']: {'wall_time': 100.0}}}}}]},
+                f)
+
+        tu_statistics = analysis_scheduler.load_tu_statistics(metadata_file)
+
+        actions = [self.__action('large.cpp'),
+                   self.__action('medium.cpp'),
+                   self.__action('small.cpp'),
+                   self.__action('other.cpp')]
+
+        ordered = analysis_scheduler.order_by_predicted_cost(actions,
+                                                             tu_statistics)
+
+        # The unknown medium.cpp is estimated by the median speed of the
+        # known analyses: 100 bytes * 0.02 sec/byte = 2 seconds. The
+        # statistics of other analyzers are not taken into account.
+        self.assertEqual(ordered, [self.__action('small.cpp'),
+                                   self.__action('large.cpp'),
+                                   self.__action('medium.cpp'),
+                                   self.__action('other.cpp')])
+
+    def test_missing_metadata(self):
+        """ Missing metadata file results no statistics. """
+        self.assertEqual(analysis_scheduler.load_tu_statistics(
+            os.path.join(self.tmp_dir, 'metadata.json')), {})
+
+    def test_partition_by_cost(self):
+        """ Shards are balanced by the predicted cost. """
+        actions = [BuildAction(self.sources[name], '/build', 'g++ ' + name)
+                   for name in ['small.cpp', 'medium.cpp', 'large.cpp',
+                                'other.cpp']]
+
+        shards = analysis_scheduler.partition_by_predicted_cost(actions, 2,
+                                                                {})
+
+        # The large source is analyzed alone, the others keep their original
+        # order in the other shard.
+        self.assertEqual(shards, [[actions[2]],
+                                  [actions[0], actions[1], actions[3]]])
+
+        # The partition does not depend on the order of the actions.
+        self.assertEqual(analysis_scheduler.partition_by_predicted_cost(
+            list(reversed(actions)), 2, {}),
+            [[actions[2]], [actions[3], actions[1], actions[0]]])
+
+    def test_partition_by_analysis_time(self):
+        """ Analysis times of every analyzer are summed up for a source. """
+        actions = [BuildAction(self.sources[name], '/build', 'g++ ' + name)
+                   for name in ['small.cpp', 'large.cpp', 'other.cpp']]
+
+        tu_statistics = {
+            ('clangsa', self.sources['small.cpp']): {'wall_time': 50.0},
+            ('clang-tidy', self.sources['small.cpp']): {'wall_time': 50.0},
+            ('clangsa', self.sources['large.cpp']): {'wall_time': 60.0},
+            ('clangsa', self.sources['other.cpp']): {'wall_time': 30.0}}
+
+        shards = analysis_scheduler.partition_by_predicted_cost(
+            actions, 2, tu_statistics)
+
+        self.assertEqual(shards, [[actions[0]], [actions[1], actions[2]]])
+
+    def test_more_shards_than_actions(self):
+        """ Some shards are empty if there are not enough actions. """
+        actions = [BuildAction(self.sources['small.cpp'], '/build', 'g++')]
+
+        shards = analysis_scheduler.partition_by_predicted_cost(actions, 3,
+                                                                {})
+
+        self.assertEqual(shards, [actions, [], []])
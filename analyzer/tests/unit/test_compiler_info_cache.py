@@ -0,0 +1,119 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Test the persistent cache of the implicit compiler information probes.
+"""
+
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from codechecker_analyzer.buildlog import compiler_info_cache
+
+
+class CompilerInfoCacheTest(unittest.TestCase):
+    """
+    Test caching of the compiler probe results.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.old_cache_dir = os.environ.get('CC_COMPILER_INFO_CACHE_DIR')
+        os.environ['CC_COMPILER_INFO_CACHE_DIR'] = self.cache_dir
+
+        # Any existing executable can act as a compiler for the cache.
+        self.compiler = sys.executable
+        self.probe_count = 0
+
+    def tearDown(self):
+        if self.old_cache_dir is None:
+            del os.environ['CC_COMPILER_INFO_CACHE_DIR']
+        else:
+            os.environ['CC_COMPILER_INFO_CACHE_DIR'] = self.old_cache_dir
+
+        shutil.rmtree(self.cache_dir)
+
+    def __probe(self):
+        self.probe_count += 1
+        return ['/usr/include', '/usr/local/include']
+
+    def test_probe_result_is_reused(self):
+        """ The probe is executed only once for the same key. """
+        for _ in range(3):
+            value = compiler_info_cache.cached(
+                'includes', self.compiler, ['c', ['-m32']], self.__probe)
+            self.assertEqual(value, ['/usr/include', '/usr/local/include'])
+
+        self.assertEqual(self.probe_count, 1)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_flags_are_part_of_the_key(self):
+        """ Different compiler flags result different cache entries. """
+        compiler_info_cache.cached(
+            'includes', self.compiler, ['c', ['-m32']], self.__probe)
+        compiler_info_cache.cached(
+            'includes', self.compiler, ['c', ['-m64']], self.__probe)
+        compiler_info_cache.cached(
+            'includes', self.compiler, ['c++', ['-m64']], self.__probe)
+
+        self.assertEqual(self.probe_count, 3)
+
+    def test_environment_is_part_of_the_key(self):
+        """ The environment which affects the probes is in the key. """
+        old_cpath = os.environ.pop('CPATH', None)
+        try:
+            compiler_info_cache.cached(
+                'includes', self.compiler, ['c', []], self.__probe)
+
+            os.environ['CPATH'] = '/opt/include'
+            compiler_info_cache.cached(
+                'includes', self.compiler, ['c', []], self.__probe)
+            compiler_info_cache.cached(
+                'includes', self.compiler, ['c', []], self.__probe)
+        finally:
+            if old_cpath is None:
+                os.environ.pop('CPATH', None)
+            else:
+                os.environ['CPATH'] = old_cpath
+
+        self.assertEqual(self.probe_count, 2)
+
+    def test_failed_probe_is_not_cached(self):
+        """ Probes which could not execute the compiler are not cached. """
+        def failed_probe():
+            self.probe_count += 1
+
+        for _ in range(2):
+            self.assertIsNone(compiler_info_cache.cached(
+                'target', self.compiler, [], failed_probe))
+
+        self.assertEqual(self.probe_count, 2)
+        self.assertFalse(os.listdir(self.cache_dir))
+
+    def test_unknown_compiler_is_not_cached(self):
+        """ Probes of compilers which can not be found are not cached. """
+        for _ in range(2):
+            compiler_info_cache.cached(
+                'target', 'non-existing-compiler-binary', [], self.__probe)
+
+        self.assertEqual(self.probe_count, 2)
+        self.assertFalse(os.listdir(self.cache_dir))
+
+    def test_disable_cache(self):
+        """ Empty cache directory disables the cache. """
+        os.environ['CC_COMPILER_INFO_CACHE_DIR'] = ''
+
+        for _ in range(2):
+            compiler_info_cache.cached(
+                'target', self.compiler, [], self.__probe)
+
+        self.assertEqual(self.probe_count, 2)
+        self.assertFalse(os.listdir(self.cache_dir))
@@ -0,0 +1,105 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Test generating the CTU function maps of the translation units.
+"""
+
+
+from collections import namedtuple
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+from codechecker_analyzer.analyzers.clangsa import ctu_manager
+
+
+Config = namedtuple('Config', 'ctu_dir, ctu_on_demand')
+Action = namedtuple('Action', 'directory')
+
+
+class CTUFunctionMapTest(unittest.TestCase):
+    """
+    Test mapping the function definitions to the AST dumps.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = Config(os.path.join(self.tmp_dir, 'ctu-dir'), False)
+        self.ast_path = ctu_manager.get_ast_path(self.config, 'x86_64',
+                                                 '/src/main.cpp')
+
+        # Mapping tool which collects the definitions from an AST dump.
+        self.func_map_cmd = os.path.join(self.tmp_dir, 'clang-extdef-mapping')
+        with open(self.func_map_cmd, 'w', encoding='utf-8') as f:
+            f.write("#!{0}\n"
+                    "import sys\n"
+                    "print('c:@F@foo ' + sys.argv[1])\n"
+                    "print('c:@F@bar ' + sys.argv[1])\n"
+                    .format(sys.executable))
+        os.chmod(self.func_map_cmd, stat.S_IRWXU)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_relative_ast_paths(self):
+        """ Paths of the AST dumps are relative to the target directory. """
+        triple_arch_dir = os.path.join(self.config.ctu_dir, 'x86_64')
+        self.assertEqual(
+            ctu_manager.func_map_list_ast_to_relative(
+                ['c:@F@foo ' + self.ast_path, 'c:@F@bar /other.cpp.ast'],
+                self.ast_path, triple_arch_dir),
+            ['c:@F@foo ast/src/main.cpp.ast', 'c:@F@bar /other.cpp.ast'])
+
+        # The same path is mapped from the source file when the definitions
+        # are collected by parsing the source file.
+        self.assertEqual(
+            ctu_manager.func_map_list_src_to_ast(['c:@F@foo /src/main.cpp'],
+                                                 False),
+            ['c:@F@foo ast/src/main.cpp.ast'])
+
+    def test_map_functions_from_ast(self):
+        """ Function map is generated from the AST dump. """
+        resource_usage = ctu_manager.map_functions(
+            'x86_64', Action(self.tmp_dir), '/src/main.cpp', self.config,
+            None, self.func_map_cmd, ctu_manager.TEMP_FNMAP_FOLDER,
+            self.ast_path)
+
+        self.assertIn('wall_time', resource_usage)
+
+        fnmap_dir = os.path.join(self.config.ctu_dir, 'x86_64',
+                                 ctu_manager.TEMP_FNMAP_FOLDER)
+        fnmaps = os.listdir(fnmap_dir)
+        self.assertEqual(len(fnmaps), 1)
+
+        with open(os.path.join(fnmap_dir, fnmaps[0]),
+                  encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(),
+                             ['c:@F@foo ast/src/main.cpp.ast',
+                              'c:@F@bar ast/src/main.cpp.ast'])
+
+    def test_is_ctu_dir(self):
+        """ Only the directories of CTU data can be cleared. """
+        ctu_dir = self.config.ctu_dir
+        os.makedirs(ctu_dir)
+        self.assertTrue(ctu_manager.is_ctu_dir(ctu_dir))
+
+        os.makedirs(os.path.dirname(self.ast_path))
+        with open(os.path.join(ctu_dir, 'x86_64', 'externalDefMap.txt'),
+                  'w', encoding='utf-8') as f:
+            f.write('c:@F@foo ast/src/main.cpp.ast\n')
+        self.assertTrue(ctu_manager.is_ctu_dir(ctu_dir))
+
+        with open(os.path.join(ctu_dir, 'x86_64', 'main.cpp'), 'w',
+                  encoding='utf-8') as f:
+            f.write('int main() {}\n')
+        self.assertFalse(ctu_manager.is_ctu_dir(ctu_dir))
+
+        self.assertFalse(ctu_manager.is_ctu_dir(os.path.dirname(ctu_dir)))
@@ -0,0 +1,107 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Test the translation unit manifests of the incremental analysis.
+"""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from codechecker_analyzer import incremental
+from codechecker_common.skiplist_handler import SkipListHandler
+
+
+class IncrementalAnalysisTest(unittest.TestCase):
+    """
+    Test detecting the changes of the analyzed translation units.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmp_dir, 'main.cpp')
+        self.header = os.path.join(self.tmp_dir, 'main.h')
+        self.result_file = os.path.join(self.tmp_dir, 'main.cpp_1.plist')
+        self.manifest_file = incremental.get_manifest_file(self.tmp_dir,
+                                                           self.result_file)
+
+        with open(self.source, 'w', encoding='utf-8') as f:
+            f.write('#include "main.h"\nint main() { return 0; }\n')
+        with open(self.header, 'w', encoding='utf-8') as f:
+            f.write('int foo();\n')
+        with open(self.result_file, 'w', encoding='utf-8') as f:
+            f.write('')
+
+        self.analyzer_cmd = ['clang', '--analyze', self.source]
+        self.config_hash = incremental.get_config_hash(self.analyzer_cmd,
+                                                       None, None)
+
+        files = {}
+        for file_path in [self.source, self.header]:
+            stat = os.stat(file_path)
+            files[file_path] = [stat.st_mtime_ns, stat.st_size,
+                                incremental.get_file_hash(file_path)]
+
+        incremental.write_manifest(self.manifest_file, {
+            'version': incremental.MANIFEST_VERSION,
+            'source': self.source,
+            'config_hash': self.config_hash,
+            'files': files})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_unchanged(self):
+        """ Nothing changed since the last analysis. """
+        self.assertTrue(incremental.is_up_to_date(
+            self.manifest_file, self.config_hash, self.result_file))
+
+    def test_touched_header(self):
+        """ Modification time change without content change. """
+        stat = os.stat(self.header)
+        os.utime(self.header, ns=(stat.st_atime_ns,
+                                  stat.st_mtime_ns + 10 ** 9))
+
+        self.assertTrue(incremental.is_up_to_date(
+            self.manifest_file, self.config_hash, self.result_file))
+
+    def test_changed_header(self):
+        """ Content of a header file changed. """
+        with open(self.header, 'w', encoding='utf-8') as f:
+            f.write('int foo(int);\n')
+
+        self.assertFalse(incremental.is_up_to_date(
+            self.manifest_file, self.config_hash, self.result_file))
+
+    def test_removed_header(self):
+        """ A header file of the translation unit was removed. """
+        os.remove(self.header)
+
+        self.assertFalse(incremental.is_up_to_date(
+            self.manifest_file, self.config_hash, self.result_file))
+
+    def test_changed_config(self):
+        """ Analyzer command or skip file changed. """
+        config_hash = incremental.get_config_hash(
+            self.analyzer_cmd + ['-DDEBUG'], None, None)
+        self.assertFalse(incremental.is_up_to_date(
+            self.manifest_file, config_hash, self.result_file))
+
+        config_hash = incremental.get_config_hash(
+            self.analyzer_cmd, None, SkipListHandler('-*/main.h'))
+        self.assertFalse(incremental.is_up_to_date(
+            self.manifest_file, config_hash, self.result_file))
+
+    def test_missing_result_file(self):
+        """ Result file of the previous analysis was removed. """
+        os.remove(self.result_file)
+
+        self.assertFalse(incremental.is_up_to_date(
+            self.manifest_file, self.config_hash, self.result_file))
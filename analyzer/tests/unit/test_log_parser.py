@@ -526,3 +526,38 @@ class LogParserTest(unittest.TestCase):
                           if b.source == b_file_path][0]
         self.assertEqual(len(b_build_action.analyzer_options), 1)
         self.assertEqual(b_build_action.analyzer_options[0], '-DVARIABLE=some')
+
+    def test_parallel_parse_keeps_uniqueing(self):
+        """
+        Parsing the compilation database with multiple jobs should give the
+        same build actions in the same order as the serial parsing.
+        """
+        cmp_cmd_json = []
+        for i in range(20):
+            cmp_cmd_json.append({
+                "directory": "/tmp/lib1",
+                "command": "g++ -DVAR={0} -c /tmp/lib1/a{0}.cpp "
+                           "-o /tmp/lib1/b/a{0}.o".format(i),
+                "file": "a{0}.cpp".format(i)})
+            cmp_cmd_json.append({
+                "directory": "/tmp/lib1",
+                "command": "g++ -c /tmp/lib1/a{0}.cpp "
+                           "-o /tmp/lib1/a/a{0}.o".format(i),
+                "file": "a{0}.cpp".format(i)})
+
+        for uniqueing in ["none", "alpha"]:
+            serial_actions, _ = log_parser.parse_unique_log(
+                [dict(e) for e in cmp_cmd_json], self.__this_dir,
+                compile_uniqueing=uniqueing)
+
+            parallel_actions, _ = log_parser.parse_unique_log(
+                [dict(e) for e in cmp_cmd_json], self.__this_dir,
+                compile_uniqueing=uniqueing, jobs=4)
+
+            self.assertEqual(
+                [a.original_command for a in serial_actions],
+                [a.original_command for a in parallel_actions])
+
+        self.assertEqual(len(parallel_actions), 20)
+        self.assertTrue(all(a.output.startswith('/tmp/lib1/a/')
+                            for a in parallel_actions))
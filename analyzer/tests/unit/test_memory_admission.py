@@ -0,0 +1,146 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Test the memory admission control of the parallel analysis.
+"""
+
+
+import argparse
+from collections import namedtuple
+import multiprocessing
+import threading
+import unittest
+
+from codechecker_analyzer import analysis_scheduler
+from codechecker_analyzer.analysis_manager import MemoryAdmissionController
+from codechecker_analyzer.arg import memory_size
+
+
+MiB = 1024 * 1024
+
+Action = namedtuple('Action', 'analyzer_type, source')
+
+
+class MemoryAdmissionTest(unittest.TestCase):
+    """
+    Test delaying the analyses which do not fit into the memory budget.
+    """
+
+    def setUp(self):
+        self.controller = MemoryAdmissionController(100 * MiB)
+        self.controller.POLL_INTERVAL = 0.01
+
+    def __acquire_in_background(self, amount):
+        """
+        Start acquiring the given amount of memory on a separate thread and
+        return the event which is set when the reservation is done.
+        """
+        admitted = threading.Event()
+
+        def __acquire():
+            self.controller.acquire(amount)
+            admitted.set()
+
+        thread = threading.Thread(target=__acquire)
+        thread.daemon = True
+        thread.start()
+
+        return admitted
+
+    def test_delay_until_release(self):
+        """ An analysis waits until the budget has enough free memory. """
+        first = self.controller.acquire(60 * MiB)
+
+        admitted = self.__acquire_in_background(60 * MiB)
+        self.assertFalse(admitted.wait(0.2))
+
+        first.release()
+        self.assertTrue(admitted.wait(5))
+
+    def test_fits_into_budget(self):
+        """ Analyses fitting into the budget are started in parallel. """
+        self.controller.acquire(40 * MiB)
+
+        admitted = self.__acquire_in_background(60 * MiB)
+        self.assertTrue(admitted.wait(5))
+
+    def test_larger_than_budget(self):
+        """ An analysis larger than the budget is started alone. """
+        reservation = self.controller.acquire(1000 * MiB)
+        self.assertEqual(reservation.amount, 100 * MiB)
+
+        admitted = self.__acquire_in_background(1 * MiB)
+        self.assertFalse(admitted.wait(0.2))
+
+        reservation.release()
+        self.assertTrue(admitted.wait(5))
+
+    def test_underestimated_usage(self):
+        """ The reservation grows if the analyzer uses more memory. """
+        first = self.controller.acquire(10 * MiB)
+        first.update(80 * MiB)
+        self.assertEqual(first.amount, 80 * MiB)
+
+        # Decreasing usage does not shrink the reservation.
+        first.update(20 * MiB)
+        self.assertEqual(first.amount, 80 * MiB)
+
+        admitted = self.__acquire_in_background(30 * MiB)
+        self.assertFalse(admitted.wait(0.2))
+
+        first.release()
+        self.assertTrue(admitted.wait(5))
+
+    def test_killed_worker(self):
+        """ The reservation of a killed worker process is reclaimed. """
+        worker = multiprocessing.get_context('fork').Process(
+            target=self.controller.acquire, args=(60 * MiB,))
+        worker.start()
+        worker.join()
+
+        admitted = self.__acquire_in_background(60 * MiB)
+        self.assertTrue(admitted.wait(5))
+
+    def test_bounded_wait(self):
+        """ An analysis is admitted after waiting too long. """
+        self.controller.MAX_WAIT = 0.2
+        self.controller.acquire(60 * MiB)
+
+        admitted = self.__acquire_in_background(60 * MiB)
+        self.assertTrue(admitted.wait(5))
+
+    def test_predicted_memory(self):
+        """ Unknown memory usage is predicted by the recorded values. """
+        actions = [Action('clangsa', 'a.cpp'),
+                   Action('clangsa', 'b.cpp'),
+                   Action('clang-tidy', 'a.cpp')]
+
+        self.assertEqual(
+            analysis_scheduler.get_predicted_memory(actions, {}, 5 * MiB),
+            [5 * MiB] * 3)
+
+        # The maximum resident set size is recorded in KiB.
+        tu_statistics = {('clangsa', 'a.cpp'): {'max_rss': 2048}}
+        self.assertEqual(
+            analysis_scheduler.get_predicted_memory(actions, tu_statistics,
+                                                    5 * MiB),
+            [2 * MiB] * 3)
+
+    def test_memory_size_argument(self):
+        """ Parse memory size given on the command line. """
+        self.assertEqual(memory_size('512'), 512 * MiB)
+        self.assertEqual(memory_size('64G'), 64 * 1024 * MiB)
+        self.assertEqual(memory_size('1.5g'), 1536 * MiB)
+        self.assertEqual(memory_size('2TiB'), 2 * 1024 * 1024 * MiB)
+        self.assertEqual(memory_size('100K'), 100 * 1024)
+
+        with self.assertRaises(argparse.ArgumentTypeError):
+            memory_size('lots')
+
+        with self.assertRaises(argparse.ArgumentTypeError):
+            memory_size('0')
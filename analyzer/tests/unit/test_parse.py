@@ -0,0 +1,118 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+
+""" Unit tests for parsing and printing the reports in parallel. """
+
+import io
+import os
+import plistlib
+import shutil
+import tempfile
+import unittest
+
+from codechecker_analyzer.cmd import parse
+
+SOURCE = """int f(int *p) {
+  return *p;
+}
+
+int g(int x) {
+  // codechecker_false_positive [all] x is never zero
+  return 1 / x;
+}
+
+int h(int x) {
+  return 1 / x;
+}
+"""
+
+
+def location(line, col, file_idx=0):
+    return {'line': line, 'col': col, 'file': file_idx}
+
+
+def diagnostic(checker_name, line, report_hash):
+    loc = location(line, 10)
+    return {'category': 'Logic error',
+            'check_name': checker_name,
+            'description': 'Report of ' + checker_name,
+            'issue_hash_content_of_line_in_context': report_hash,
+            'location': loc,
+            'type': checker_name,
+            'path': [{'kind': 'event',
+                      'location': location(line - 1, 3),
+                      'message': 'Step before the report'},
+                     {'kind': 'event',
+                      'location': loc,
+                      'message': 'Report of ' + checker_name}]}
+
+
+class TestParallelParse(unittest.TestCase):
+    """ Test printing the reports with multiple processes. """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+        self.plist_files = []
+        for i in range(6):
+            source_file = os.path.join(self.tmp_dir, 'main_%d.cpp' % i)
+            with open(source_file, 'w', encoding='utf-8') as f:
+                f.write(SOURCE)
+
+            diags = [diagnostic('core.NullDereference', 2, '%d_1' % i),
+                     diagnostic('core.DivideZero', 7, '%d_2' % i),
+                     diagnostic('core.DivideZero', 11, '%d_3' % i)]
+
+            # Every report of a source file is written into multiple plist
+            # files, only one of them should be printed.
+            for j in range(i % 3 + 1):
+                plist_file = os.path.join(self.tmp_dir,
+                                          'main_%d_%d.plist' % (i, j))
+                with open(plist_file, 'wb') as f:
+                    plistlib.dump({'diagnostics': diags[:j + 1],
+                                   'files': [source_file]}, f)
+                self.plist_files.append(plist_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def __parse(self, jobs, print_steps):
+        """ Returns the printed output and the statistics. """
+        plist_pltf = parse.PlistToPlaintextFormatter(
+            None, None, {'core.DivideZero': 'HIGH'}, set(), None,
+            ['confirmed', 'unreviewed'])
+        plist_pltf.print_steps = print_steps
+
+        file_report_map = {}
+        changed_files = parse.parse_plist_files(self.plist_files, {},
+                                                plist_pltf, file_report_map,
+                                                jobs)
+        self.assertEqual(changed_files, set())
+
+        output = io.StringIO()
+        stats = plist_pltf.write(file_report_map, output, jobs)
+
+        return output.getvalue(), stats
+
+    def test_same_output(self):
+        """ The same output is printed as by a single process. """
+        for print_steps in [False, True]:
+            output, stats = self.__parse(1, print_steps)
+            parallel_output, parallel_stats = self.__parse(3, print_steps)
+
+            self.assertEqual(parallel_output, output)
+            self.assertEqual(parallel_stats, stats)
+
+    def test_deduplication(self):
+        """ Every report is printed once and the suppressed ones never. """
+        output, stats = self.__parse(2, False)
+
+        self.assertEqual(stats['reports']['report_count'], 8)
+        self.assertEqual(output.count('[core.NullDereference]'), 6)
+        self.assertEqual(output.count('[core.DivideZero]'), 2)
+        self.assertEqual(output.count(':7:10: '), 0)
@@ -0,0 +1,259 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+
+""" Unit tests for iterating over the reports of the plist files. """
+
+import datetime
+import gc
+import os
+import plistlib
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+from codechecker_common import parse_cache, plist_parser
+
+TEST_FILES_DIR = os.path.dirname(__file__)
+
+PLIST_FILES = [
+    os.path.join(TEST_FILES_DIR, 'remove_report_test_files', 'x.plist'),
+    os.path.join(TEST_FILES_DIR, 'tidy_output_test_files', 'tidy1.plist'),
+    os.path.join(TEST_FILES_DIR, 'tidy_output_test_files', 'tidy2.plist'),
+    os.path.join(TEST_FILES_DIR, 'tidy_output_test_files', 'empty.plist')]
+
+
+class TestIterPlistReports(unittest.TestCase):
+    """ Test parsing the reports of the plist files one by one. """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_same_reports(self):
+        """ The same reports are parsed as by parsing the whole file. """
+        for plist_file in PLIST_FILES:
+            files, reports = plist_parser.parse_plist_file(plist_file, False)
+            iter_reports = list(plist_parser.iter_plist_reports(plist_file))
+
+            self.assertEqual(len(iter_reports), len(reports), plist_file)
+            for report, iter_report in zip(reports, iter_reports):
+                self.assertEqual(iter_report.main, report.main)
+                self.assertEqual(iter_report.bug_path, report.bug_path)
+                self.assertEqual(iter_report.files, files)
+                self.assertEqual(iter_report.metadata, report.metadata)
+
+    def test_skip_bug_path(self):
+        """ Only the main section of the reports is kept. """
+        reports = list(plist_parser.iter_plist_reports(PLIST_FILES[0],
+                                                       skip_bug_path=True))
+        self.assertTrue(reports)
+        for report in reports:
+            self.assertEqual(report.bug_path, [])
+            self.assertNotIn('path', report.main)
+            self.assertTrue(report.report_hash)
+
+    def test_missing_report_hash(self):
+        """ Missing report hashes are generated without updating the file. """
+        with open(PLIST_FILES[0], 'rb') as plist_file:
+            plist = plistlib.load(plist_file)
+        for diag in plist['diagnostics']:
+            del diag['issue_hash_content_of_line_in_context']
+
+        plist_file = os.path.join(self.tmp_dir, 'x.plist')
+        with open(plist_file, 'wb') as f:
+            plistlib.dump(plist, f)
+        with open(plist_file, 'rb') as f:
+            content = f.read()
+
+        _, reports = plist_parser.parse_plist_file(plist_file, False)
+        iter_reports = list(plist_parser.iter_plist_reports(plist_file))
+
+        self.assertEqual([r.report_hash for r in iter_reports],
+                         [r.report_hash for r in reports])
+        with open(plist_file, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+    def test_invalid_plist(self):
+        """ No reports are returned from an invalid plist file. """
+        plist_file = os.path.join(self.tmp_dir, 'invalid.plist')
+        with open(plist_file, 'w', encoding='utf-8') as f:
+            f.write('<plist><dict><key>diagnostics</key>')
+
+        self.assertEqual(list(plist_parser.iter_plist_reports(plist_file)),
+                         [])
+
+    def test_invalid_diagnostic(self):
+        """
+        The reports before an invalid diagnostic are yielded, while no
+        reports are returned by parsing the whole file.
+        """
+        with open(PLIST_FILES[0], 'rb') as plist_file:
+            plist = plistlib.load(plist_file)
+        self.assertGreater(len(plist['diagnostics']), 1)
+        plist['diagnostics'][1]['category'] = 'INVALID_VALUE'
+
+        plist_file = os.path.join(self.tmp_dir, 'x.plist')
+        with open(plist_file, 'wb') as f:
+            f.write(plistlib.dumps(plist).replace(
+                b'<string>INVALID_VALUE</string>', b'<invalid/>'))
+
+        self.assertEqual(plist_parser.parse_plist_file(plist_file, False),
+                         ({}, []))
+
+        reports = list(plist_parser.iter_plist_reports(plist_file))
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(reports[0].main['check_name'],
+                         plist['diagnostics'][0]['check_name'])
+
+    def test_date_value(self):
+        """ The date values are parsed as by the plistlib module. """
+        date = datetime.datetime(2020, 1, 2, 3, 4, 5)
+        with open(PLIST_FILES[0], 'rb') as plist_file:
+            plist = plistlib.load(plist_file)
+        plist['diagnostics'][0]['date'] = date
+
+        plist_file = os.path.join(self.tmp_dir, 'x.plist')
+        with open(plist_file, 'wb') as f:
+            plistlib.dump(plist, f)
+
+        reports = list(plist_parser.iter_plist_reports(plist_file))
+        self.assertEqual(reports[0].main['date'], date)
+
+
+def get_peak_memory(func):
+    """ Returns the peak memory allocated while the function is called. """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+class TestParseCache(unittest.TestCase):
+    """ Test loading the reports of the plist files from the parse cache. """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.plist_file = os.path.join(self.tmp_dir, 'x.plist')
+        shutil.copy(PLIST_FILES[0], self.plist_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def __assert_same_reports(self, reports, expected):
+        self.assertEqual(len(reports), len(expected))
+        for report, expected_report in zip(reports, expected):
+            self.assertEqual(report.main, expected_report.main)
+            self.assertEqual(report.bug_path, expected_report.bug_path)
+            self.assertEqual(report.files, expected_report.files)
+            self.assertEqual(report.metadata, expected_report.metadata)
+
+    def test_cached_reports(self):
+        """ The same reports are loaded from the cache as parsed. """
+        files, reports = plist_parser.parse_plist_file(self.plist_file,
+                                                       False)
+
+        self.__assert_same_reports(
+            plist_parser.parse_plist_file(self.plist_file, False,
+                                          use_cache=True)[1], reports)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.tmp_dir, parse_cache.PARSE_CACHE_FILE)))
+
+        cache = parse_cache.get_parse_cache(self.plist_file)
+        cached_files, cached_reports = cache.get(self.plist_file)
+        self.assertEqual(cached_files, files)
+        self.__assert_same_reports(cached_reports, reports)
+
+        self.__assert_same_reports(
+            plist_parser.parse_plist_file(self.plist_file, False,
+                                          use_cache=True)[1], reports)
+        self.__assert_same_reports(
+            list(plist_parser.iter_plist_reports(self.plist_file,
+                                                 use_cache=True)), reports)
+
+        for report in plist_parser.iter_plist_reports(self.plist_file, True,
+                                                      use_cache=True):
+            self.assertEqual(report.bug_path, [])
+
+    def test_changed_plist(self):
+        """ The plist file is parsed again if it has changed. """
+        list(plist_parser.iter_plist_reports(self.plist_file,
+                                             use_cache=True))
+        cache = parse_cache.get_parse_cache(self.plist_file)
+        self.assertIsNotNone(cache.get(self.plist_file))
+
+        with open(self.plist_file, 'rb') as f:
+            plist = plistlib.load(f)
+        plist['diagnostics'] = plist['diagnostics'][:1]
+        with open(self.plist_file, 'wb') as f:
+            plistlib.dump(plist, f)
+
+        self.assertIsNone(cache.get(self.plist_file))
+        self.assertEqual(len(plist_parser.parse_plist_file(
+            self.plist_file, False, use_cache=True)[1]), 1)
+        self.assertEqual(len(cache.get(self.plist_file)[1]), 1)
+
+    def test_generated_report_hash(self):
+        """ Reports with generated report hashes are not cached. """
+        with open(self.plist_file, 'rb') as f:
+            plist = plistlib.load(f)
+        for diag in plist['diagnostics']:
+            del diag['issue_hash_content_of_line_in_context']
+        with open(self.plist_file, 'wb') as f:
+            plistlib.dump(plist, f)
+
+        list(plist_parser.iter_plist_reports(self.plist_file,
+                                             use_cache=True))
+        plist_parser.parse_plist_file(self.plist_file, False, use_cache=True)
+
+        cache = parse_cache.get_parse_cache(self.plist_file)
+        self.assertIsNone(cache.get(self.plist_file))
+
+    def test_bounded_memory(self):
+        """
+        The reports are written to and read from the cache without keeping
+        all of them in the memory.
+        """
+        with open(self.plist_file, 'rb') as f:
+            plist = plistlib.load(f)
+        diag = plist['diagnostics'][0]
+        diag['path'] = diag['path'] * 10
+
+        plist['diagnostics'] = []
+        for i in range(800):
+            plist['diagnostics'].append(dict(
+                diag, issue_hash_content_of_line_in_context='%032x' % i))
+        with open(self.plist_file, 'wb') as f:
+            plistlib.dump(plist, f)
+
+        def count_reports(use_cache):
+            return sum(1 for _ in plist_parser.iter_plist_reports(
+                self.plist_file, use_cache=use_cache))
+
+        all_reports = get_peak_memory(
+            lambda: list(plist_parser.iter_plist_reports(self.plist_file)))
+
+        cache = parse_cache.get_parse_cache(self.plist_file)
+        self.assertIsNone(cache.iter_reports(self.plist_file))
+        with mock.patch.object(parse_cache, 'REPORT_CHUNK_SIZE', 10):
+            write_peak = get_peak_memory(lambda: count_reports(True))
+
+            self.assertIsNotNone(cache.iter_reports(self.plist_file))
+            read_peak = get_peak_memory(lambda: count_reports(True))
+
+        self.assertEqual(count_reports(True), 800)
+        self.assertLess(write_peak, all_reports / 2)
+        self.assertLess(read_peak, all_reports / 2)
@@ -0,0 +1,118 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+
+""" Unit tests for the single pass post-processing of the plist files. """
+
+import os
+import plistlib
+import shutil
+import tempfile
+import unittest
+
+from codechecker_common import plist_parser, skiplist_handler
+from codechecker_report_hash.hash import HashType
+
+OLD_PWD = None
+
+
+def setup_module():
+    """ Change to the directory with sample plist files. """
+    global OLD_PWD
+    OLD_PWD = os.getcwd()
+    os.chdir(os.path.join(os.path.dirname(__file__),
+             'remove_report_test_files'))
+
+
+def teardown_module():
+    """ Restore the current working directory. """
+    global OLD_PWD
+    os.chdir(OLD_PWD)
+
+
+class TestPostprocessPlist(unittest.TestCase):
+    """ Test post-processing the analyzer result files. """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.plist_file = os.path.join(self.tmp_dir, 'x.plist')
+        shutil.copy('x.plist', self.plist_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def __load_plist(self):
+        with open(self.plist_file, 'rb') as plist_file:
+            return plistlib.load(plist_file)
+
+    def test_skip_and_summary(self):
+        """ Reports are skipped and the summary describes the result. """
+        with open('skip_x_header.txt',
+                  encoding="utf-8", errors="ignore") as skip_file:
+            skip_handler = skiplist_handler.SkipListHandler(skip_file.read())
+
+        summary = plist_parser.postprocess_plist(self.plist_file,
+                                                 skip_handler)
+
+        with open(self.plist_file, 'rb') as plist_file, \
+                open('skip_x_header.expected.plist', 'rb') as expected:
+            self.assertEqual(plist_file.read(), expected.read())
+
+        plist = self.__load_plist()
+        self.assertEqual(summary['report_count'], len(plist['diagnostics']))
+        self.assertEqual(summary['files'], plist['files'])
+        self.assertEqual(summary['report_hashes'], [
+            diag['issue_hash_content_of_line_in_context']
+            for diag in plist['diagnostics']])
+        self.assertEqual(summary['main_report_positions'], [
+            [diag['path'][-1]['location']['file'],
+             diag['path'][-1]['location']['line']]
+            for diag in plist['diagnostics']])
+
+        self.assertEqual(plist_parser.load_summary(self.plist_file), summary)
+
+    def test_unchanged_plist(self):
+        """ The plist file is not rewritten if nothing has changed. """
+        with open(self.plist_file, 'rb') as plist_file:
+            content = plist_file.read()
+        mtime = os.stat(self.plist_file).st_mtime_ns
+
+        summary = plist_parser.postprocess_plist(
+            self.plist_file, skiplist_handler.SkipListHandler())
+
+        with open(self.plist_file, 'rb') as plist_file:
+            self.assertEqual(plist_file.read(), content)
+        self.assertEqual(os.stat(self.plist_file).st_mtime_ns, mtime)
+        self.assertEqual(summary['report_count'], 5)
+
+    def test_outdated_summary(self):
+        """ Summary of a plist changed after the analysis is not used. """
+        plist_parser.postprocess_plist(self.plist_file)
+        self.assertIsNotNone(plist_parser.load_summary(self.plist_file))
+
+        with open(self.plist_file, 'ab') as plist_file:
+            plist_file.write(b'\n')
+
+        self.assertIsNone(plist_parser.load_summary(self.plist_file))
+
+    def test_hash_replacement(self):
+        """ Report hashes are replaced and missing hashes are filled. """
+        plist = self.__load_plist()
+        original_hashes = [diag['issue_hash_content_of_line_in_context']
+                           for diag in plist['diagnostics']]
+        del plist['diagnostics'][0]['issue_hash_content_of_line_in_context']
+
+        summary = plist_parser.postprocess_plist(self.plist_file, plist=plist)
+        self.assertEqual(summary['report_hashes'][1:], original_hashes[1:])
+        self.assertTrue(summary['report_hashes'][0])
+
+        summary = plist_parser.postprocess_plist(
+            self.plist_file, hash_type=HashType.CONTEXT_FREE)
+        self.assertNotEqual(summary['report_hashes'], original_hashes)
+        self.assertEqual(summary['report_hashes'], [
+            diag['issue_hash_content_of_line_in_context']
+            for diag in self.__load_plist()['diagnostics']])
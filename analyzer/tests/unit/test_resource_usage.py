@@ -0,0 +1,63 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+
+"""
+Test measuring the resource usage of the analyzer processes.
+"""
+
+
+import sys
+import unittest
+
+from codechecker_analyzer.analyzers.analyzer_base import SourceAnalyzer
+
+
+class ResourceUsageTest(unittest.TestCase):
+    """
+    Test the resource usage of the processes started by the analyzers.
+    """
+
+    def test_resource_usage(self):
+        """ Outputs, return code and memory usage of the process. """
+        ret_code, stdout, stderr, usage = \
+            SourceAnalyzer.run_proc_with_resource_usage([
+                sys.executable, '-c',
+                "import sys; "
+                "x = bytearray(64 * 1024 * 1024); "
+                "print('out'); "
+                "print('err', file=sys.stderr); "
+                "sys.exit(3)"])
+
+        self.assertEqual(ret_code, 3)
+        self.assertEqual(stdout, 'out\n')
+        self.assertEqual(stderr, 'err\n')
+
+        self.assertGreaterEqual(usage['max_rss'], 64 * 1024)
+        self.assertGreaterEqual(usage['wall_time'], 0)
+        self.assertGreater(usage['user_time'] + usage['sys_time'], 0)
+
+    def test_large_output(self):
+        """ Filling up both output pipes does not block the process. """
+        ret_code, stdout, stderr, _ = \
+            SourceAnalyzer.run_proc_with_resource_usage([
+                sys.executable, '-c',
+                "import sys; "
+                "sys.stderr.write('e' * 1024 * 1024); "
+                "sys.stdout.write('o' * 1024 * 1024)"])
+
+        self.assertEqual(ret_code, 0)
+        self.assertEqual(len(stdout), 1024 * 1024)
+        self.assertEqual(len(stderr), 1024 * 1024)
+
+    def test_killed_process(self):
+        """ Return code of a process killed by a signal is negative. """
+        ret_code, _, _ = SourceAnalyzer.run_proc([
+            sys.executable, '-c',
+            "import os, signal; os.kill(os.getpid(), signal.SIGKILL)"])
+
+        self.assertEqual(ret_code, -9)
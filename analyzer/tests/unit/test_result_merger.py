@@ -0,0 +1,167 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Test merging the output directories of the shards of an analysis.
+"""
+
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from codechecker_analyzer import result_merger
+from codechecker_analyzer.analyzers.clangsa import ctu_manager
+
+
+class ResultMergerTest(unittest.TestCase):
+    """
+    Test merging the output directories of the shards.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.tmp_dir, 'merged')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def __write(self, path, content):
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        with open(path, 'w', encoding='utf-8') as f:
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                json.dump(content, f)
+
+    def __create_shard(self, index, count, source, failed=False):
+        """ Create the output directory of a shard analyzing one source. """
+        shard_dir = os.path.join(self.tmp_dir, 'shard_{0}'.format(index))
+        plist = os.path.join(shard_dir, source + '_clangsa.plist')
+
+        self.__write(plist, '<plist/>')
+        self.__write(os.path.join(shard_dir, 'compile_cmd.json'), [])
+        self.__write(os.path.join(shard_dir, 'unique_compile_commands.json'),
+                     [{'file': source}])
+        self.__write(os.path.join(shard_dir, 'ctu_connections',
+                                  source + '_clangsa'), source)
+        if failed:
+            self.__write(os.path.join(shard_dir, 'failed',
+                                      source + '_crash.zip'), '')
+
+        self.__write(os.path.join(shard_dir, 'metadata.json'), {
+            'version': 2,
+            'tools': [{
+                'name': 'codechecker',
+                'action_num': 1,
+                'skipped': 0,
+                'command': ['CodeChecker', 'analyze'],
+                'output_path': shard_dir,
+                'shard': {'index': index, 'count': count},
+                'timestamps': {'begin': 10.0 * index, 'end': 20.0 * index},
+                'result_source_files': {plist: source},
+                'analyzers': {
+                    'clangsa': {
+                        'checkers': {'core.DivideZero': True,
+                                     'alpha.core': index == 2},
+                        'analyzer_statistics': {
+                            'failed': 1 if failed else 0,
+                            'failed_sources': [source] if failed else [],
+                            'successful': 0 if failed else 1,
+                            'version': 'clang 11'},
+                        'tu_statistics': {source: {'wall_time': 1.0}}}}}]})
+
+        return shard_dir
+
+    def test_merge_result_dirs(self):
+        """ Result files and metadata of the shards are merged. """
+        shards = [self.__create_shard(1, 2, 'a.cpp'),
+                  self.__create_shard(2, 2, 'b.cpp', True)]
+
+        result_merger.merge_result_dirs(shards, self.output_dir)
+
+        for result_file in ['a.cpp_clangsa.plist', 'b.cpp_clangsa.plist',
+                            'compile_cmd.json',
+                            os.path.join('ctu_connections', 'a.cpp_clangsa'),
+                            os.path.join('ctu_connections', 'b.cpp_clangsa'),
+                            os.path.join('failed', 'b.cpp_crash.zip')]:
+            self.assertTrue(os.path.exists(
+                os.path.join(self.output_dir, result_file)), result_file)
+
+        with open(os.path.join(self.output_dir,
+                               'unique_compile_commands.json'),
+                  encoding='utf-8') as f:
+            self.assertEqual(json.load(f), [{'file': 'a.cpp'},
+                                            {'file': 'b.cpp'}])
+
+        with open(os.path.join(self.output_dir, 'metadata.json'),
+                  encoding='utf-8') as f:
+            metadata = json.load(f)
+
+        self.assertEqual(len(metadata['tools']), 1)
+        tool = metadata['tools'][0]
+
+        self.assertNotIn('shard', tool)
+        self.assertEqual(tool['action_num'], 2)
+        self.assertEqual(tool['output_path'], self.output_dir)
+        self.assertEqual(tool['timestamps'], {'begin': 10.0, 'end': 40.0})
+        self.assertEqual(tool['result_source_files'], {
+            os.path.join(self.output_dir, 'a.cpp_clangsa.plist'): 'a.cpp',
+            os.path.join(self.output_dir, 'b.cpp_clangsa.plist'): 'b.cpp'})
+
+        clangsa = tool['analyzers']['clangsa']
+        self.assertEqual(clangsa['checkers'], {'core.DivideZero': True,
+                                               'alpha.core': True})
+        self.assertEqual(clangsa['analyzer_statistics'], {
+            'failed': 1,
+            'failed_sources': ['b.cpp'],
+            'successful': 1,
+            'version': 'clang 11'})
+        self.assertEqual(set(clangsa['tu_statistics']), {'a.cpp', 'b.cpp'})
+
+    def test_merge_ctu_dirs(self):
+        """
+        Function maps of the shards are merged like the function maps of a
+        single analysis.
+        """
+        fnmaps = {1: 'c:@F@foo a.cpp.ast\nc:@F@common a.cpp.ast\n',
+                  2: 'c:@F@bar b.cpp.ast\nc:@F@common b.cpp.ast\n'}
+
+        shards = []
+        for index in [1, 2]:
+            shard_dir = self.__create_shard(index, 2, 'x{0}.cpp'.format(index))
+            triple_dir = os.path.join(shard_dir, 'ctu-dir', 'x86_64')
+
+            self.__write(os.path.join(triple_dir, 'ast', 'src',
+                                      'x{0}.cpp.ast'.format(index)), 'ast')
+            self.__write(os.path.join(triple_dir,
+                                      ctu_manager.TEMP_FNMAP_FOLDER,
+                                      'fnmap'), fnmaps[index])
+            self.__write(os.path.join(triple_dir, 'externalDefMap.txt'),
+                         fnmaps[index])
+
+            shards.append(shard_dir)
+
+        result_merger.merge_result_dirs(shards, self.output_dir)
+
+        triple_dir = os.path.join(self.output_dir, 'ctu-dir', 'x86_64')
+        self.assertTrue(os.path.exists(
+            os.path.join(triple_dir, 'ast', 'src', 'x1.cpp.ast')))
+        self.assertTrue(os.path.exists(
+            os.path.join(triple_dir, 'ast', 'src', 'x2.cpp.ast')))
+        self.assertFalse(os.path.exists(
+            os.path.join(triple_dir, ctu_manager.TEMP_FNMAP_FOLDER)))
+
+        # The function defined in both shards is left out.
+        with open(os.path.join(triple_dir, 'externalDefMap.txt'),
+                  encoding='utf-8') as f:
+            self.assertEqual(sorted(f.read().splitlines()),
+                             ['c:@F@bar b.cpp.ast', 'c:@F@foo a.cpp.ast'])
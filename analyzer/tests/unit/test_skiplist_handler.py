@@ -0,0 +1,115 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+
+""" Unit tests for matching the paths against the skip file. """
+
+import fnmatch
+import os
+import pickle
+import re
+import unittest
+
+from codechecker_common.skiplist_handler import SkipListHandler
+
+
+SKIP_FILE_CONTENT = """
++/project/lib/keep.cpp
+-/project/lib/
++/project/src/*/main.cpp
+-*/generated/*
+-/project/src/test
++*.h
+-/project/include
+-/project/src/module_?.cpp
+-/project/src/[ab]_impl.cpp
+-/project/src/test
+-/other
+"""
+
+PATHS = [
+    '/project/lib/keep.cpp',
+    '/project/lib/drop.cpp',
+    '/project/libx/drop.cpp',
+    '/project/src/app/main.cpp',
+    '/project/src/app/generated/main.cpp',
+    '/project/src/generated/x.cpp',
+    '/project/src/test/x.cpp',
+    '/project/src/tests.cpp',
+    '/project/include/x.h',
+    '/project/include/x.hpp',
+    '/project/src/module_1.cpp',
+    '/project/src/module_12.cpp',
+    '/project/src/a_impl.cpp',
+    '/project/src/c_impl.cpp',
+    '/other',
+    '/otherwise/x.cpp',
+    '/project/x.cpp',
+    'relative/generated/x.cpp',
+    '',
+]
+
+
+def should_skip_in_order(skip_file_content, source):
+    """ Check the patterns one by one in the order of the skip file. """
+    for line in skip_file_content.splitlines():
+        line = line.strip()
+        if len(line) < 2 or line[0] not in ['-', '+']:
+            continue
+
+        pattern = os.path.normpath(line[1:].strip())
+        if re.match(fnmatch.translate(pattern + '*'), source):
+            return line[0] == '-'
+
+    return False
+
+
+class TestSkipListHandler(unittest.TestCase):
+    """ Test the decisions of the skip list handler. """
+
+    def test_first_match_wins(self):
+        """ The first matching skip line decides. """
+        handler = SkipListHandler(SKIP_FILE_CONTENT)
+
+        for path in PATHS:
+            self.assertEqual(handler.should_skip(path),
+                             should_skip_in_order(SKIP_FILE_CONTENT, path),
+                             path)
+
+        # Remembered decisions give the same result.
+        for path in PATHS:
+            self.assertEqual(handler.should_skip(path),
+                             should_skip_in_order(SKIP_FILE_CONTENT, path),
+                             path)
+
+    def test_overwrite_skip_content(self):
+        """ Remembered decisions are dropped if the patterns change. """
+        handler = SkipListHandler(SKIP_FILE_CONTENT)
+        self.assertTrue(handler.should_skip('/project/lib/drop.cpp'))
+
+        handler.overwrite_skip_content(['+/project/lib/drop.cpp'])
+        self.assertFalse(handler.should_skip('/project/lib/drop.cpp'))
+
+    def test_memo_size(self):
+        """ Only the given number of recent decisions is remembered. """
+        handler = SkipListHandler(SKIP_FILE_CONTENT)
+        handler.MEMO_SIZE = 2
+
+        for path in PATHS:
+            handler.should_skip(path)
+
+        self.assertTrue(handler.should_skip('/project/lib/drop.cpp'))
+
+    def test_pickle(self):
+        """ The handler can be sent to the worker processes. """
+        handler = SkipListHandler(SKIP_FILE_CONTENT)
+        handler.should_skip('/project/lib/drop.cpp')
+
+        copy = pickle.loads(pickle.dumps(handler))
+        for path in PATHS:
+            self.assertEqual(copy.should_skip(path),
+                             handler.should_skip(path), path)
@@ -52,6 +52,13 @@ def __add_arguments_to_parser(parser):
                         help="Output file where the merged function maps will "
                              "be stored into.")
 
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        metavar='JOBS',
+                        default=1,
+                        help="Number of processes which sort the individual "
+                             "function maps in parallel before merging them.")
+
 
 def main():
     """ Merge CTU funcs maps main command line. """
@@ -68,7 +75,8 @@ def main():
 
     args = parser.parse_args()
 
-    merge_clang_extdef_mappings.merge(args.input, args.output)
+    merge_clang_extdef_mappings.merge(args.input, args.output,
+                                      max(args.jobs, 1))
 
 
 if __name__ == "__main__":
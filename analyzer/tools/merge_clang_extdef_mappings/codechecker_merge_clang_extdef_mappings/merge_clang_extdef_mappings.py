@@ -7,46 +7,150 @@
 # -------------------------------------------------------------------------
 
 import glob
+import heapq
+import multiprocessing
 import os
+import shutil
+import tempfile
 
+# Maximum number of function map entries which are sorted in memory at once.
+MAX_RUN_SIZE = 500000
 
-def _generate_func_map_lines(func_map_dir):
-    """ Iterate over all lines of input files in random order. """
-    files = glob.glob(os.path.join(func_map_dir, '*'))
-    for func_map_file in files:
+# Maximum number of sorted runs which are merged at once.
+MAX_MERGE_FAN_IN = 64
+
+
+def _parse_func_map_line(line):
+    """ Returns the mangled name and the AST file of a function map line. """
+    mangled_name, ast_file = line.strip().split(' ', 1)
+    return mangled_name, ast_file
+
+
+def _write_run(entries, tmp_dir, key=None):
+    """ Sort the given entries and write them into a new run file.
+
+    Every entry is a (file index, line index, mangled name, AST file) tuple,
+    where the indices give the position of the first occurrence of the entry
+    in the input files.
+    """
+    entries.sort(key=key)
+
+    fd, run_file = tempfile.mkstemp(dir=tmp_dir, suffix='.run')
+    with open(fd, 'w', encoding='utf-8', errors='ignore') as run:
+        for file_idx, line_idx, mangled_name, ast_file in entries:
+            # The mangled name does not contain spaces.
+            run.write('%d %d %s %s\n' %
+                      (file_idx, line_idx, mangled_name, ast_file))
+
+    return run_file
+
+
+def _read_run(run_file):
+    """ Iterate over the entries of a run file. """
+    with open(run_file, 'r', encoding='utf-8', errors='ignore') as run:
+        for line in run:
+            file_idx, line_idx, mangled_name, ast_file = \
+                line[:-1].split(' ', 3)
+            yield int(file_idx), int(line_idx), mangled_name, ast_file
+
+
+def _by_mangled_name(entry):
+    """ Order the entries by mangled name then by the first occurrence. """
+    return entry[2], entry[0], entry[1]
+
+
+def _sort_func_maps(params):
+    """ Sort the entries of the given function map files into run files.
+
+    Returns the list of the created run files.
+    """
+    func_map_files, tmp_dir = params
+
+    run_files = []
+    entries = []
+    for file_idx, func_map_file in func_map_files:
         with open(func_map_file, 'r',
                   encoding='utf-8', errors="ignore") as func_map:
-            for line in func_map:
-                yield line
+            for line_idx, line in enumerate(func_map):
+                mangled_name, ast_file = _parse_func_map_line(line)
+                entries.append((file_idx, line_idx, mangled_name, ast_file))
+
+                if len(entries) >= MAX_RUN_SIZE:
+                    run_files.append(
+                        _write_run(entries, tmp_dir, _by_mangled_name))
+                    entries = []
+
+    if entries:
+        run_files.append(_write_run(entries, tmp_dir, _by_mangled_name))
 
+    return run_files
 
-def _create_global_ctu_function_map(func_map_lines):
-    """ Takes iterator of individual function maps and creates a global map.
 
-    It will keeping only unique names. We leave conflicting names out of CTU.
-    A function map contains the id of a function (mangled name) and the
-    originating source (the corresponding AST file) name.
+def _merge_runs(run_files, tmp_dir, key=None):
+    """ Iterate over the entries of the given sorted run files in order.
+
+    If there are too many run files, they are merged into larger runs first
+    so only a limited number of files are opened at once.
+    """
+    while len(run_files) > MAX_MERGE_FAN_IN:
+        merged_run_files = []
+        for i in range(0, len(run_files), MAX_MERGE_FAN_IN):
+            group = run_files[i:i + MAX_MERGE_FAN_IN]
+            entries = heapq.merge(*[_read_run(f) for f in group], key=key)
+
+            fd, run_file = tempfile.mkstemp(dir=tmp_dir, suffix='.run')
+            with open(fd, 'w', encoding='utf-8', errors='ignore') as run:
+                for entry in entries:
+                    run.write('%d %d %s %s\n' % entry)
+
+            for f in group:
+                os.remove(f)
+            merged_run_files.append(run_file)
+
+        run_files = merged_run_files
+
+    return heapq.merge(*[_read_run(f) for f in run_files], key=key)
+
+
+def _get_unique_entries(entries):
+    """ Keep only the mangled names which belong to a single AST file.
+
+    The entries are ordered by mangled name, so the entries of a mangled name
+    follow each other and the first one is its first occurrence.
     """
-    mangled_to_asts = {}
+    current = None
+    conflicting = False
+    for entry in entries:
+        if current is None or entry[2] != current[2]:
+            if current is not None and not conflicting:
+                yield current
 
-    # We collect all occurences of a function name into a set.
-    for line in func_map_lines:
-        mangled_name, ast_file = line.strip().split(' ', 1)
-        if mangled_name not in mangled_to_asts:
-            mangled_to_asts[mangled_name] = {ast_file}
-        else:
-            mangled_to_asts[mangled_name].add(ast_file)
+            current = entry
+            conflicting = False
+        elif entry[3] != current[3]:
+            conflicting = True
 
-    mangled_ast_pairs = []
+    if current is not None and not conflicting:
+        yield current
 
-    for mangled_name, ast_files in mangled_to_asts.items():
-        if len(ast_files) == 1:
-            mangled_ast_pairs.append((mangled_name, ast_files.pop()))
 
-    return mangled_ast_pairs
+def _sorted_func_map_runs(func_map_files, tmp_dir, jobs):
+    """ Sort the function map files into runs in parallel. """
+    # Every job sorts the files of about the same size.
+    batch_size = max(1, len(func_map_files) // (jobs * 4))
+    batches = [(func_map_files[i:i + batch_size], tmp_dir)
+               for i in range(0, len(func_map_files), batch_size)]
 
+    if jobs > 1 and len(batches) > 1:
+        with multiprocessing.Pool(jobs) as pool:
+            results = pool.map(_sort_func_maps, batches)
+    else:
+        results = map(_sort_func_maps, batches)
 
-def merge(func_map_dir, output_file):
+    return [run_file for run_files in results for run_file in run_files]
+
+
+def merge(func_map_dir, output_file, jobs=1):
     """ Merge individual function maps into a global one.
 
     As the collect phase runs parallel on multiple threads, all compilation
@@ -55,12 +159,46 @@ def merge(func_map_dir, output_file):
     (AST generated from the source) which had them.
     These files should be merged at the end into a global map file:
     ctu_func_map_file.
+
+    It will keep only unique names. We leave conflicting names out of CTU.
+    The function maps are merged in bounded memory: the entries are sorted by
+    mangled name into temporary run files (on the given number of jobs in
+    parallel), which are merged to drop the conflicting names. The remaining
+    names are written in the order of their first occurrence in the input
+    files.
+
+    The temporary run files are written into a directory in func_map_dir, so
+    they are on the same file system as the function maps, and a directory
+    left behind by a killed merge is removed with the function maps.
     """
-    func_map_lines = _generate_func_map_lines(func_map_dir)
-    mangled_ast_pairs = _create_global_ctu_function_map(func_map_lines)
-
-    # Write (mangled function name, ast file) pairs into final file.
-    with open(output_file, 'w',
-              encoding='utf-8', errors='ignore') as out_file:
-        for mangled_name, ast_file in mangled_ast_pairs:
-            out_file.write('%s %s\n' % (mangled_name, ast_file))
+    files = [f for f in glob.glob(os.path.join(func_map_dir, '*'))
+             if os.path.isfile(f)]
+    func_map_files = list(enumerate(files))
+
+    tmp_dir = tempfile.mkdtemp(dir=func_map_dir)
+    try:
+        run_files = _sorted_func_map_runs(func_map_files, tmp_dir, jobs)
+
+        unique_entries = _get_unique_entries(
+            _merge_runs(run_files, tmp_dir, _by_mangled_name))
+
+        # Order the unique names by their first occurrence.
+        ordered_run_files = []
+        entries = []
+        for entry in unique_entries:
+            entries.append(entry)
+            if len(entries) >= MAX_RUN_SIZE:
+                ordered_run_files.append(_write_run(entries, tmp_dir))
+                entries = []
+
+        if entries:
+            ordered_run_files.append(_write_run(entries, tmp_dir))
+
+        # Write (mangled function name, ast file) pairs into final file.
+        with open(output_file, 'w',
+                  encoding='utf-8', errors='ignore') as out_file:
+            for _, _, mangled_name, ast_file in \
+                    _merge_runs(ordered_run_files, tmp_dir):
+                out_file.write('%s %s\n' % (mangled_name, ast_file))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -60,3 +60,51 @@ class MergeClangExtdefMappingsTest(unittest.TestCase):
                           "c:@F@h# path/to/file2.cpp.ast"]
         for expected_line in expected_lines:
             self.assertTrue(expected_line in lines)
+
+    def test_merge_in_runs(self):
+        """ Merging the function maps in multiple sorted runs. """
+        extdef_maps_dir = os.path.join(self.test_workspace, "extdef_runs")
+        if not os.path.exists(extdef_maps_dir):
+            os.makedirs(extdef_maps_dir)
+
+        for i in range(5):
+            with open(os.path.join(extdef_maps_dir, str(i)), 'w',
+                      encoding='utf-8', errors='ignore') as map_f:
+                map_f.write("c:@F@f%d# file%d.cpp.ast\n"
+                            "c:@F@both# file%d.cpp.ast\n"
+                            "c:@F@same# common.cpp.ast\n" % (i, i, i))
+
+        # The temporary directory of a killed merge is not an input.
+        os.makedirs(os.path.join(extdef_maps_dir, 'tmpkilled'))
+
+        output_file = os.path.join(self.test_workspace, 'runs.txt')
+        merge_clang_extdef_mappings.merge(extdef_maps_dir, output_file)
+        with open(output_file, 'r',
+                  encoding='utf-8', errors='ignore') as o_file:
+            expected = o_file.read()
+
+        run_size = merge_clang_extdef_mappings.MAX_RUN_SIZE
+        fan_in = merge_clang_extdef_mappings.MAX_MERGE_FAN_IN
+        try:
+            merge_clang_extdef_mappings.MAX_RUN_SIZE = 2
+            merge_clang_extdef_mappings.MAX_MERGE_FAN_IN = 2
+            merge_clang_extdef_mappings.merge(extdef_maps_dir, output_file, 2)
+        finally:
+            merge_clang_extdef_mappings.MAX_RUN_SIZE = run_size
+            merge_clang_extdef_mappings.MAX_MERGE_FAN_IN = fan_in
+
+        with open(output_file, 'r',
+                  encoding='utf-8', errors='ignore') as o_file:
+            lines = o_file.read()
+
+        self.assertEqual(lines, expected)
+        self.assertEqual(sorted(lines.splitlines()),
+                         sorted(["c:@F@f%d# file%d.cpp.ast" % (i, i)
+                                 for i in range(5)] +
+                                ["c:@F@same# common.cpp.ast"]))
+
+        # Temporary files are removed.
+        self.assertFalse([f for f in os.listdir(self.test_workspace)
+                          if f.startswith('tmp')])
+        self.assertEqual([f for f in os.listdir(extdef_maps_dir)
+                          if f.startswith('tmp')], ['tmpkilled'])
@@ -8,8 +8,9 @@
 """Codeclimate output helpers."""
 
 import os
-from typing import Dict, List
+from typing import Dict, Iterable, List, TextIO
 
+from codechecker_common.output.json import write_array
 from codechecker_common.report import Report
 
 
@@ -27,6 +28,16 @@ def convert(reports: List[Report]) -> Dict:
     return codeclimate_reports
 
 
+def write(reports: Iterable[Report], output: TextIO) -> int:
+    """Write the given reports to the output in codeclimate format.
+
+    The reports are converted and written one by one, so the output can be
+    written while the reports are parsed. Returns the number of the written
+    reports.
+    """
+    return write_array((__to_codeclimate(r) for r in reports), output)
+
+
 def __to_codeclimate(report: Report) -> Dict:
     """Convert a Report to Code Climate format."""
     _, file_name = os.path.split(report.file_path)
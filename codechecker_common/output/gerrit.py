@@ -7,7 +7,7 @@
 # -------------------------------------------------------------------------
 """Helper and converter functions for the gerrit review json format."""
 
-from typing import Dict, List, Union
+from typing import Dict, Iterable, List, TextIO, Union
 from codechecker_common.report import Report
 
 import os
@@ -15,7 +15,8 @@ import re
 import json
 
 
-def convert(reports: List[Report], severity_map: Dict[str, str]) -> Dict:
+def convert(reports: Iterable[Report],
+            severity_map: Dict[str, str]) -> Dict:
     """Convert reports to gerrit review format.
 
     Process the required environment variables and convert the reports
@@ -31,7 +32,23 @@ def convert(reports: List[Report], severity_map: Dict[str, str]) -> Dict:
                              severity_map)
 
 
-def __convert_reports(reports: List[Report],
+def write(reports: Iterable[Report],
+          severity_map: Dict[str, str],
+          output: TextIO) -> int:
+    """Write the reports to the output in gerrit review format.
+
+    The review comments are grouped by files, so the whole review is written
+    at once. Only the review comments are kept in the memory, the reports
+    are dropped as soon as they are converted. Returns the number of the
+    review comments.
+    """
+    review = convert(reports, severity_map)
+    json.dump(review, output)
+
+    return sum(len(c) for c in review['comments'].values())
+
+
+def __convert_reports(reports: Iterable[Report],
                       repo_dir: Union[str, None],
                       report_url: Union[str, None],
                       changed_files: List[str],
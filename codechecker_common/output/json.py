@@ -7,7 +7,9 @@
 # -------------------------------------------------------------------------
 """Helper and converter functions for json output format."""
 
-from typing import Dict
+import json
+from typing import Any, Dict, Iterable, TextIO
+
 from codechecker_common.report import Report
 
 
@@ -18,7 +20,47 @@ def convert_to_parse(report: Report) -> Dict:
     to the stdout in json format.
     """
     ret = report.main
-    ret["path"] = report.bug_path
+    ret["path"] = list(report.bug_path or [])
     ret["files"] = [v for k, v in report.files.items()]
 
     return ret
+
+
+def write_array(items: Iterable[Any], output: TextIO) -> int:
+    """Write the items as a json array to the output one by one.
+
+    The output is the same as dumping the list of the items, but only one
+    item is kept in the memory at a time. Returns the number of the items.
+    """
+    count = 0
+    output.write('[')
+    for item in items:
+        if count:
+            output.write(', ')
+        json.dump(item, output)
+        count += 1
+    output.write(']')
+
+    return count
+
+
+def write_lines(items: Iterable[Any], output: TextIO) -> int:
+    """Write every item as a json object in a separate line (JSON Lines).
+
+    Returns the number of the items.
+    """
+    count = 0
+    for item in items:
+        json.dump(item, output)
+        output.write('\n')
+        count += 1
+
+    return count
+
+
+def write(reports: Iterable[Report], output: TextIO) -> int:
+    """Write the reports in the json format of the parse command.
+
+    Returns the number of the written reports.
+    """
+    return write_array((convert_to_parse(r) for r in reports), output)
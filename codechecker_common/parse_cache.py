@@ -0,0 +1,353 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Cache of the parsed reports of the plist files in a report directory.
+
+The files, the metadata and the reports of every parsed plist file are
+stored in an SQLite database inside the report directory, so the plist files
+which have not changed since they were parsed are not parsed again. The
+entries are keyed on the name, the size and the modification time of the
+plist files.
+
+Every report is stored in its own row, so the reports of a plist file can be
+written while the plist file is parsed and read back in chunks. This way the
+cache never holds all the reports of a plist file in the memory.
+
+The cache is optional: if it can not be read or written (e.g. the report
+directory is read-only), the plist files are parsed as without the cache.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from codechecker_common.logger import get_logger
+from codechecker_common.report import Report
+
+LOG = get_logger('report')
+
+# Name of the cache file in the report directory.
+PARSE_CACHE_FILE = 'parse_cache.sqlite'
+
+# Version of the cache format. The cache is rebuilt if it was written in an
+# other format.
+PARSE_CACHE_VERSION = 2
+
+# Number of reports which are read from or written to the cache at once.
+REPORT_CHUNK_SIZE = 100
+
+
+def get_cache_key(plist_file: str) -> Optional[Tuple[int, int]]:
+    """ Returns the size and the modification time of the plist file. """
+    try:
+        stat = os.stat(plist_file)
+    except OSError:
+        return None
+
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _compress(value) -> bytes:
+    return zlib.compress(json.dumps(value).encode('utf-8'))
+
+
+def _decompress(data: bytes):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+class ParseCacheWriter(object):
+    """
+    Write the reports of a plist file into the parse cache while the plist
+    file is parsed. The entry becomes valid only when it is committed, so an
+    interrupted parse does not leave a partial entry behind.
+    """
+
+    def __init__(self, cache, plist_file: str, key: Tuple[int, int]):
+        self.__cache = cache
+        self.__plist_file = plist_file
+        self.__key = key
+        self.__reports = []
+        self.__count = 0
+        self.__failed = False
+
+    def add(self, report: Report):
+        """ Add the next report of the plist file to the entry. """
+        if self.__failed:
+            return
+
+        try:
+            self.__reports.append(
+                (self.__count,
+                 _compress([report.main, list(report.bug_path or [])])))
+        except (TypeError, ValueError) as ex:
+            # The plist file contains values which can not be cached.
+            LOG.debug("Failed to cache the reports of '%s': %s",
+                      self.__plist_file, ex)
+            self.__failed = True
+            return
+
+        self.__count += 1
+        if len(self.__reports) >= REPORT_CHUNK_SIZE:
+            self.__flush()
+
+    def __flush(self):
+        if self.__reports and not self.__failed:
+            self.__failed = not self.__cache.write_reports(
+                self.__plist_file, self.__reports)
+
+        self.__reports = []
+
+    def commit(self):
+        """ Write the remaining reports and make the entry valid. """
+        self.__flush()
+        if not self.__failed:
+            self.__cache.commit_entry(self.__plist_file, self.__key)
+
+
+class ParseCache(object):
+    """ Parsed reports of the plist files of a report directory. """
+
+    def __init__(self, report_dir: str):
+        self.report_dir = report_dir
+        self.cache_file = os.path.join(report_dir, PARSE_CACHE_FILE)
+
+        self.__connection = None
+        self.__pid = None
+        self.__disabled = False
+        self.__lock = threading.Lock()
+
+    def __connect(self):
+        """
+        Returns the connection to the cache database or None if the cache
+        can not be used. Forked processes open their own connection.
+        """
+        if self.__disabled:
+            return None
+
+        if self.__connection is not None and self.__pid == os.getpid():
+            return self.__connection
+
+        try:
+            connection = sqlite3.connect(self.cache_file, timeout=30,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != PARSE_CACHE_VERSION:
+                connection.execute("DROP TABLE IF EXISTS plist_files")
+                connection.execute("DROP TABLE IF EXISTS reports")
+                connection.execute("PRAGMA user_version = %d" %
+                                   PARSE_CACHE_VERSION)
+
+            # The size and the modification time of an entry are set when
+            # all of its reports are written.
+            connection.execute("CREATE TABLE IF NOT EXISTS plist_files ("
+                               "name TEXT PRIMARY KEY, "
+                               "size INTEGER, "
+                               "mtime INTEGER, "
+                               "data BLOB)")
+            connection.execute("CREATE TABLE IF NOT EXISTS reports ("
+                               "name TEXT, "
+                               "idx INTEGER, "
+                               "data BLOB, "
+                               "PRIMARY KEY (name, idx))")
+            connection.commit()
+        except sqlite3.Error as ex:
+            LOG.debug("Parse cache '%s' can not be used: %s",
+                      self.cache_file, ex)
+            self.__disabled = True
+            return None
+
+        self.__connection = connection
+        self.__pid = os.getpid()
+
+        return connection
+
+    def __execute(self, func, error_msg):
+        """
+        Call the function with the connection to the cache database. Returns
+        the result of the function or None if the cache can not be used.
+        """
+        with self.__lock:
+            connection = self.__connect()
+            if connection is None:
+                return None
+
+            try:
+                return func(connection)
+            except sqlite3.Error as ex:
+                LOG.debug("%s '%s': %s", error_msg, self.cache_file, ex)
+                connection.rollback()
+                return None
+
+    def iter_reports(self, plist_file: str, skip_bug_path=False) \
+            -> Optional[Tuple[Dict[int, str], Iterator[Report]]]:
+        """
+        Returns the source files and an iterator over the reports of the
+        plist file or None if the plist file is not cached or it has changed
+        since it was cached. The reports are read in chunks. If
+        skip_bug_path is set, the bug path of the reports is not kept.
+        """
+        key = get_cache_key(plist_file)
+        if key is None:
+            return None
+
+        name = os.path.basename(plist_file)
+        row = self.__execute(
+            lambda c: c.execute("SELECT size, mtime, data FROM plist_files "
+                                "WHERE name = ?", (name,)).fetchone(),
+            "Failed to read the parse cache")
+
+        if not row or tuple(row[:2]) != key:
+            return None
+
+        try:
+            data = _decompress(row[2])
+            files = {i: file_path
+                     for i, file_path in enumerate(data['files'])}
+            metadata = data['metadata']
+        except (zlib.error, KeyError, TypeError, ValueError) as ex:
+            LOG.debug("Invalid parse cache entry of '%s': %s",
+                      plist_file, ex)
+            return None
+
+        def __iter_reports():
+            idx = 0
+            while True:
+                rows = self.__execute(
+                    lambda c: c.execute(
+                        "SELECT data FROM reports WHERE name = ? AND "
+                        "idx >= ? ORDER BY idx LIMIT ?",
+                        (name, idx, REPORT_CHUNK_SIZE)).fetchall(),
+                    "Failed to read the parse cache")
+                if not rows:
+                    return
+
+                for report_data, in rows:
+                    main, bug_path = _decompress(report_data)
+                    yield Report(main, [] if skip_bug_path else bug_path,
+                                 files, metadata)
+
+                idx += len(rows)
+
+        return files, __iter_reports()
+
+    def get(self, plist_file: str, skip_bug_path=False) \
+            -> Optional[Tuple[Dict[int, str], List[Report]]]:
+        """
+        Returns the source files and the reports of the plist file or None if
+        the plist file is not cached or it has changed since it was cached.
+        If skip_bug_path is set, the bug path of the reports is not kept.
+        """
+        cached = self.iter_reports(plist_file, skip_bug_path)
+        if cached is None:
+            return None
+
+        files, reports = cached
+        try:
+            return files, list(reports)
+        except (zlib.error, TypeError, ValueError) as ex:
+            LOG.debug("Invalid parse cache entry of '%s': %s",
+                      plist_file, ex)
+            return None
+
+    def writer(self, plist_file: str, key: Tuple[int, int],
+               files: Dict[int, str], metadata=None) \
+            -> Optional[ParseCacheWriter]:
+        """
+        Start a new entry of the plist file and return the writer of its
+        reports or None if the entry can not be written. The key is the size
+        and the modification time of the plist file when it is parsed.
+        """
+        try:
+            data = _compress({'files': [files[i] for i in range(len(files))],
+                              'metadata': metadata})
+        except (KeyError, TypeError, ValueError) as ex:
+            LOG.debug("Failed to cache the reports of '%s': %s",
+                      plist_file, ex)
+            return None
+
+        name = os.path.basename(plist_file)
+
+        def __begin(connection):
+            connection.execute("DELETE FROM reports WHERE name = ?", (name,))
+            connection.execute(
+                "INSERT OR REPLACE INTO plist_files (name, size, mtime, data) "
+                "VALUES (?, NULL, NULL, ?)", (name, data))
+            connection.commit()
+            return True
+
+        if not self.__execute(__begin, "Failed to write the parse cache"):
+            return None
+
+        return ParseCacheWriter(self, plist_file, key)
+
+    def write_reports(self, plist_file: str,
+                      reports: List[Tuple[int, bytes]]) -> bool:
+        """
+        Write the compressed reports of a plist file with their index.
+        Returns False if the reports could not be written.
+        """
+        name = os.path.basename(plist_file)
+
+        def __write(connection):
+            connection.executemany(
+                "INSERT OR REPLACE INTO reports (name, idx, data) "
+                "VALUES (?, ?, ?)",
+                ((name, idx, data) for idx, data in reports))
+            connection.commit()
+            return True
+
+        return bool(self.__execute(__write, "Failed to write the parse cache"))
+
+    def commit_entry(self, plist_file: str, key: Tuple[int, int]):
+        """ Make the entry of the plist file valid for the given key. """
+        def __commit(connection):
+            connection.execute(
+                "UPDATE plist_files SET size = ?, mtime = ? WHERE name = ?",
+                (key[0], key[1], os.path.basename(plist_file)))
+            connection.commit()
+
+        self.__execute(__commit, "Failed to write the parse cache")
+
+    def put(self, plist_file: str, key: Tuple[int, int],
+            files: Dict[int, str], reports: List[Report], metadata=None):
+        """
+        Cache the source files and the reports of the plist file. The key is
+        the size and the modification time of the plist file when it was
+        parsed.
+        """
+        writer = self.writer(plist_file, key, files, metadata)
+        if writer is None:
+            return
+
+        for report in reports:
+            writer.add(report)
+        writer.commit()
+
+
+# Parse caches of the report directories used by the process.
+_PARSE_CACHES = {}
+_PARSE_CACHES_LOCK = threading.Lock()
+
+
+def get_parse_cache(plist_file: str) -> ParseCache:
+    """ Returns the parse cache of the report directory of the plist file. """
+    report_dir = os.path.dirname(os.path.abspath(plist_file))
+
+    with _PARSE_CACHES_LOCK:
+        cache = _PARSE_CACHES.get(report_dir)
+        if cache is None:
+            cache = ParseCache(report_dir)
+            _PARSE_CACHES[report_dir] = cache
+
+        return cache
@@ -31,20 +31,34 @@ With the newer clang releases more information is available in the plist files.
     for Clang versions before v3.7
 
 """
+import base64
+import datetime
 import importlib
+import json
 import os
 import sys
 import traceback
 import plistlib
-from typing import List, Dict, Tuple
+import zlib
+from typing import Iterator, List, Dict, Tuple
 from xml.parsers.expat import ExpatError
 
+from codechecker_common import parse_cache
 from codechecker_common.logger import get_logger
 from codechecker_common.report import Report
-from codechecker_report_hash.hash import get_report_hash, HashType
+from codechecker_report_hash.hash import get_report_hash, \
+    get_report_hashes, HashType
 
 LOG = get_logger('report')
 
+# Format of the date values of the plist files.
+PLIST_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Extension of the summary file written next to the post-processed plist
+# files.
+SUMMARY_FILE_EXT = '.summary.json'
+SUMMARY_VERSION = 1
+
 
 class LXMLPlistEventHandler(object):
     """
@@ -149,12 +163,27 @@ def get_checker_name(diagnostic, path=""):
 
 
 def parse_plist_file(path: str,
-                     allow_plist_update=True) \
+                     allow_plist_update=True,
+                     use_cache=False) \
                              -> Tuple[Dict[int, str], List[Report]]:
     """
     Parse the reports from a plist file.
     One plist file can contain multiple reports.
+
+    If use_cache is set, the reports are loaded from the parse cache of the
+    report directory if the plist file has not changed since it was parsed,
+    otherwise the parsed reports are written to the cache.
     """
+    cache = None
+    if use_cache:
+        cache = parse_cache.get_parse_cache(path)
+        cache_key = parse_cache.get_cache_key(path)
+        cached = cache.get(path)
+        if cached is not None:
+            LOG.debug("Loaded the reports of the plist from the parse "
+                      "cache: %s", path)
+            return cached
+
     LOG.debug("Parsing plist: %s", path)
 
     reports = []
@@ -177,6 +206,7 @@ def parse_plist_file(path: str,
         source_files = \
             {i: filepath for i, filepath in enumerate(mentioned_files)}
         diag_changed = False
+        hash_generated = False
         for diag in plist.get('diagnostics', []):
 
             available_keys = list(diag.keys())
@@ -201,6 +231,7 @@ def parse_plist_file(path: str,
                 # Generate hash value if it is missing from the report.
                 report_hash = get_report_hash(diag, file_path,
                                               HashType.PATH_SENSITIVE)
+                hash_generated = True
 
                 main_section['issue_hash_content_of_line_in_context'] = \
                     report_hash
@@ -223,6 +254,11 @@ def parse_plist_file(path: str,
             # report hash field is filled.
             with open(path, 'wb') as plist_file:
                 plistlib.dump(plist, plist_file)
+
+        # The generated report hashes depend on the source files, so these
+        # reports are not cached.
+        if cache and cache_key and not hash_generated:
+            cache.put(path, cache_key, source_files, reports, metadata)
     except IndexError as iex:
         LOG.warning('Indexing error during processing plist file %s', path)
         LOG.warning(type(iex))
@@ -239,6 +275,185 @@ def parse_plist_file(path: str,
         return source_files, reports
 
 
+def __get_plist_value(element):
+    """
+    Convert the given plist XML element to the Python object which would be
+    created by plistlib.
+    """
+    tag = element.tag
+    if tag == 'dict':
+        value = {}
+        children = iter(element)
+        for key in children:
+            value[key.text or ''] = __get_plist_value(next(children))
+        return value
+    elif tag == 'array':
+        return [__get_plist_value(child) for child in element]
+    elif tag == 'string':
+        return element.text or ''
+    elif tag == 'integer':
+        return int(element.text)
+    elif tag == 'real':
+        return float(element.text)
+    elif tag == 'true':
+        return True
+    elif tag == 'false':
+        return False
+    elif tag == 'data':
+        return base64.b64decode(element.text or '')
+    elif tag == 'date':
+        # plistlib writes the dates in this format (in UTC).
+        return datetime.datetime.strptime(element.text, PLIST_DATE_FORMAT)
+
+    raise ValueError("Unknown plist element: %s" % tag)
+
+
+def __iterparse_plist(path, keys, stream_key=None):
+    """
+    Iterate over the values of the given keys of the top level dictionary of
+    a plist file without building the whole document.
+
+    The items of the array of the stream key are yielded one by one as
+    (stream key, item) pairs, the values of the other keys are yielded as
+    (key, value) pairs. Every XML element is dropped as soon as it is
+    processed, so only one item is kept in memory at once.
+    """
+    from lxml.etree import iterparse
+
+    # Depth of the root dictionary is 2 (the plist element is at depth 1).
+    depth = 0
+    key = None
+    for event, element in iterparse(path, events=('start', 'end'),
+                                    remove_comments=True, huge_tree=True):
+        if event == 'start':
+            depth += 1
+            continue
+
+        if depth == 3:
+            if element.tag == 'key':
+                key = element.text
+            elif key in keys:
+                yield key, __get_plist_value(element)
+        elif depth == 4 and key == stream_key:
+            yield key, __get_plist_value(element)
+
+        # Release the processed elements.
+        if depth == 3 or (depth == 4 and key not in keys):
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+        depth -= 1
+
+
+def iter_plist_reports(path: str, skip_bug_path=False,
+                       use_cache=False) -> Iterator[Report]:
+    """
+    Iterate over the reports of a plist file one by one.
+
+    Unlike parse_plist_file() the plist file is not loaded into memory, the
+    diagnostics are parsed one at a time. The files and the metadata of the
+    plist file follow the diagnostics, so they are collected by a first quick
+    pass over the file. If skip_bug_path is set, the bug path of the reports
+    is not kept, only the main section. Missing report hashes are generated
+    but the plist file is never updated.
+
+    If the lxml library is not available, the whole plist file is parsed.
+
+    The reports are yielded while the plist file is parsed, so if the plist
+    file turns out to be invalid in the middle, the reports before the error
+    are already yielded and the rest of the reports are skipped. In this
+    case parse_plist_file() would return no reports at all.
+
+    If use_cache is set, the reports are loaded from the parse cache of the
+    report directory if the plist file has not changed since it was parsed,
+    otherwise the parsed reports are written to the cache. The reports are
+    read from and written to the cache one chunk at a time, so the cache does
+    not hold all the reports of the plist file in the memory either.
+    """
+    cache = None
+    if use_cache:
+        cache = parse_cache.get_parse_cache(path)
+        cache_key = parse_cache.get_cache_key(path)
+        cached = cache.iter_reports(path, skip_bug_path)
+        if cached is not None:
+            LOG.debug("Loaded the reports of the plist from the parse "
+                      "cache: %s", path)
+            try:
+                yield from cached[1]
+            except (zlib.error, TypeError, ValueError) as ex:
+                LOG.warning("Invalid parse cache entry of '%s': %s",
+                            path, ex)
+            return
+
+    LOG.debug("Parsing plist: %s", path)
+
+    try:
+        importlib.import_module('lxml')
+    except ImportError:
+        _, reports = parse_plist_file(path, False, use_cache)
+        if skip_bug_path:
+            reports = [Report(r.main, [], r.files, r.metadata)
+                       for r in reports]
+        yield from reports
+        return
+
+    from lxml.etree import XMLSyntaxError
+
+    try:
+        values = dict(__iterparse_plist(path, ['files', 'metadata']))
+        mentioned_files = values.get('files', [])
+        metadata = values.get('metadata')
+
+        # file index to filepath that bugpath events refer to
+        source_files = \
+            {i: filepath for i, filepath in enumerate(mentioned_files)}
+
+        # The reports are cached only if all of them are parsed with their
+        # bug path and without generating their report hash.
+        cache_writer = cache.writer(path, cache_key, source_files, metadata) \
+            if cache and cache_key and not skip_bug_path else None
+
+        for _, diag in __iterparse_plist(path, [], 'diagnostics'):
+            bug_path_items = diag.pop('path', [])
+
+            main_section = diag
+            main_section['check_name'] = get_checker_name(diag, path)
+
+            if not diag.get('issue_hash_content_of_line_in_context'):
+                cache_writer = None
+
+                file_path = os.path.join(
+                    os.path.dirname(path),
+                    mentioned_files[diag['location']['file']])
+
+                # Generate hash value if it is missing from the report.
+                diag['path'] = bug_path_items
+                main_section['issue_hash_content_of_line_in_context'] = \
+                    get_report_hash(diag, file_path,
+                                    HashType.PATH_SENSITIVE)
+                del diag['path']
+
+            report = Report(main_section,
+                            [] if skip_bug_path else bug_path_items,
+                            source_files,
+                            metadata)
+            if cache_writer:
+                cache_writer.add(report)
+
+            yield report
+
+        if cache_writer:
+            cache_writer.commit()
+    except (OSError, XMLSyntaxError) as ex:
+        LOG.error("Invalid plist file '%s': %s", path, ex)
+    except (KeyError, IndexError, TypeError, ValueError) as ex:
+        LOG.warning('Error during processing reports from the plist file: '
+                    '%s', path)
+        LOG.warning(type(ex))
+        LOG.warning(ex)
+
+
 def fids_in_range(rng):
     """
     Get the file ids from a range.
@@ -373,3 +588,149 @@ def skip_report_from_plist(plist_file, skip_handler):
             plist.write(new_plist_content)
     else:
         LOG.error("Failed to skip report from the plist file: %s", plist_file)
+
+
+def get_summary_file(plist_file):
+    """
+    Returns the path of the summary file which belongs to the given plist file.
+    """
+    return plist_file + SUMMARY_FILE_EXT
+
+
+def __get_summary(plist, plist_file):
+    """
+    Collect the summary of the reports of the given plist content which was
+    written into the given plist file.
+
+    The summary contains the files mentioned in the plist, the report hashes
+    and the main report positions (the file index and line of the last bug
+    path event) which are needed by the downstream commands.
+    """
+    stat = os.stat(plist_file)
+
+    report_hashes = []
+    main_report_positions = []
+    for diag in plist.get('diagnostics', []):
+        report_hashes.append(diag['issue_hash_content_of_line_in_context'])
+
+        location = diag['path'][-1]['location'] if diag.get('path') \
+            else diag['location']
+        main_report_positions.append([location['file'], location['line']])
+
+    return {'version': SUMMARY_VERSION,
+            'plist_mtime': stat.st_mtime_ns,
+            'plist_size': stat.st_size,
+            'report_count': len(report_hashes),
+            'files': plist.get('files', []),
+            'report_hashes': report_hashes,
+            'main_report_positions': main_report_positions}
+
+
+def load_summary(plist_file):
+    """
+    Load the summary of the given plist file. None is returned if there is no
+    summary or the plist file has changed since the summary was written.
+    """
+    summary_file = get_summary_file(plist_file)
+    try:
+        stat = os.stat(plist_file)
+        with open(summary_file, 'r',
+                  encoding='utf-8', errors='ignore') as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(summary, dict) or \
+            summary.get('version') != SUMMARY_VERSION or \
+            summary.get('plist_mtime') != stat.st_mtime_ns or \
+            summary.get('plist_size') != stat.st_size:
+        LOG.debug("Summary of %s is outdated.", plist_file)
+        return None
+
+    return summary
+
+
+def postprocess_plist(plist_file, skip_handler=None, hash_type=None,
+                      plist=None):
+    """
+    Post-process the reports of an analyzer result file in a single pass:
+      - reports in files which should be skipped are removed,
+      - report hashes are replaced by the given type of hash,
+      - missing report hashes are generated.
+
+    If the plist content was produced in memory it can be given by the plist
+    parameter, otherwise it is read from the plist file. The plist file is
+    written only if its content has changed. The summary of the final result
+    file is written next to it so the reports do not have to be parsed again
+    to get it.
+
+    Returns the summary or None if the post-processing failed.
+    """
+    summary_file = get_summary_file(plist_file)
+    if os.path.exists(summary_file):
+        os.remove(summary_file)
+
+    changed = plist is not None
+    if plist is None:
+        try:
+            with open(plist_file, 'rb') as plist_file_obj:
+                plist = parse_plist(plist_file_obj)
+        except OSError as ex:
+            LOG.error("Failed to read the plist file: %s", plist_file)
+            LOG.error(ex)
+            return None
+
+    if not plist:
+        LOG.error("Failed to post-process the plist file: %s", plist_file)
+        return None
+
+    try:
+        if skip_handler:
+            file_ids_to_remove = [i for i, f in enumerate(plist['files'])
+                                  if skip_handler.should_skip(f)]
+
+            if file_ids_to_remove or \
+                    (plist['files'] and not plist['diagnostics']):
+                kept_diagnostics, kept_files = \
+                    get_kept_report_data(plist, file_ids_to_remove)
+                plist['diagnostics'] = kept_diagnostics
+                plist['files'] = kept_files if kept_diagnostics else []
+                changed = True
+
+        files = plist.get('files', [])
+        diags_to_hash = []
+        for diag in plist.get('diagnostics', []):
+            if hash_type is not None:
+                file_path = files[diag['location']['file']]
+            elif not diag.get('issue_hash_content_of_line_in_context'):
+                # Generate hash value if it is missing from the report the
+                # same way as the parsing of the plist file would do.
+                file_path = os.path.join(os.path.dirname(plist_file),
+                                         files[diag['location']['file']])
+            else:
+                continue
+
+            diags_to_hash.append((diag, file_path))
+
+        report_hashes = get_report_hashes(
+            diags_to_hash, hash_type or HashType.PATH_SENSITIVE)
+        for (diag, _), report_hash in zip(diags_to_hash, report_hashes):
+            if diag.get('issue_hash_content_of_line_in_context') != \
+                    report_hash:
+                diag['issue_hash_content_of_line_in_context'] = report_hash
+                changed = True
+
+        if changed:
+            with open(plist_file, 'wb') as plist_file_obj:
+                plistlib.dump(plist, plist_file_obj)
+
+        summary = __get_summary(plist, plist_file)
+        with open(summary_file, 'w',
+                  encoding='utf-8', errors='ignore') as f:
+            json.dump(summary, f)
+
+        return summary
+    except (KeyError, IndexError, TypeError) as ex:
+        LOG.error("Failed to post-process the plist file: %s", plist_file)
+        LOG.error(ex)
+        return None
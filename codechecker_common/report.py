@@ -10,14 +10,275 @@ Parsers for the analyzer output formats (plist ...) should create this
 type of Report which will be printed or stored.
 """
 
+from array import array
+from collections.abc import Mapping, Sequence
 from typing import Dict, List
 import json
+import sys
+import weakref
 
 from codechecker_common.logger import get_logger
 from codechecker_common import util
 
 LOG = get_logger('report')
 
+# Maximum number of different key tuples shared by the reports.
+MAX_SHARED_KEYS = 4096
+
+# Key tuples of the main sections and the bug path items. Most of the reports
+# have the same keys, so the same tuple object is used by all of them.
+_SHARED_KEYS = {}
+
+# File tables of the reports. A file table is shared by the reports which
+# refer to the same files while any of them is alive.
+_FILE_TABLES = weakref.WeakValueDictionary()
+
+_LOCATION_KEYS = ('line', 'col', 'file')
+
+
+def _shared(keys):
+    """ Returns the shared instance of the given key tuple. """
+    shared = _SHARED_KEYS.get(keys)
+    if shared is None:
+        if len(_SHARED_KEYS) >= MAX_SHARED_KEYS:
+            return keys
+
+        shared = _SHARED_KEYS[keys] = keys
+
+    return shared
+
+
+def _intern(value):
+    """ Intern the given value if it is a string. """
+    return sys.intern(value) if type(value) is str else value
+
+
+def _is_small_int(value):
+    """ True if the value fits into an item of an array('i'). """
+    return type(value) is int and -2**31 <= value < 2**31
+
+
+def _is_location(value):
+    """ True if the value is a {line, col, file} location. """
+    return type(value) is dict and tuple(value) == _LOCATION_KEYS and \
+        all(_is_small_int(v) for v in value.values())
+
+
+def _append_location(ints, location):
+    """ Append the line, col and file of the location to the array.
+
+    TypeError is raised if the location can not be stored.
+    """
+    if type(location) is not dict or len(location) != 3:
+        raise TypeError("not a location")
+
+    ints.append(location['line'])
+    ints.append(location['col'])
+    ints.append(location['file'])
+
+
+def _append_range(ints, rng):
+    """ Append the locations of the [begin, end] range to the array. """
+    if type(rng) is not list or len(rng) != 2:
+        raise TypeError("not a range")
+
+    _append_location(ints, rng[0])
+    _append_location(ints, rng[1])
+
+
+def _location(ints, idx):
+    """ Build the location dictionary stored from the given index. """
+    return {'line': ints[idx], 'col': ints[idx + 1], 'file': ints[idx + 2]}
+
+
+def _range(ints, idx):
+    """ Build the range stored from the given index. """
+    return [_location(ints, idx), _location(ints, idx + 3)]
+
+
+def get_file_table(files):
+    """ Returns the shared file table of the given file index to path map.
+
+    Maps which are not indexed from zero by integers are returned as is.
+    """
+    if isinstance(files, FileTable) or type(files) is not dict or \
+            any(idx != i for i, idx in enumerate(files)):
+        return files
+
+    paths = tuple(_intern(path) for path in files.values())
+    table = _FILE_TABLES.get(paths)
+    if table is None:
+        table = FileTable(paths)
+        _FILE_TABLES[paths] = table
+
+    return table
+
+
+class FileTable(Mapping):
+    """ Read-only file index to file path map of the reports. """
+
+    __slots__ = ('__paths', '__weakref__')
+
+    def __init__(self, paths):
+        self.__paths = paths
+
+    def __getitem__(self, idx):
+        if type(idx) is not int or idx < 0 or idx >= len(self.__paths):
+            raise KeyError(idx)
+        return self.__paths[idx]
+
+    def __iter__(self):
+        return iter(range(len(self.__paths)))
+
+    def __len__(self):
+        return len(self.__paths)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class BugPath(Sequence):
+    """ Read-only list of the bug path items of a report.
+
+    Every item is stored by its keys and the type tags of its values (which
+    tuple is shared by the items of the same shape) while the values are
+    stored in columns: the integers and the locations in an integer array,
+    the strings and the other values in a tuple. The item dictionaries are
+    built when they are accessed.
+    """
+
+    __slots__ = ('__shapes', '__ints', '__int_offsets', '__objs',
+                 '__obj_offsets')
+
+    def __init__(self, items):
+        shapes = []
+        ints = array('i')
+        objs = []
+        int_offsets = array('I', [0])
+        obj_offsets = array('I', [0])
+
+        for item in items:
+            if type(item) is dict:
+                shapes.append(self.__encode(item, ints, objs))
+            else:
+                shapes.append(None)
+                objs.append(item)
+
+            int_offsets.append(len(ints))
+            obj_offsets.append(len(objs))
+
+        self.__shapes = tuple(shapes)
+        self.__ints = ints
+        self.__objs = tuple(objs)
+        self.__int_offsets = int_offsets
+        self.__obj_offsets = obj_offsets
+
+    @staticmethod
+    def __encode(item, ints, objs):
+        """ Store the values of the given item and returns its shape. """
+        shape = []
+        for key, value in item.items():
+            value_type = type(value)
+            size = len(ints)
+            try:
+                if value_type is str:
+                    tag = 's'
+                    objs.append(sys.intern(value))
+                elif value_type is int:
+                    tag = 'i'
+                    ints.append(value)
+                elif value_type is dict:
+                    tag = 'l'
+                    _append_location(ints, value)
+                elif value_type is list and \
+                        all(type(v) is list for v in value):
+                    tag = 'r'
+                    ints.append(len(value))
+                    for rng in value:
+                        _append_range(ints, rng)
+                elif value_type is list:
+                    tag = 'e'
+                    ints.append(len(value))
+                    for edge in value:
+                        if type(edge) is not dict or len(edge) != 2:
+                            raise TypeError("not an edge")
+                        _append_range(ints, edge['start'])
+                        _append_range(ints, edge['end'])
+                else:
+                    raise TypeError("not a stored type")
+            except (KeyError, TypeError, OverflowError):
+                # The value is kept as it is.
+                del ints[size:]
+                tag = 'o'
+                objs.append(value)
+
+            shape.append(key)
+            shape.append(tag)
+
+        return _shared(tuple(shape))
+
+    def __decode(self, idx):
+        """ Build the dictionary of the idx-th item. """
+        shape = self.__shapes[idx]
+        i = self.__int_offsets[idx]
+        j = self.__obj_offsets[idx]
+
+        if shape is None:
+            return self.__objs[j]
+
+        ints = self.__ints
+        item = {}
+        for k in range(0, len(shape), 2):
+            key, tag = shape[k], shape[k + 1]
+            if tag == 'i':
+                item[key] = ints[i]
+                i += 1
+            elif tag == 's' or tag == 'o':
+                item[key] = self.__objs[j]
+                j += 1
+            elif tag == 'l':
+                item[key] = _location(ints, i)
+                i += 3
+            elif tag == 'r':
+                count = ints[i]
+                item[key] = [_range(ints, i + 1 + n * 6)
+                             for n in range(count)]
+                i += 1 + count * 6
+            elif tag == 'e':
+                count = ints[i]
+                item[key] = [{'start': _range(ints, i + 1 + n * 12),
+                              'end': _range(ints, i + 7 + n * 12)}
+                             for n in range(count)]
+                i += 1 + count * 12
+
+        return item
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.__decode(i)
+                    for i in range(*idx.indices(len(self.__shapes)))]
+
+        if idx < 0:
+            idx += len(self.__shapes)
+        if idx < 0 or idx >= len(self.__shapes):
+            raise IndexError("bug path index out of range")
+
+        return self.__decode(idx)
+
+    def __len__(self):
+        return len(self.__shapes)
+
+    def __eq__(self, other):
+        if not isinstance(other, (BugPath, list, tuple)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+_EMPTY_BUG_PATH = BugPath([])
+
 
 class Report(object):
     """Represents an analyzer report.
@@ -25,24 +286,36 @@ class Report(object):
     The main section is where the analyzer reported the issue.
     The bugpath contains additional locations (and messages) which lead to
     the main section.
+
+    The report is stored in a compact form, the main section and the bug path
+    dictionaries are built when they are accessed, so modifying them does not
+    change the report.
     """
 
+    __slots__ = ('__main_keys', '__main_values', '__bug_path', '__files',
+                 '__source_line', '__metadata')
+
     def __init__(self,
                  main: Dict,
                  bugpath: Dict,
                  files: Dict[int, str],
                  metadata: Dict[str, str]):
 
-        # Dictionary containing checker name, report hash,
-        # main report position, report message ...
-        self.__main = main
-
-        # Dictionary containing bug path related data
-        # with control, event ... sections.
+        # Checker name, report hash, main report position, report message ...
+        # The key tuple is shared by the reports and the location is stored
+        # as a (line, col, file) tuple.
+        self.__main_keys = _shared(tuple(_intern(k) for k in main))
+        self.__main_values = tuple(
+            tuple(v.values()) if _is_location(v) else _intern(v)
+            for v in main.values())
+
+        # Bug path related data with control, event ... sections.
+        if type(bugpath) is list:
+            bugpath = BugPath(bugpath) if bugpath else _EMPTY_BUG_PATH
         self.__bug_path = bugpath
 
-        # Dictionary fileid to filepath that bugpath events refer to
-        self.__files = files
+        # Fileid to filepath that bugpath events refer to.
+        self.__files = get_file_table(files)
 
         # Can contain the soruce line where the main section was reported.
         self.__source_line = ""
@@ -50,29 +323,46 @@ class Report(object):
         # Dictionary containing metadata information (analyzer name, version).
         self.__metadata = metadata
 
+    def __get(self, key, *default):
+        """ Returns the value of the given key of the main section. """
+        try:
+            return self.__main_values[self.__main_keys.index(key)]
+        except ValueError:
+            if default:
+                return default[0]
+            raise KeyError(key)
+
+    def __location(self):
+        """ Returns the (line, col, file) of the main location. """
+        location = self.__get('location')
+        if type(location) is tuple:
+            return location
+        return location['line'], location['col'], location['file']
+
     @property
     def line(self) -> int:
-        return self.__main['location']['line']
+        return self.__location()[0]
 
     @property
     def col(self) -> int:
-        return self.__main['location']['col']
+        return self.__location()[1]
 
     @property
     def description(self) -> str:
-        return self.__main['description']
+        return self.__get('description')
 
     @property
     def main(self) -> Dict:
-        return self.__main
+        return {key: _location(value, 0) if type(value) is tuple else value
+                for key, value in zip(self.__main_keys, self.__main_values)}
 
     @property
     def report_hash(self) -> str:
-        return self.__main['issue_hash_content_of_line_in_context']
+        return self.__get('issue_hash_content_of_line_in_context')
 
     @property
     def check_name(self) -> str:
-        return self.__main['check_name']
+        return self.__get('check_name')
 
     @property
     def bug_path(self) -> Dict:
@@ -80,11 +370,11 @@ class Report(object):
 
     @property
     def notes(self) -> List[str]:
-        return self.__main.get('notes', [])
+        return self.__get('notes', [])
 
     @property
     def macro_expansions(self) -> List[str]:
-        return self.__main.get('macro_expansions', [])
+        return self.__get('macro_expansions', [])
 
     @property
     def files(self) -> Dict[int, str]:
@@ -93,7 +383,7 @@ class Report(object):
     @property
     def file_path(self) -> str:
         """ Get the filepath for the main report location. """
-        return self.files[self.__main['location']['file']]
+        return self.files[self.__location()[2]]
 
     @property
     def source_line(self) -> str:
@@ -116,22 +406,23 @@ class Report(object):
         return self.__metadata
 
     def __str__(self):
-        msg = json.dumps(self.__main, sort_keys=True, indent=2)
+        msg = json.dumps(self.main, sort_keys=True, indent=2)
         msg += str(self.__files)
         return msg
 
     def trim_path_prefixes(self, path_prefixes=None):
         """ Removes the longest matching leading path from the file paths. """
-        self.__files = {i: util.trim_path_prefixes(file_path, path_prefixes)
-                        for i, file_path in self.__files.items()}
+        self.__files = get_file_table(
+            {i: util.trim_path_prefixes(file_path, path_prefixes)
+             for i, file_path in self.__files.items()})
 
     def to_json(self):
         """Converts to a special json format.
 
         This format is used by the parse command when the reports are printed
         to the stdout in json format."""
-        ret = self.__main
-        ret["path"] = self.bug_path
+        ret = self.main
+        ret["path"] = list(self.bug_path or [])
         ret["files"] = self.files.values()
 
         return ret
@@ -9,6 +9,7 @@
 """
 
 
+from collections import OrderedDict
 import fnmatch
 import re
 import os
@@ -17,6 +18,104 @@ from codechecker_common.logger import get_logger
 
 LOG = get_logger('system')
 
+# Characters which make a skip pattern a glob pattern instead of a literal
+# path prefix.
+GLOB_CHARS = re.compile(r'[*?[]')
+
+
+class SkipPatternMatcher(object):
+    """
+    Find the first skip pattern matching a path.
+
+    The patterns are stored in a trie by the directories of their literal
+    prefix (the part before the first wildcard), so only the patterns which
+    belong to the directories of the given path are checked. Patterns without
+    wildcards (except the trailing '*' added to every pattern) match the paths
+    starting with them. Glob patterns of the same directory are combined into
+    a single regular expression, where the alternatives are tried in the
+    order of the patterns.
+    """
+
+    def __init__(self, patterns):
+        """
+        Patterns are the normalized paths of the skip lines in order.
+        """
+        self.__root = SkipPatternMatcher.__new_node()
+
+        for idx, pattern in enumerate(patterns):
+            glob_char = GLOB_CHARS.search(pattern)
+            prefix = pattern[:glob_char.start()] if glob_char else pattern
+
+            dir_end = prefix.rfind('/') + 1
+            node = self.__root
+            for segment in re.findall(r'[^/]*/', prefix[:dir_end]):
+                node = node['children'].setdefault(
+                    segment, SkipPatternMatcher.__new_node())
+
+            if glob_char:
+                node['globs'].append((idx, fnmatch.translate(pattern + '*')))
+            elif all(tail != prefix[dir_end:] for tail, _ in node['literals']):
+                # The first pattern wins if a prefix is given multiple times.
+                node['literals'].append((prefix[dir_end:], idx))
+
+        self.__compile_globs(self.__root)
+
+    @staticmethod
+    def __new_node():
+        """
+        Returns a node of the trie. The children are the nodes of the
+        subdirectories by their name followed by a '/'.
+        """
+        return {'children': {}, 'literals': [], 'globs': [],
+                'glob_regex': None, 'glob_indices': {}}
+
+    def __compile_globs(self, node):
+        """ Combine the glob patterns of every node of the trie. """
+        group = 1
+        regexes = []
+        for idx, regex in node['globs']:
+            regexes.append('({0})'.format(regex))
+            node['glob_indices'][group] = idx
+            group += 1 + re.compile(regex).groups
+
+        if regexes:
+            node['glob_regex'] = re.compile('|'.join(regexes))
+        del node['globs']
+
+        for child in node['children'].values():
+            self.__compile_globs(child)
+
+    def match(self, path):
+        """
+        Index of the first pattern matching the given path or None if no
+        pattern matches.
+        """
+        match = None
+        node = self.__root
+        pos = 0
+        while True:
+            for tail, idx in node['literals']:
+                if (match is None or idx < match) and \
+                        path.startswith(tail, pos):
+                    match = idx
+
+            if node['glob_regex']:
+                glob_match = node['glob_regex'].match(path)
+                if glob_match:
+                    idx = node['glob_indices'][glob_match.lastindex]
+                    if match is None or idx < match:
+                        match = idx
+
+            dir_end = path.find('/', pos) + 1
+            if not dir_end:
+                return match
+
+            node = node['children'].get(path[pos:dir_end])
+            if node is None:
+                return match
+
+            pos = dir_end
+
 
 class SkipListHandler(object):
     """
@@ -28,11 +127,16 @@ class SkipListHandler(object):
     -/dir/*
     """
 
+    # Number of recent decisions remembered by the handler.
+    MEMO_SIZE = 4096
+
     def __init__(self, skip_file_content=""):
         """
         Process the lines of the skip file.
         """
         self.__skip = []
+        self.__matcher = None
+        self.__memo = OrderedDict()
 
         self.__skip_file_lines = [line.strip() for line
                                   in skip_file_content.splitlines()
@@ -51,9 +155,11 @@ class SkipListHandler(object):
         """
         for skip_line in skip_lines:
             norm_skip_path = os.path.normpath(skip_line[1:].strip())
-            rexpr = re.compile(
-                fnmatch.translate(norm_skip_path + '*'))
-            self.__skip.append((skip_line, rexpr))
+            self.__skip.append((skip_line, norm_skip_path))
+
+        self.__matcher = SkipPatternMatcher(
+            [pattern for _, pattern in self.__skip])
+        self.__memo = OrderedDict()
 
     def __check_line_format(self, skip_lines):
         """
@@ -86,6 +192,14 @@ class SkipListHandler(object):
         valid_lines = self.__check_line_format(skip_lines)
         self.__gen_regex(valid_lines)
 
+    def __getstate__(self):
+        """
+        The remembered decisions are not copied to the worker processes.
+        """
+        state = self.__dict__.copy()
+        state['_SkipListHandler__memo'] = OrderedDict()
+        return state
+
     def should_skip(self, source):
         """
         Check if the given source should be skipped.
@@ -94,8 +208,16 @@ class SkipListHandler(object):
         if not self.__skip:
             return False
 
-        for line, rexpr in self.__skip:
-            if rexpr.match(source):
-                sign = line[0]
-                return sign == '-'
-        return False
+        skip = self.__memo.get(source)
+        if skip is not None:
+            self.__memo.move_to_end(source)
+            return skip
+
+        idx = self.__matcher.match(source)
+        skip = idx is not None and self.__skip[idx][0][0] == '-'
+
+        self.__memo[source] = skip
+        if len(self.__memo) > self.MEMO_SIZE:
+            self.__memo.popitem(last=False)
+
+        return skip
@@ -10,7 +10,12 @@ Source code comment handling.
 """
 
 
+from collections import OrderedDict
+import hashlib
+import io
+import os
 import re
+import threading
 
 from codechecker_common import util
 from codechecker_common.logger import get_logger
@@ -21,6 +26,9 @@ LOG = get_logger('system')
 REVIEW_STATUS_VALUES = ["confirmed", "false_positive", "intentional",
                         "suppress", "unreviewed"]
 
+# Maximum number of cached source code comment indexes.
+MAX_CACHED_INDEXES = 1024
+
 
 def contains_codechecker_comment(fp):
     """Returns true if the file content contains any
@@ -53,6 +61,17 @@ class SourceCodeCommentHandler(object):
         'codechecker_intentional',
         'codechecker_confirmed']
 
+    @staticmethod
+    def is_comment_line(source_line):
+        """
+        Returns True if the source code comments of the line below the given
+        source line can be found: the line is a '//' comment or contains the
+        start or the end of a C style comment.
+        """
+        return SourceCodeCommentHandler.__check_if_comment(source_line) or \
+            any(SourceCodeCommentHandler.__check_if_cstyle_comment(
+                source_line))
+
     @staticmethod
     def __check_if_comment(source_line):
         """
@@ -176,6 +195,18 @@ class SourceCodeCommentHandler(object):
     def get_source_line_comments(self, fp, bug_line):
         """ Returns the preprocessed source code comments for a bug line.
 
+        raise: SpellException in case there is a spell error in the
+               codechecker review comment keyword
+        """
+        return self.get_comments_above(lambda line: util.get_linef(fp, line),
+                                       bug_line)
+
+    def get_comments_above(self, get_line, bug_line):
+        """ Returns the preprocessed source code comments for a bug line.
+
+        get_line is a function which returns the line of the source file at
+        the given line number or an empty string if there is no such line.
+
         raise: SpellException in case there is a spell error in the
                codechecker review comment keyword
         """
@@ -194,7 +225,7 @@ class SourceCodeCommentHandler(object):
 
         while True:
 
-            source_line = util.get_linef(fp, previous_line_num)
+            source_line = get_line(previous_line_num)
 
             # cpp style comment
             is_comment = \
@@ -290,6 +321,14 @@ class SourceCodeCommentHandler(object):
         """
         source_line_comments = self.get_source_line_comments(fp, bug_line)
 
+        return self.filter_comments(source_line_comments, bug_line,
+                                    checker_name)
+
+    def filter_comments(self, source_line_comments, bug_line, checker_name):
+        """
+        Filter the source code comments of the bug line by the checker name
+        the same way as filter_source_line_comments does.
+        """
         if not source_line_comments:
             return []
 
@@ -321,3 +360,170 @@ class SourceCodeCommentHandler(object):
                       "checker '%s': %s", checker_name,
                       checker_name_comments[0])
         return checker_name_comments
+
+
+class SourceCodeCommentIndex(object):
+    """
+    Source code comments of a source file indexed by the bug lines.
+
+    The source file is read once and the review comments above every line
+    are collected, so the comments of every report in the file can be looked
+    up without reading the file again. Only the lines with review comments
+    or misspelled review comments are stored.
+    """
+
+    def __init__(self, comments=None, misspelled=None):
+        # Source code comments of the bug lines.
+        self.__comments = comments or {}
+
+        # Spell errors of the review comments above the bug lines.
+        self.__misspelled = misspelled or {}
+
+    @staticmethod
+    def from_lines(lines, sc_handler=None):
+        """ Build the index from the lines of a source file. """
+        if not any('codechecker_' in line for line in lines):
+            return SourceCodeCommentIndex()
+
+        if sc_handler is None:
+            sc_handler = SourceCodeCommentHandler()
+
+        def get_line(line_num):
+            return lines[line_num - 1] if 0 < line_num <= len(lines) else ''
+
+        comments = {}
+        misspelled = {}
+        for line_num, line in enumerate(lines, 1):
+            # Only the lines below a comment can have source code comments.
+            if not sc_handler.is_comment_line(line):
+                continue
+
+            bug_line = line_num + 1
+            try:
+                line_comments = sc_handler.get_comments_above(get_line,
+                                                              bug_line)
+                if line_comments:
+                    comments[bug_line] = line_comments
+            except SpellException as ex:
+                misspelled[bug_line] = str(ex)
+
+        return SourceCodeCommentIndex(comments, misspelled)
+
+    @staticmethod
+    def from_file(fp):
+        """ Build the index from a source file opened in text mode. """
+        fp.seek(0)
+        return SourceCodeCommentIndex.from_lines(fp.readlines())
+
+    @property
+    def misspelled_comments(self):
+        """ Spell error messages of the misspelled review comments. """
+        return [self.__misspelled[bug_line]
+                for bug_line in sorted(self.__misspelled)]
+
+    def __bool__(self):
+        return bool(self.__comments or self.__misspelled)
+
+    def get_source_line_comments(self, bug_line):
+        """ Returns the preprocessed source code comments for a bug line.
+
+        raise: SpellException in case there is a spell error in the
+               codechecker review comment keyword
+        """
+        if bug_line in self.__misspelled:
+            raise SpellException(self.__misspelled[bug_line])
+
+        return list(self.__comments.get(bug_line, []))
+
+    def filter_source_line_comments(self, bug_line, checker_name):
+        """
+        Returns the source code comments of the bug line which belong to the
+        given checker. See SourceCodeCommentHandler.filter_comments.
+        """
+        return SourceCodeCommentHandler().filter_comments(
+            self.get_source_line_comments(bug_line), bug_line, checker_name)
+
+
+class SourceCodeCommentIndexCache(object):
+    """
+    Source code comment indexes of the least recently used source files.
+
+    The indexes are cached by the content hash of the source files, so the
+    same content is indexed only once even if it can be found at multiple
+    paths.
+    """
+
+    def __init__(self, max_indexes=MAX_CACHED_INDEXES):
+        self.max_indexes = max_indexes
+
+        # Stat key and content hash of the source file paths.
+        self.__content_hashes = OrderedDict()
+        self.__indexes = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_index(self, file_path):
+        """ Returns the source code comment index of the source file.
+
+        OSError is raised if the file can not be read.
+        """
+        stat = os.stat(file_path)
+        stat_key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+        with self.__lock:
+            cached = self.__content_hashes.get(file_path)
+            if cached and cached[0] == stat_key and \
+                    cached[1] in self.__indexes:
+                self.__content_hashes.move_to_end(file_path)
+                self.__indexes.move_to_end(cached[1])
+                return self.__indexes[cached[1]]
+
+        with open(file_path, 'rb') as source_file:
+            content = source_file.read()
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        with self.__lock:
+            index = self.__indexes.get(content_hash)
+
+        if index is None:
+            # Read the lines the same way as from a file opened in text mode.
+            lines = io.TextIOWrapper(io.BytesIO(content), encoding='utf-8',
+                                     errors='ignore').readlines()
+            index = SourceCodeCommentIndex.from_lines(lines)
+
+        self.add_index(content_hash, index)
+        with self.__lock:
+            self.__content_hashes[file_path] = (stat_key, content_hash)
+            self.__content_hashes.move_to_end(file_path)
+            while len(self.__content_hashes) > self.max_indexes:
+                self.__content_hashes.popitem(last=False)
+
+        return index
+
+    def get_index_by_hash(self, content_hash):
+        """ Returns the cached index of the given content hash or None. """
+        with self.__lock:
+            index = self.__indexes.get(content_hash)
+            if index is not None:
+                self.__indexes.move_to_end(content_hash)
+            return index
+
+    def add_index(self, content_hash, index):
+        """ Cache the index of a source file with the given content hash. """
+        with self.__lock:
+            self.__indexes[content_hash] = index
+            self.__indexes.move_to_end(content_hash)
+            while len(self.__indexes) > self.max_indexes:
+                self.__indexes.popitem(last=False)
+
+
+# Source code comment index cache shared by the modules of the process.
+_INDEX_CACHE = SourceCodeCommentIndexCache()
+
+
+def get_source_code_comment_index(file_path):
+    """
+    Returns the source code comment index of the source file from the cache
+    shared by the modules of the process. OSError is raised if the file can
+    not be read.
+    """
+    return _INDEX_CACHE.get_index(file_path)
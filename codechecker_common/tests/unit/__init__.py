@@ -15,3 +15,4 @@ import sys
 
 REPO_ROOT = os.path.abspath(os.environ['REPO_ROOT'])
 sys.path.append(REPO_ROOT)
+sys.path.append(os.path.join(REPO_ROOT, 'tools', 'codechecker_report_hash'))
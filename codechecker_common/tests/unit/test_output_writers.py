@@ -0,0 +1,74 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+
+"""Tests for writing the reports in the export formats one by one."""
+
+
+import io
+import json
+import unittest
+
+from codechecker_common.output import codeclimate, gerrit, \
+    json as out_json
+from codechecker_common.report import Report
+
+
+def get_reports():
+    """ Returns a generator of reports which can be iterated only once. """
+    for i in range(5):
+        loc = {"file": i % 2, "line": i + 1, "col": 3}
+        main = {"location": loc,
+                "description": "description %d" % i,
+                "check_name": "checker_%d" % (i % 3),
+                "issue_hash_content_of_line_in_context": "hash_%d" % i}
+        bug_path = [{"kind": "event", "location": loc, "message": "msg"}]
+        files = {0: "/src/main.cpp", 1: "/src/lib.h"}
+
+        yield Report(main, bug_path, files, None)
+
+
+class TestOutputWriters(unittest.TestCase):
+    """ The written output is the same as dumping the converted reports. """
+
+    def test_json(self):
+        output = io.StringIO()
+        self.assertEqual(out_json.write(get_reports(), output), 5)
+
+        expected = [out_json.convert_to_parse(r) for r in get_reports()]
+        self.assertEqual(output.getvalue(), json.dumps(expected))
+
+    def test_json_lines(self):
+        output = io.StringIO()
+        items = (out_json.convert_to_parse(r) for r in get_reports())
+        self.assertEqual(out_json.write_lines(items, output), 5)
+
+        expected = [out_json.convert_to_parse(r) for r in get_reports()]
+        lines = output.getvalue().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected)
+
+    def test_empty(self):
+        output = io.StringIO()
+        self.assertEqual(out_json.write([], output), 0)
+        self.assertEqual(output.getvalue(), json.dumps([]))
+
+    def test_codeclimate(self):
+        output = io.StringIO()
+        self.assertEqual(codeclimate.write(get_reports(), output), 5)
+
+        expected = codeclimate.convert(list(get_reports()))
+        self.assertEqual(output.getvalue(), json.dumps(expected))
+
+    def test_gerrit(self):
+        severity_map = {"checker_0": "HIGH"}
+
+        output = io.StringIO()
+        self.assertEqual(gerrit.write(get_reports(), severity_map, output),
+                         5)
+
+        expected = gerrit.convert(list(get_reports()), severity_map)
+        self.assertEqual(output.getvalue(), json.dumps(expected))
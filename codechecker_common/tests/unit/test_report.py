@@ -0,0 +1,103 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""Tests for the compact representation of the reports."""
+
+import copy
+import pickle
+import unittest
+
+from codechecker_common.report import Report
+
+
+def location(line, col, file_idx=0):
+    return {'line': line, 'col': col, 'file': file_idx}
+
+
+MAIN = {
+    'category': 'Logic error',
+    'check_name': 'core.DivideZero',
+    'description': 'Division by zero',
+    'issue_hash_content_of_line_in_context': '79e31a6ba028f0b7d9779faf4a6',
+    'location': location(8, 13),
+    'notes': [{'location': location(3, 1, 1), 'message': 'note'}],
+    'type': 'Division by zero'}
+
+BUG_PATH = [
+    {'kind': 'control',
+     'edges': [{'start': [location(7, 3), location(7, 5)],
+                'end': [location(8, 11), location(8, 11)]}]},
+    {'kind': 'event',
+     'location': location(8, 13),
+     'ranges': [[location(8, 11), location(8, 15)]],
+     'depth': 0,
+     'extended_message': 'Division by zero',
+     'message': 'Division by zero'},
+    {'kind': 'event',
+     'location': location(2**40, 1),
+     'depth': 1,
+     'message': 'Large line',
+     'custom': {'key': [1, 2]}}]
+
+FILES = {0: '/src/main.cpp', 1: '/src/main.h'}
+
+
+class ReportTest(unittest.TestCase):
+    """Test the dictionary views of the compact reports."""
+
+    def test_views(self):
+        """The report gives back the dictionaries it was created from."""
+        report = Report(copy.deepcopy(MAIN), copy.deepcopy(BUG_PATH),
+                        dict(FILES), None)
+
+        self.assertEqual(report.main, MAIN)
+        self.assertEqual(report.bug_path, BUG_PATH)
+        self.assertEqual(list(report.bug_path), BUG_PATH)
+        self.assertEqual(report.bug_path[-1], BUG_PATH[-1])
+        self.assertEqual(report.bug_path[1:], BUG_PATH[1:])
+        self.assertEqual(report.files, FILES)
+        self.assertEqual(report.line, 8)
+        self.assertEqual(report.col, 13)
+        self.assertEqual(report.file_path, '/src/main.cpp')
+        self.assertEqual(report.check_name, 'core.DivideZero')
+        self.assertEqual(report.notes, MAIN['notes'])
+        self.assertEqual(report.macro_expansions, [])
+
+        with self.assertRaises(IndexError):
+            report.bug_path[len(BUG_PATH)]
+        with self.assertRaises(KeyError):
+            report.files[2]
+
+    def test_shared_files(self):
+        """Reports referring to the same files share the file table."""
+        report1 = Report(MAIN, BUG_PATH, dict(FILES), None)
+        report2 = Report(MAIN, [], dict(FILES), None)
+        self.assertIs(report1.files, report2.files)
+
+        report2.trim_path_prefixes(['/src'])
+        self.assertEqual(report2.files, {0: 'main.cpp', 1: 'main.h'})
+        self.assertEqual(report1.files, FILES)
+
+    def test_other_values(self):
+        """Bug paths and file maps of other types are kept as they are."""
+        report = Report({'check_name': 'checker'}, {}, {1: 'main.cpp'}, None)
+        self.assertEqual(report.main, {'check_name': 'checker'})
+        self.assertEqual(report.bug_path, {})
+        self.assertEqual(report.files, {1: 'main.cpp'})
+
+        with self.assertRaises(KeyError):
+            report.description
+
+    def test_pickle(self):
+        """Reports can be sent to other processes."""
+        report = Report(MAIN, BUG_PATH, dict(FILES), {'analyzer': 'clangsa'})
+
+        copied = pickle.loads(pickle.dumps(report))
+        self.assertEqual(copied.main, MAIN)
+        self.assertEqual(copied.bug_path, BUG_PATH)
+        self.assertEqual(copied.files, FILES)
+        self.assertEqual(copied.metadata, report.metadata)
@@ -16,6 +16,7 @@ import os
 import portalocker
 
 from codechecker_common.logger import get_logger
+from codechecker_report_hash import source_cache
 
 LOG = get_logger('system')
 
@@ -37,7 +38,28 @@ def get_linef(fp, line_no):
     """'fp' should be (readable) file object.
     Return the line content at line_no or an empty line
     if there is less lines than line_no.
+
+    If the file object was opened by its path with utf-8 encoding, the line
+    is looked up in the shared source cache instead of reading the file
+    from the beginning.
     """
+    file_name = getattr(fp, 'name', None)
+    encoding = getattr(fp, 'encoding', None) or ''
+    if isinstance(file_name, str) and \
+            encoding.lower().replace('-', '') == 'utf8':
+        try:
+            stat = os.fstat(fp.fileno())
+            source_file = \
+                source_cache.get_source_cache().get_source_file(file_name)
+
+            # The path can refer to an other file if the working directory
+            # has changed since the file was opened.
+            if source_file.stat_key == \
+                    (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                return source_file.get_line(line_no, fp.errors or 'strict')
+        except OSError:
+            pass
+
     fp.seek(0)
     for line in fp:
         line_no -= 1
@@ -60,14 +82,7 @@ def get_line(file_name, line_no, errors='ignore'):
     Changing the encoding error handling can influence the hash content!
     """
     try:
-        with open(file_name, mode='r',
-                  encoding='utf-8',
-                  errors=errors) as source_file:
-            for line in source_file:
-                line_no -= 1
-                if line_no == 0:
-                    return line
-            return ''
+        return source_cache.get_line(file_name, line_no, errors)
     except IOError:
         LOG.error("Failed to open file %s", file_name)
         return ''
@@ -0,0 +1,130 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Benchmark of the memory used by the reports of a large result set.
+
+The compact Report type is compared to keeping the main section, the bug path
+and the file map dictionaries of the plist files, which was the original
+implementation of the reports.
+"""
+
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from codechecker_common.report import Report  # noqa
+
+
+class DictReport(object):
+    """ Keep the dictionaries of the plist file. """
+
+    def __init__(self, main, bugpath, files, metadata):
+        self.main = main
+        self.bug_path = bugpath
+        self.files = files
+        self.metadata = metadata
+
+
+def location(line, col, file_idx):
+    return {'line': line, 'col': col, 'file': file_idx}
+
+
+def generate_reports(report_count, reports_per_file):
+    """
+    Generate the main section, the bug path and the files of the reports
+    similar to the ones parsed from the plist files of Clang Static Analyzer.
+    """
+    files = None
+    for i in range(report_count):
+        if i % reports_per_file == 0:
+            # Every plist file has its own file map.
+            files = {0: '/project/src/module_{0}/file_{1}.cpp'.format(
+                         i % 100, i // reports_per_file),
+                     1: '/project/include/module_{0}.h'.format(i % 100)}
+
+        line = random.randrange(1, 5000)
+        main = {
+            'category': 'Logic error',
+            'check_name': 'core.NullDereference',
+            'description': "Access to field 'x' results in a dereference "
+                           "of a null pointer (loaded from variable 'p')",
+            'issue_hash_content_of_line_in_context': '%032x' % i,
+            'issue_context_kind': 'function',
+            'issue_context': 'function_{0}'.format(i),
+            'issue_hash_function_offset': '3',
+            'location': location(line, 5, 0),
+            'type': 'Dereference of null pointer'}
+
+        bug_path = []
+        for depth in range(random.randrange(1, 8)):
+            event_line = line - depth * 3
+            bug_path.append({
+                'kind': 'control',
+                'edges': [{'start': [location(event_line - 1, 3, 0),
+                                     location(event_line - 1, 5, 0)],
+                           'end': [location(event_line, 3, 0),
+                                   location(event_line, 9, 0)]}]})
+            bug_path.append({
+                'kind': 'event',
+                'location': location(event_line, 5, 0),
+                'ranges': [[location(event_line, 5, 0),
+                            location(event_line, 9, 0)]],
+                'depth': 0,
+                'extended_message': "'p' initialized to a null pointer value",
+                'message': "'p' initialized to a null pointer value"})
+
+        yield main, bug_path, files
+
+
+def measure(report_type, args):
+    """ Returns the duration and the memory used by the created reports. """
+    random.seed(0)
+    gc.collect()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    reports = [report_type(main, bug_path, files, None)
+               for main, bug_path, files in generate_reports(
+                   args.reports, args.reports_per_file)]
+    duration = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return len(reports), duration, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--reports', type=int, default=1000000,
+                        help="Number of the generated reports.")
+    parser.add_argument('--reports-per-file', type=int, default=50,
+                        help="Number of the generated reports per plist "
+                             "file.")
+    args = parser.parse_args()
+
+    for name, report_type in [('dictionaries', DictReport),
+                              ('compact reports', Report)]:
+        count, duration, memory = measure(report_type, args)
+        print("{0:<16} reports: {1}  time: {2:8.3f}s  memory: {3:8.1f} MiB "
+              "({4:.0f} bytes per report)".format(
+                  name, count, duration, memory / 1024 / 1024,
+                  memory / count))
+
+
+if __name__ == '__main__':
+    main()
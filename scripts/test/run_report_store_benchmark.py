@@ -0,0 +1,213 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Benchmark of storing the reports of a run into the database.
+
+The same generated reports are stored into two runs: one by adding the
+reports one by one to the session (store_handler.addReport) and one by the
+bulk storage (store_handler.ReportBulkStorage). The stored reports, bug
+paths, events and extended data of the two runs are compared after the
+storage.
+"""
+
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.append(REPO_ROOT)
+sys.path.append(os.path.join(REPO_ROOT, 'web'))
+sys.path.append(os.path.join(REPO_ROOT, 'web', 'server'))
+sys.path.append(os.path.join(REPO_ROOT, 'tools', 'codechecker_report_hash'))
+
+import sqlalchemy  # noqa
+from sqlalchemy.orm import sessionmaker  # noqa
+
+from codechecker_api.codeCheckerDBAccess_v6 import ttypes  # noqa
+
+from codechecker_server.api import store_handler  # noqa
+from codechecker_server.database.run_db_model import Base, BugPathEvent, \
+    BugReportPoint, ExtendedReportData, File, FileContent, Report, Run  # noqa
+
+SEVERITY_MAP = {'core.NullDereference': 'HIGH',
+                'core.DivideZero': 'HIGH',
+                'deadcode.DeadStores': 'LOW'}
+
+
+def generate_reports(report_count, file_ids):
+    """ Generate the arguments of the reports to store. """
+    checkers = sorted(SEVERITY_MAP)
+    for i in range(report_count):
+        file_id = file_ids[i % len(file_ids)]
+        line = random.randrange(10, 5000)
+        checker_name = checkers[i % len(checkers)]
+
+        main = {'check_name': checker_name,
+                'issue_hash_content_of_line_in_context': '%032x' % i,
+                'description': 'Report {0}'.format(i),
+                'category': 'Logic error',
+                'type': checker_name,
+                'location': {'line': line, 'col': 5, 'file': 0}}
+
+        depth = random.randrange(1, 8)
+        bug_path = [ttypes.BugPathPos(line - d, 3, line - d, 9, file_id)
+                    for d in range(depth)]
+        events = [ttypes.BugPathEvent(line - d, 5, line - d, 9,
+                                      'Event {0}'.format(d), file_id)
+                  for d in range(depth)]
+        extended_data = [ttypes.ExtendedReportData(
+            ttypes.ExtendedReportDataType.NOTE, line, 1, line, 2, 'Note',
+            file_id)] if i % 3 == 0 else []
+
+        analyzer_name = 'clangsa' if i % 5 else None
+
+        yield main, bug_path, events, extended_data, file_id, analyzer_name
+
+
+def create_files(session, file_count):
+    """ Create the source files of the reports. Returns their ids. """
+    session.add(FileContent('0' * 64, b''))
+    files = [File('/src/file_{0}.cpp'.format(i), '0' * 64)
+             for i in range(file_count)]
+    session.add_all(files)
+    session.flush()
+
+    return [f.id for f in files]
+
+
+def create_run(session, name):
+    """ Create a run and returns its id. """
+    run = Run(name, 'v6.40', 'CodeChecker analyze')
+    session.add(run)
+    session.flush()
+
+    return run.id
+
+
+def store_one_by_one(session, run_id, reports, detected_at):
+    for main, bug_path, events, extended_data, file_id, analyzer_name \
+            in reports:
+        store_handler.addReport(session, run_id, file_id, main, bug_path,
+                                events, extended_data, 'new', detected_at,
+                                SEVERITY_MAP, analyzer_name)
+
+
+def store_bulk(session, run_id, reports, detected_at):
+    report_storage = store_handler.ReportBulkStorage(session, SEVERITY_MAP)
+    for main, bug_path, events, extended_data, file_id, analyzer_name \
+            in reports:
+        report_storage.add(run_id, file_id, main, bug_path, events,
+                           extended_data, 'new', detected_at, analyzer_name)
+    report_storage.flush()
+
+
+def get_stored_rows(session, run_id, file_ids):
+    """
+    Returns the stored rows of the run. The ids of the reports and the files
+    are replaced by their index in the run.
+    """
+    report_ids = {}
+    reports = []
+    for report in session.query(Report).filter(Report.run_id == run_id) \
+            .order_by(Report.id):
+        report_ids[report.id] = len(report_ids)
+        reports.append((
+            report.bug_id, file_ids.index(report.file_id),
+            report.checker_message, report.checker_id, report.checker_cat,
+            report.bug_type, report.line, report.column, report.severity,
+            report.detection_status, report.detected_at, report.fixed_at,
+            report.path_length, report.analyzer_name))
+
+    def positions(model, *columns):
+        rows = session.query(model) \
+            .filter(model.report_id.in_(list(report_ids))).all()
+        return sorted(
+            (report_ids[row.report_id], file_ids.index(row.file_id),
+             row.line_begin, row.col_begin, row.line_end, row.col_end) +
+            tuple(getattr(row, c) for c in columns)
+            for row in rows)
+
+    return {'reports': reports,
+            'bug_report_points': positions(BugReportPoint, 'order'),
+            'bug_path_events': positions(BugPathEvent, 'order', 'msg'),
+            'extended_report_data': positions(ExtendedReportData, 'type',
+                                              'message')}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--reports', type=int, default=100000,
+                        help="Number of the stored reports.")
+    parser.add_argument('--files', type=int, default=1000,
+                        help="Number of the source files of the reports.")
+    parser.add_argument('--db-url', type=str, default=None,
+                        help="SQLAlchemy URL of an empty database. A "
+                             "temporary SQLite database is used by default.")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    db_url = args.db_url
+    if not db_url:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_url = 'sqlite:///' + os.path.join(tmp_dir.name, 'store.sqlite')
+
+    engine = sqlalchemy.create_engine(db_url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    detected_at = datetime.datetime(2020, 1, 1)
+
+    session = Session()
+    file_ids = create_files(session, args.files)
+    session.commit()
+    session.close()
+
+    results = []
+    for name, store in [('one by one', store_one_by_one),
+                        ('bulk', store_bulk)]:
+        random.seed(0)
+
+        session = Session()
+        run_id = create_run(session, name)
+        session.commit()
+
+        start = time.perf_counter()
+        store(session, run_id, generate_reports(args.reports, file_ids),
+              detected_at)
+        session.commit()
+        duration = time.perf_counter() - start
+
+        print("{0:<12} reports: {1}  time: {2:8.3f}s "
+              "({3:.0f} reports/s)".format(name, args.reports, duration,
+                                           args.reports / duration))
+
+        results.append(get_stored_rows(session, run_id, file_ids))
+        session.close()
+
+    if results[0] != results[1]:
+        for table in results[0]:
+            if results[0][table] != results[1][table]:
+                print("The stored '{0}' rows differ!".format(table))
+        sys.exit(1)
+
+    print("The stored rows are identical.")
+
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Benchmark of matching paths against a skip file.
+
+The skip list handler is compared to checking the regular expressions of the
+skip lines one by one, which was the original implementation of the handler.
+"""
+
+
+import argparse
+import fnmatch
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from codechecker_common.skiplist_handler import SkipListHandler  # noqa
+
+
+class OrderedSkipListHandler(object):
+    """ Check every skip line one by one in order. """
+
+    def __init__(self, skip_file_content):
+        self.__skip = []
+        for line in skip_file_content.splitlines():
+            line = line.strip()
+            if len(line) < 2 or line[0] not in ['-', '+']:
+                continue
+
+            pattern = os.path.normpath(line[1:].strip())
+            self.__skip.append(
+                (line, re.compile(fnmatch.translate(pattern + '*'))))
+
+    def should_skip(self, source):
+        for line, rexpr in self.__skip:
+            if rexpr.match(source):
+                return line[0] == '-'
+        return False
+
+
+def generate_skip_file(line_count, glob_ratio):
+    """ Generate skip lines similar to the ones of a generated skip file. """
+    lines = []
+    for i in range(line_count):
+        module = '/project/module_{0}/src'.format(i % 100)
+        if random.random() < glob_ratio:
+            lines.append('-{0}/*/gen_{1}_*.cpp'.format(module, i))
+        else:
+            lines.append('{0}{1}/file_{2}.cpp'.format(
+                random.choice('+-'), module, i))
+    lines.append('-/project/third_party/*')
+
+    return '\n'.join(lines)
+
+
+def generate_paths(path_count, line_count):
+    """ Generate paths partly matching the generated skip file. """
+    paths = []
+    for _ in range(path_count):
+        i = random.randrange(line_count * 2)
+        paths.append('/project/module_{0}/src/{1}/file_{2}.cpp'.format(
+            i % 100, random.choice(['', 'sub', 'gen']), i).replace('//', '/'))
+
+    return paths
+
+
+def measure(handler, paths, repeat):
+    """ Returns the duration of the decisions and the skipped path count. """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        skipped = sum(1 for path in paths if handler.should_skip(path))
+
+    return time.perf_counter() - start, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--skip-file',
+                        help="Skip file to use instead of a generated one.")
+    parser.add_argument('--paths',
+                        help="File containing one path per line to use "
+                             "instead of generated paths.")
+    parser.add_argument('--lines', type=int, default=3000,
+                        help="Number of the generated skip lines.")
+    parser.add_argument('--glob-ratio', type=float, default=0.2,
+                        help="Ratio of generated skip lines with wildcards.")
+    parser.add_argument('--path-count', type=int, default=5000,
+                        help="Number of the generated paths.")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Number of times every path is checked.")
+    args = parser.parse_args()
+
+    random.seed(0)
+
+    if args.skip_file:
+        with open(args.skip_file, encoding='utf-8', errors='ignore') as f:
+            skip_file_content = f.read()
+    else:
+        skip_file_content = generate_skip_file(args.lines, args.glob_ratio)
+
+    if args.paths:
+        with open(args.paths, encoding='utf-8', errors='ignore') as f:
+            paths = [line.strip() for line in f if line.strip()]
+    else:
+        paths = generate_paths(args.path_count, args.lines)
+
+    for name, handler_type in [('ordered regexes', OrderedSkipListHandler),
+                               ('skip list handler', SkipListHandler)]:
+        start = time.perf_counter()
+        handler = handler_type(skip_file_content)
+        init_time = time.perf_counter() - start
+
+        duration, skipped = measure(handler, paths, args.repeat)
+        print("{0:<20} init: {1:8.3f}s  match: {2:8.3f}s  "
+              "skipped: {3}/{4}".format(name, init_time, duration, skipped,
+                                        len(paths)))
+
+
+if __name__ == '__main__':
+    main()
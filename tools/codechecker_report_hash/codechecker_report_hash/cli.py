@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+
+
+import argparse
+import glob
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+# If we run this script in an environment where 'codechecker_report_hash'
+# module is not available we should add the grandparent directory of this
+# file to the system path.
+if __name__ == '__main__':
+    current_dir = os.path.dirname(os.path.realpath(__file__))
+    os.sys.path.append(os.path.dirname(current_dir))
+
+from codechecker_report_hash.hash import HashType, \
+    replace_report_hashes  # noqa
+
+
+LOG = logging.getLogger('ReportHash')
+
+msg_formatter = logging.Formatter('[%(levelname)s] - %(message)s')
+log_handler = logging.StreamHandler(sys.stdout)
+log_handler.setFormatter(msg_formatter)
+LOG.setLevel(logging.INFO)
+LOG.addHandler(log_handler)
+
+HASH_TYPES = {'context-free': HashType.CONTEXT_FREE,
+              'path-sensitive': HashType.PATH_SENSITIVE}
+
+
+def __add_arguments_to_parser(parser):
+    """ Add arguments to the the given parser. """
+    parser.add_argument('-i', '--input',
+                        type=str,
+                        metavar='input',
+                        required=True,
+                        help="Report directory which contains the plist "
+                             "files of the analysis.")
+
+    parser.add_argument('-t', '--type',
+                        type=str,
+                        dest='hash_type',
+                        choices=sorted(HASH_TYPES),
+                        default='context-free',
+                        help="Type of the generated report hashes.")
+
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        metavar='JOBS',
+                        default=multiprocessing.cpu_count(),
+                        help="Number of processes which rehash the plist "
+                             "files in parallel.")
+
+
+def main():
+    """ Report hash main command line. """
+    parser = argparse.ArgumentParser(
+        prog="report-hash",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Override the report hashes of the plist files of a "
+                    "report directory.",
+        epilog="""Example:
+  report-hash -i /path/to/reports -t context-free -j 4""")
+
+    __add_arguments_to_parser(parser)
+
+    args = parser.parse_args()
+
+    plist_files = glob.glob(os.path.join(args.input, '*.plist'))
+
+    start = time.perf_counter()
+    report_count = replace_report_hashes(plist_files,
+                                         HASH_TYPES[args.hash_type],
+                                         max(args.jobs, 1))
+    duration = time.perf_counter() - start
+
+    LOG.info("Rehashed %d reports of %d plist files in %.2f seconds "
+             "(%.1f reports/s).", report_count, len(plist_files), duration,
+             report_count / duration if duration else 0)
+
+
+if __name__ == "__main__":
+    main()
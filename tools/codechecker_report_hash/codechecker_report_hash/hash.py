@@ -7,13 +7,17 @@
 # -------------------------------------------------------------------------
 """ CodeChecker hash generation algorithms. """
 
+from collections import OrderedDict
 import hashlib
 import logging
+import multiprocessing
 import os
 import plistlib
 import sys
 import traceback
 
+from codechecker_report_hash import source_cache
+
 LOG = logging.getLogger('codechecker_report_hash')
 
 handler = logging.StreamHandler()
@@ -42,15 +46,12 @@ def __get_line(file_name, line_no, errors='ignore'):
     which depends on the platform.
 
     Changing the encoding error handling can influence the hash content!
+
+    The lines are looked up in the shared source cache, so the file is read
+    only once.
     """
     try:
-        with open(file_name, mode='r',
-                  encoding='utf-8', errors=errors) as source_file:
-            for line in source_file:
-                line_no -= 1
-                if line_no == 0:
-                    return line
-            return ''
+        return source_cache.get_line(file_name, line_no, errors)
     except IOError:
         LOG.error("Failed to open file %s", file_name)
         return ''
@@ -300,8 +301,53 @@ def get_report_path_hash(report):
     return __str_to_hash(report_path_hash)
 
 
+def _get_report_hashes_of_file(params):
+    """ Get the report hashes of the diagnostics of the same source file.
+
+    Returns (index, report hash) pairs.
+    """
+    file_path, indexed_diags, hash_type = params
+    return [(idx, get_report_hash(diag, file_path, hash_type))
+            for idx, diag in indexed_diags]
+
+
+def get_report_hashes(diags, hash_type, jobs=1):
+    """ Get the report hashes of the given (diagnostic, file path) pairs.
+
+    The diagnostics are grouped by their source file, so every source file is
+    read only once. The groups are hashed on the given number of processes
+    in parallel. Returns the report hashes in the order of the diagnostics.
+    """
+    groups = OrderedDict()
+    for idx, (diag, file_path) in enumerate(diags):
+        groups.setdefault(file_path, []).append((idx, diag))
+
+    tasks = [(file_path, indexed_diags, hash_type)
+             for file_path, indexed_diags in groups.items()]
+
+    report_hashes = [None] * sum(len(group) for group in groups.values())
+    if jobs > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(jobs) as pool:
+            results = pool.imap_unordered(
+                _get_report_hashes_of_file, tasks,
+                chunksize=max(1, len(tasks) // (jobs * 4)))
+
+            for result in results:
+                for idx, report_hash in result:
+                    report_hashes[idx] = report_hash
+    else:
+        for task in tasks:
+            for idx, report_hash in _get_report_hashes_of_file(task):
+                report_hashes[idx] = report_hash
+
+    return report_hashes
+
+
 def replace_report_hash(plist_file, hash_type=HashType.CONTEXT_FREE):
-    """ Override hash in the given file by using the given version hash. """
+    """ Override hash in the given file by using the given version hash.
+
+    Returns the number of the reports in the plist file.
+    """
     try:
         with open(plist_file, 'rb+') as pfile:
             plist = plistlib.load(pfile)
@@ -309,13 +355,18 @@ def replace_report_hash(plist_file, hash_type=HashType.CONTEXT_FREE):
             pfile.truncate()
             files = plist['files']
 
-            for diag in plist['diagnostics']:
-                file_path = files[diag['location']['file']]
-                report_hash = get_report_hash(diag, file_path, hash_type)
+            diags = plist['diagnostics']
+            report_hashes = get_report_hashes(
+                [(diag, files[diag['location']['file']]) for diag in diags],
+                hash_type)
+
+            for diag, report_hash in zip(diags, report_hashes):
                 diag['issue_hash_content_of_line_in_context'] = report_hash
 
             plistlib.dump(plist, pfile)
 
+            return len(diags)
+
     except (TypeError, AttributeError, plistlib.InvalidFileException) as err:
         LOG.warning('Failed to process plist file: %s wrong file format?',
                     plist_file)
@@ -333,3 +384,31 @@ def replace_report_hash(plist_file, hash_type=HashType.CONTEXT_FREE):
         traceback.print_exc()
         LOG.warning(type(ex))
         LOG.warning(ex)
+
+    return 0
+
+
+def _replace_report_hash(params):
+    """ Override the hashes of a plist file in a worker process. """
+    plist_file, hash_type = params
+    return replace_report_hash(plist_file, hash_type)
+
+
+def replace_report_hashes(plist_files, hash_type=HashType.CONTEXT_FREE,
+                          jobs=1):
+    """ Override the hashes of the given plist files in parallel.
+
+    The plist files are given to the processes in order in chunks, so the
+    plist files of the same source file are usually processed by the same
+    process which reads the source file only once. Returns the number of the
+    rehashed reports.
+    """
+    tasks = [(plist_file, hash_type) for plist_file in sorted(plist_files)]
+
+    if jobs > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(jobs) as pool:
+            return sum(pool.imap_unordered(
+                _replace_report_hash, tasks,
+                chunksize=max(1, len(tasks) // (jobs * 4))))
+
+    return sum(map(_replace_report_hash, tasks))
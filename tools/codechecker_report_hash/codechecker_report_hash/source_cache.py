@@ -0,0 +1,163 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+""" Cache of the source files for looking up their lines.
+
+Every source file is memory mapped once and the offsets of its lines are
+indexed, so a line is looked up without reading the file from the beginning.
+The number of cached files and the size of the mapped files are limited, the
+least recently used files are dropped first.
+
+The lines are the same as the ones read from a file opened in text mode with
+universal newlines: '\\n', '\\r\\n' and '\\r' end a line and the line ending
+is returned as '\\n'.
+"""
+
+from array import array
+from collections import OrderedDict
+import mmap
+import os
+import re
+import threading
+
+# Maximum number of cached source files.
+MAX_OPEN_FILES = 64
+
+# Maximum size of the cached source files in bytes.
+MAX_CACHED_BYTES = 256 * 1024 * 1024
+
+LINE_END = re.compile(rb'\r\n|\r|\n')
+
+
+class SourceFile(object):
+    """ Memory mapped source file with the index of its lines. """
+
+    def __init__(self, file_name):
+        with open(file_name, 'rb') as source_file:
+            stat = os.fstat(source_file.fileno())
+            self.stat_key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            self.size = stat.st_size
+
+            # Empty files can not be memory mapped.
+            self.__data = mmap.mmap(source_file.fileno(), 0,
+                                    access=mmap.ACCESS_READ) \
+                if self.size else b''
+
+        # Start offsets of the lines and the end offsets of their content
+        # without the line ending.
+        typecode = 'I' if self.size < 2**32 else 'Q'
+        self.__starts = array(typecode, [0])
+        self.__ends = array(typecode)
+        for match in LINE_END.finditer(self.__data):
+            self.__ends.append(match.start())
+            self.__starts.append(match.end())
+
+        if self.__starts[-1] == self.size:
+            # The last line is terminated, there is no more line.
+            self.__starts.pop()
+        else:
+            self.__ends.append(self.size)
+
+    @property
+    def line_count(self):
+        return len(self.__starts)
+
+    def get_line(self, line_no, errors='ignore'):
+        """ Returns the line_no-th line (counted from 1) with its line ending.
+
+        Empty string is returned if there is no such line.
+        """
+        if line_no < 1 or line_no > len(self.__starts):
+            return ''
+
+        start = self.__starts[line_no - 1]
+        end = self.__ends[line_no - 1]
+        line = self.__data[start:end].decode('utf-8', errors=errors)
+
+        # Only the last line can be without a line ending.
+        if end < self.size:
+            line += '\n'
+
+        return line
+
+
+class SourceCache(object):
+    """ Least recently used source files. """
+
+    def __init__(self, max_files=MAX_OPEN_FILES,
+                 max_bytes=MAX_CACHED_BYTES):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+
+        self.__files = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def get_source_file(self, file_name):
+        """ Returns the cached source file of the given path.
+
+        The file is loaded again if it has changed since it was cached.
+        OSError is raised if the file can not be read.
+        """
+        stat = os.stat(file_name)
+        stat_key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+        with self.__lock:
+            source_file = self.__files.get(file_name)
+            if source_file is not None:
+                if source_file.stat_key == stat_key:
+                    self.__files.move_to_end(file_name)
+                    return source_file
+
+                self.__remove(file_name)
+
+            source_file = SourceFile(file_name)
+            self.__files[file_name] = source_file
+            self.__size += source_file.size
+
+            # Keep the last file even if it is larger than the limit.
+            while len(self.__files) > 1 and \
+                    (len(self.__files) > self.max_files or
+                     self.__size > self.max_bytes):
+                self.__remove(next(iter(self.__files)))
+
+            return source_file
+
+    def get_line(self, file_name, line_no, errors='ignore'):
+        """ Returns the given line of the file or an empty string if there is
+        no such line. OSError is raised if the file can not be read. """
+        return self.get_source_file(file_name).get_line(line_no, errors)
+
+    def __remove(self, file_name):
+        # The mapping of the dropped file is released when it is not used
+        # by the callers anymore.
+        source_file = self.__files.pop(file_name)
+        self.__size -= source_file.size
+
+    def clear(self):
+        """ Drop every cached file. """
+        with self.__lock:
+            for file_name in list(self.__files):
+                self.__remove(file_name)
+
+
+# Source cache shared by the modules of the process.
+_SOURCE_CACHE = SourceCache()
+
+
+def get_source_cache():
+    """ Returns the source cache shared by the modules of the process. """
+    return _SOURCE_CACHE
+
+
+def get_line(file_name, line_no, errors='ignore'):
+    """ Returns the given line of the file from the shared source cache.
+
+    Empty string is returned if line_no is larger than the number of lines in
+    the file. OSError is raised if the file can not be read.
+    """
+    return _SOURCE_CACHE.get_line(file_name, line_no, errors)
@@ -26,5 +26,10 @@ setuptools.setup(
         "Programming Language :: Python :: 2.7",
         "Programming Language :: Python :: 3",
         "Programming Language :: Python :: 3.5",
-    ]
+    ],
+    entry_points={
+        'console_scripts': [
+            'report-hash = codechecker_report_hash.cli:main'
+        ]
+    },
 )
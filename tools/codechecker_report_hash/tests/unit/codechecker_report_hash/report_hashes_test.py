@@ -0,0 +1,85 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+""" Test generating the report hashes in batch. """
+
+import os
+import plistlib
+import shutil
+import tempfile
+import unittest
+
+from codechecker_report_hash.hash import get_report_hash, \
+    get_report_hashes, HashType, replace_report_hashes
+
+
+def location(line, col, file_idx=0):
+    return {'line': line, 'col': col, 'file': file_idx}
+
+
+def diagnostic(line, col, message):
+    loc = location(line, col)
+    return {'check_name': 'core.DivideZero',
+            'description': message,
+            'location': loc,
+            'path': [{'kind': 'event',
+                      'location': loc,
+                      'message': message}]}
+
+
+class ReportHashesTest(unittest.TestCase):
+    """ Batch report hash generation tests. """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+        self.diags = []
+        for i in range(4):
+            source_file = os.path.join(self.tmp_dir, 'main_%d.cpp' % i)
+            with open(source_file, 'w', encoding='utf-8') as f:
+                f.write('int main() {\n  return %d / 0;\n}\n' % i)
+
+            for line in range(1, 4):
+                self.diags.append((diagnostic(line, 10, 'Division by zero'),
+                                   source_file))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_report_hashes(self):
+        """ The same hashes are generated as one by one. """
+        for hash_type in [HashType.CONTEXT_FREE, HashType.PATH_SENSITIVE]:
+            expected = [get_report_hash(diag, file_path, hash_type)
+                        for diag, file_path in self.diags]
+
+            self.assertEqual(get_report_hashes(self.diags, hash_type),
+                             expected)
+            self.assertEqual(get_report_hashes(self.diags, hash_type, 2),
+                             expected)
+
+    def test_replace_report_hashes(self):
+        """ Report hashes of the plist files are overridden. """
+        plist_files = []
+        for i, (diag, file_path) in enumerate(self.diags):
+            plist_file = os.path.join(self.tmp_dir, 'main_%d.plist' % i)
+            with open(plist_file, 'wb') as f:
+                plistlib.dump({'diagnostics': [diag], 'files': [file_path]},
+                              f)
+            plist_files.append(plist_file)
+
+        self.assertEqual(
+            replace_report_hashes(plist_files, HashType.CONTEXT_FREE, 2),
+            len(self.diags))
+
+        for plist_file, (diag, file_path) in zip(plist_files, self.diags):
+            with open(plist_file, 'rb') as f:
+                plist = plistlib.load(f)
+
+            new_diag = plist['diagnostics'][0]
+            self.assertEqual(
+                new_diag['issue_hash_content_of_line_in_context'],
+                get_report_hash(diag, file_path, HashType.CONTEXT_FREE))
@@ -0,0 +1,102 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+""" Test looking up the source lines in the source cache. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from codechecker_report_hash.source_cache import SourceCache
+
+
+def read_line(file_name, line_no, errors='ignore'):
+    """ Read the line from the beginning of the file in text mode. """
+    with open(file_name, mode='r',
+              encoding='utf-8', errors=errors) as source_file:
+        for line in source_file:
+            line_no -= 1
+            if line_no == 0:
+                return line
+        return ''
+
+
+class SourceCacheTest(unittest.TestCase):
+    """ Source cache tests. """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def __write(self, name, content):
+        file_name = os.path.join(self.tmp_dir, name)
+        with open(file_name, 'wb') as source_file:
+            source_file.write(content)
+        return file_name
+
+    def test_same_lines(self):
+        """ The lines are the same as the ones read in text mode. """
+        contents = [b'',
+                    b'\n',
+                    b'int main()\n{\n  return 0;\n}\n',
+                    b'no line ending',
+                    b'windows\r\nline\r\nendings\r\n',
+                    b'old\rmac\r\rendings',
+                    b'mixed\r\n\n\r\rend\r',
+                    b'\xef\xbb\xbfbom\n\xc3\xa1rv\xc3\xadz\ninvalid \xff\n']
+
+        cache = SourceCache()
+        for idx, content in enumerate(contents):
+            file_name = self.__write('source_%d.cpp' % idx, content)
+            for line_no in range(-1, content.count(b'\n') +
+                                 content.count(b'\r') + 3):
+                self.assertEqual(cache.get_line(file_name, line_no),
+                                 read_line(file_name, line_no),
+                                 (content, line_no))
+
+            self.assertEqual(cache.get_line(file_name, 3, 'replace'),
+                             read_line(file_name, 3, 'replace'))
+
+    def test_changed_file(self):
+        """ The file is read again if it has changed. """
+        file_name = self.__write('main.cpp', b'int x;\n')
+
+        cache = SourceCache()
+        self.assertEqual(cache.get_line(file_name, 1), 'int x;\n')
+
+        self.__write('main.cpp', b'int y = 0;\nint z;\n')
+        self.assertEqual(cache.get_line(file_name, 2), 'int z;\n')
+
+    def test_limits(self):
+        """ The least recently used files are dropped. """
+        files = [self.__write('source_%d.cpp' % i, b'%d\n' % i)
+                 for i in range(4)]
+
+        cache = SourceCache(max_files=2)
+        for file_name in files:
+            cache.get_source_file(file_name)
+
+        first = cache.get_source_file(files[-1])
+        self.assertIs(cache.get_source_file(files[-1]), first)
+
+        first = cache.get_source_file(files[0])
+        cache.get_source_file(files[1])
+        cache.get_source_file(files[2])
+        self.assertIsNot(cache.get_source_file(files[0]), first)
+
+        cache = SourceCache(max_bytes=3)
+        first = cache.get_source_file(files[0])
+        cache.get_source_file(files[1])
+        self.assertIsNot(cache.get_source_file(files[0]), first)
+
+    def test_missing_file(self):
+        """ OSError is raised for missing files. """
+        with self.assertRaises(OSError):
+            SourceCache().get_line(os.path.join(self.tmp_dir, 'missing'), 1)
@@ -703,6 +703,52 @@ service codeCheckerDBAccess {
                    7: optional string description)
                    throws (1: codechecker_api_shared.RequestFailed requestError),
 
+  // The ZIP file of massStoreRun() can be uploaded in chunks. This function
+  // starts a new upload session and returns its token. The chunks of the ZIP
+  // file are uploaded with uploadStoreChunk() and the run is stored with
+  // massStoreRunFromUpload() when every chunk is uploaded. The upload sessions
+  // which are not used for a day are removed.
+  // PERMISSION: PRODUCT_STORE
+  string beginStoreUpload()
+                          throws (1: codechecker_api_shared.RequestFailed requestError),
+
+  // This function requires a list of chunk hashes (sha256 of the uncompressed
+  // chunk) and returns the ones which are not uploaded to the upload session
+  // yet.
+  // PERMISSION: PRODUCT_STORE
+  list<string> getMissingStoreChunks(1: string       uploadToken,
+                                     2: list<string> chunkHashes)
+                                     throws (1: codechecker_api_shared.RequestFailed requestError),
+
+  // Uploads a chunk of the ZIP file to the upload session. The chunk has to be
+  // compressed and sent as a base64 encoded string. The "chunkHash" parameter
+  // is the sha256 hash of the uncompressed chunk, the chunk is rejected if its
+  // content does not match this hash. A chunk can be uploaded again if the
+  // upload failed.
+  // PERMISSION: PRODUCT_STORE
+  bool uploadStoreChunk(1: string uploadToken,
+                        2: string chunkHash,
+                        3: string chunk)
+                        throws (1: codechecker_api_shared.RequestFailed requestError),
+
+  // This function stores an entire run like massStoreRun(), but the ZIP file
+  // is assembled on the server from the uploaded chunks of the upload session.
+  // The "chunkHashes" parameter is the list of the chunk hashes in the order
+  // of the chunks in the ZIP file. If some chunks are missing, nothing is
+  // stored and the hashes of the missing chunks are returned in the
+  // "extraInfo" field of the exception. Otherwise the upload session is
+  // removed after the storage.
+  // PERMISSION: PRODUCT_STORE
+  i64 massStoreRunFromUpload(1: string          uploadToken,
+                             2: list<string>    chunkHashes,
+                             3: string          runName,
+                             4: string          tag,
+                             5: string          version,
+                             6: bool            force,
+                             7: list<string>    trimPathPrefixes,
+                             8: optional string description)
+                             throws (1: codechecker_api_shared.RequestFailed requestError),
+
   // Returns true if analysis statistics information can be sent to the server,
   // otherwise it returns false.
   // PERMISSION: PRODUCT_STORE
@@ -19,6 +19,8 @@ import json
 import os
 import sys
 import tempfile
+import time
+from collections import deque
 from typing import Dict, List, Tuple
 import zipfile
 import zlib
@@ -26,18 +28,23 @@ import zlib
 import concurrent.futures
 
 from collections import namedtuple
+from http.client import HTTPException
+
+from thrift.Thrift import TException
 
 from codechecker_api.codeCheckerDBAccess_v6.ttypes import StoreLimitKind
 from codechecker_api_shared.ttypes import RequestFailed, ErrorCode
 
 from codechecker_client import client as libclient
+from codechecker_client.content_hash_cache import ContentHashCache, \
+    get_cache_key
 from codechecker_client.metadata import merge_metadata_json
 
 from codechecker_common import arg, logger, plist_parser, util, cmd_config
 from codechecker_common.report import Report
 from codechecker_common.output import twodim
 from codechecker_common.source_code_comment_handler import \
-    SourceCodeCommentHandler
+    SourceCodeCommentIndex
 from codechecker_report_hash.hash import HashType, replace_report_hash
 
 from codechecker_web.shared import webserver_context, host_check
@@ -45,7 +52,15 @@ from codechecker_web.shared.env import get_default_workspace
 
 LOG = logger.get_logger('system')
 
-MAX_UPLOAD_SIZE = 1 * 1024 * 1024 * 1024  # 1GiB
+# The mass store zip file is uploaded to the server in chunks of this size.
+# Only one chunk is held in the memory at a time.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MiB
+
+# Number of times the chunks which failed to upload are sent again.
+UPLOAD_RETRIES = 5
+
+# The source files are read in blocks of this size when they are hashed.
+HASH_BLOCK_SIZE = 1024 * 1024  # 1MiB
 
 
 """Minimal required information for a report position in a source file.
@@ -72,8 +87,8 @@ ReportFileInfo = namedtuple('ReportFileInfo',
 """Contains information about the source files mentioned in a report file.
 
 source_info: a dictionary about all the mentioned source files
-             the key is the source file, the value is content hash and last
-             modification time if the file exists if not the value is empty
+             the key is the source file, the value is the last modification
+             time if the file exists if not the value is empty
 missing: a set of the missing source files (absoute path)
 changed_since_report_gen: set of source files where the last modification
                         timestamp is newer then the report file which
@@ -101,10 +116,47 @@ def get_file_content_hash(file_path):
     """
     Return the file content hash for a file.
     """
+    hasher = hashlib.sha256()
     with open(file_path, 'rb') as content:
-        hasher = hashlib.sha256()
-        hasher.update(content.read())
-        return hasher.hexdigest()
+        for block in iter(lambda: content.read(HASH_BLOCK_SIZE), b''):
+            hasher.update(block)
+
+    return hasher.hexdigest()
+
+
+def get_file_content_hashes(file_paths, hash_cache=None, jobs=None):
+    """
+    Return the content hashes of the files by their paths.
+
+    The content hashes of the files which have not changed since they were
+    cached are taken from the hash cache. The other files are hashed in
+    parallel and their content hashes are written to the hash cache.
+    """
+    keys = {}
+    for file_path in file_paths:
+        key = get_cache_key(file_path)
+        if key is not None:
+            keys[file_path] = key
+
+    hashes = hash_cache.get(keys) if hash_cache else {}
+    LOG.debug("Content hashes of %d/%d source files are cached.",
+              len(hashes), len(keys))
+
+    to_hash = [f for f in keys if f not in hashes]
+    if not to_hash:
+        return hashes
+
+    # The hash computation does not hold the GIL, so the files are hashed
+    # by threads.
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        for file_path, content_hash in zip(
+                to_hash, executor.map(get_file_content_hash, to_hash)):
+            hashes[file_path] = content_hash
+
+    if hash_cache:
+        hash_cache.put((f, keys[f], hashes[f]) for f in to_hash)
+
+    return hashes
 
 
 def get_argparser_ctor_args():
@@ -230,6 +282,27 @@ def add_arguments_to_parser(parser):
                              "  ]\n"
                              "}.")
 
+    parser.add_argument('--compression-level',
+                        type=int,
+                        dest="compression_level",
+                        choices=range(0, 10),
+                        metavar='{0-9}',
+                        required=False,
+                        default=zlib.Z_BEST_COMPRESSION,
+                        help="The zlib compression level of the results "
+                             "sent to the server. Lower levels compress "
+                             "faster, but more data is sent to the server. "
+                             "0 means no compression.")
+
+    parser.add_argument('--dry-run-size',
+                        dest="dry_run_size",
+                        action='store_true',
+                        required=False,
+                        default=argparse.SUPPRESS,
+                        help="Assemble the results to store and print the "
+                             "number of bytes which would be sent to the "
+                             "server, but do not store them.")
+
     parser.add_argument('-f', '--force',
                         dest="force",
                         default=argparse.SUPPRESS,
@@ -338,7 +411,8 @@ def parse_report_file(plist_file: str) \
     reports = []
 
     try:
-        files, reports = plist_parser.parse_plist_file(plist_file)
+        files, reports = plist_parser.parse_plist_file(plist_file,
+                                                       use_cache=True)
     except Exception as ex:
         import traceback
         traceback.print_stack()
@@ -348,17 +422,15 @@ def parse_report_file(plist_file: str) \
 
 
 def collect_file_info(files: Dict[int, str]) -> Dict:
-    """Collect file information about given list of files like:
-       - last modification time
-       - content hash
+    """Collect the last modification time of the given list of files.
        If the file is missing the corresponding data will
-       be empty.
+       be empty. The content hashes are collected once for every source
+       file by parse_report_files().
     """
     res = {}
     for sf in files.values():
         res[sf] = {}
         if os.path.isfile(sf):
-            res[sf]["hash"] = get_file_content_hash(sf)
             res[sf]["mtime"] = util.get_last_mod_time(sf)
 
     return res
@@ -418,59 +490,92 @@ def get_report_data(reports):
 
 
 def scan_for_review_comment(job):
-    """Scan a file for review comments returns
-    all the found review comments.
+    """Scan a file for review comments and return True if there is any
+    review comment in the file.
     """
-    file_path, lines = job
-    sc_handler = SourceCodeCommentHandler()
-    comments = []
+    file_path, _ = job
     with open(file_path, mode='r',
               encoding='utf-8',
               errors='ignore') as sf:
-        comments, misspelled_comments = \
-                sc_handler.scan_source_line_comments(sf, lines)
+        comment_index = SourceCodeCommentIndex.from_file(sf)
 
-        if misspelled_comments:
-            LOG.warning("There are misspelled review status comments in %s",
-                        file_path)
-        for mc in misspelled_comments:
-            LOG.warning(mc)
+    misspelled_comments = comment_index.misspelled_comments
+    if misspelled_comments:
+        LOG.warning("There are misspelled review status comments in %s",
+                    file_path)
+    for mc in misspelled_comments:
+        LOG.warning(mc)
 
-    return comments
+    return bool(comment_index)
 
 
 def filter_source_files_with_comments(source_file_info, main_report_positions):
     """Collect the source files where there is any codechecker review
-    comment at the main report positions.
+    comment and report.
+
+    Every source file content is scanned once.
     """
 
     files_with_comment = set()
+    has_comments = {}
     jobs = []
+    files_with_report = {rep.filepath for rep in main_report_positions}
+
     for file_path, v in source_file_info.items():
         if not bool(v):
             # missing file
             continue
-        lines = [rep.line for rep in main_report_positions
-                 if rep.filepath == file_path]
 
-        jobs.append((file_path, lines))
+        if v['hash'] not in has_comments:
+            has_comments[v['hash']] = False
+            jobs.append((file_path, v['hash']))
 
     with concurrent.futures.ProcessPoolExecutor() as executor:
         for job, comments in zip(jobs,
                                  executor.map(scan_for_review_comment, jobs)):
-            file_path, _ = job
-            if comments:
-                files_with_comment.add(file_path)
+            _, content_hash = job
+            has_comments[content_hash] = comments
+
+    for file_path, v in source_file_info.items():
+        if bool(v) and file_path in files_with_report and \
+                has_comments[v['hash']]:
+            files_with_comment.add(file_path)
 
     return files_with_comment
 
 
+def get_summary_report_data(plist_file):
+    """Get the source files and the main report positions from the summary
+    written by the analysis next to the plist file, so the plist file does
+    not have to be parsed. None is returned if there is no up-to-date summary
+    or the report hashes of the plist need to be overwritten.
+    """
+    summary = plist_parser.load_summary(plist_file)
+    if not summary:
+        return None
+
+    report_hashes = summary['report_hashes']
+    if report_hashes and all(rep_hash == '0' for rep_hash in report_hashes):
+        return None
+
+    source_files = dict(enumerate(summary['files']))
+    report_main = [ReportLineInfo(line, file_idx, "")
+                   for file_idx, line in summary['main_report_positions']]
+
+    return source_files, report_main
+
+
 def parse_collect_plist_info(plist_file):
     """Parse one plist report file and collect information
     about the source files mentioned in the report file.
     """
 
-    source_files, reports = parse_report_file(plist_file)
+    reports = []
+    summary_data = get_summary_report_data(plist_file)
+    if summary_data:
+        source_files, rdata = summary_data
+    else:
+        source_files, reports = parse_report_file(plist_file)
 
     if len(source_files) == 0:
         # If there is no source in the plist we will not upload
@@ -499,12 +604,15 @@ def parse_collect_plist_info(plist_file):
                                    changed_since_report_gen=set())
         return rli, sfir
 
-    if overwrite_cppcheck_report_hash(reports, plist_file):
-        # If overwrite was needed parse it back again to update the hashes.
-        source_files, reports = parse_report_file(plist_file)
+    if not summary_data:
+        if overwrite_cppcheck_report_hash(reports, plist_file):
+            # If overwrite was needed parse it back again to update the
+            # hashes.
+            source_files, reports = parse_report_file(plist_file)
+
+        rdata = get_report_data(reports)
 
     main_report_positions = []
-    rdata = get_report_data(reports)
     # Replace the file index values to source file path.
     for rda in rdata:
         rda = rda._replace(filepath=source_files[rda.fileidx])
@@ -528,12 +636,13 @@ def parse_collect_plist_info(plist_file):
     return rli, sfir
 
 
-def parse_report_files(report_files):
+def parse_report_files(report_files, hash_cache=None):
     """Parse and collect source code information mentioned in a report file.
 
     Collect any mentioned source files wich are missing or changed
     since the report generation. If there are missing or changed files
-    the report will not be stored.
+    the report will not be stored. The content hashes of the existing source
+    files are added to their information.
     """
 
     files_to_compress = set()
@@ -560,6 +669,16 @@ def parse_report_files(report_files):
             missing_source_files = \
                 missing_source_files | source_in_reports.missing
 
+    existing_files = [f for f, info in source_file_info.items() if info]
+    hashes = get_file_content_hashes(existing_files, hash_cache)
+    for file_path in existing_files:
+        if file_path in hashes:
+            source_file_info[file_path]['hash'] = hashes[file_path]
+        else:
+            # The file was removed since its modification time was read.
+            source_file_info[file_path] = {}
+            missing_source_files.add(file_path)
+
     return (source_file_info,
             main_report_positions,
             files_to_compress,
@@ -567,10 +686,11 @@ def parse_report_files(report_files):
             missing_source_files)
 
 
-def assemble_zip(inputs, zip_file, client):
-    """Collect and compress report and source files, together with files
+def assemble_zip(inputs, zip_file, client, hash_cache=None):
+    """Collect report and source files, together with files
     contanining analysis related information into a zip file which
-    will be sent to the server.
+    will be sent to the server. The zip file is compressed chunk by chunk
+    when it is uploaded.
     """
     report_files = collect_report_files(inputs)
 
@@ -580,7 +700,7 @@ def assemble_zip(inputs, zip_file, client):
      main_report_positions,
      files_to_compress,
      changed_files,
-     missing_source_files) = parse_report_files(report_files)
+     missing_source_files) = parse_report_files(report_files, hash_cache)
 
     LOG.info("Processing report files done.")
 
@@ -657,14 +777,6 @@ def assemble_zip(inputs, zip_file, client):
 
         zipf.writestr('content_hashes.json', json.dumps(file_to_hash))
 
-    # Compressing .zip file
-    with open(zip_file, 'rb') as source:
-        compressed = zlib.compress(source.read(),
-                                   zlib.Z_BEST_COMPRESSION)
-
-    with open(zip_file, 'wb') as target:
-        target.write(compressed)
-
     LOG.debug("[ZIP] Mass store zip written at '%s'", zip_file)
 
     if missing_source_files:
@@ -674,6 +786,108 @@ def assemble_zip(inputs, zip_file, client):
     LOG.debug("Building report zip done.")
 
 
+def get_zip_chunk_hashes(zip_file, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Returns the sha256 hashes of the chunks of the zip file in the order of
+    the chunks.
+    """
+    chunk_hashes = []
+    with open(zip_file, 'rb') as zf:
+        for chunk in iter(lambda: zf.read(chunk_size), b''):
+            chunk_hashes.append(hashlib.sha256(chunk).hexdigest())
+
+    return chunk_hashes
+
+
+def encode_chunk(chunk, compression_level=zlib.Z_BEST_COMPRESSION):
+    """ Returns the compressed chunk in the base64 format of the upload. """
+    return base64.b64encode(zlib.compress(chunk, compression_level)) \
+        .decode("utf-8")
+
+
+def iter_encoded_chunks(zip_file, chunk_indexes,
+                        compression_level=zlib.Z_BEST_COMPRESSION,
+                        chunk_size=UPLOAD_CHUNK_SIZE, jobs=None):
+    """
+    Yield the encoded chunks of the zip file at the given indexes in order.
+
+    The chunks are compressed in parallel while the previous ones are
+    consumed. At most twice as many chunks as the number of the jobs are held
+    in the memory at a time.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    pending = deque()
+
+    # The compression does not hold the GIL, so the chunks are compressed by
+    # threads.
+    with open(zip_file, 'rb') as zf, \
+            concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        for idx in chunk_indexes:
+            zf.seek(idx * chunk_size)
+            pending.append(executor.submit(encode_chunk, zf.read(chunk_size),
+                                           compression_level))
+
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def get_upload_size(zip_file, chunk_hashes,
+                    compression_level=zlib.Z_BEST_COMPRESSION,
+                    chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Returns the number of bytes of the chunks which would be sent to the
+    server when the zip file is uploaded into a new upload session.
+    """
+    chunk_indexes = {}
+    for idx, chunk_hash in enumerate(chunk_hashes):
+        chunk_indexes.setdefault(chunk_hash, idx)
+
+    return sum(len(b64chunk) for b64chunk in iter_encoded_chunks(
+        zip_file, chunk_indexes.values(), compression_level, chunk_size))
+
+
+def upload_zip_chunks(client, upload_token, zip_file, chunk_hashes,
+                      chunk_size=UPLOAD_CHUNK_SIZE,
+                      compression_level=zlib.Z_BEST_COMPRESSION):
+    """
+    Upload the chunks of the zip file which are missing from the upload
+    session. The chunks which failed to upload are sent again at most
+    UPLOAD_RETRIES times. Returns the hashes of the chunks which could not be
+    uploaded.
+    """
+    chunk_indexes = {}
+    for idx, chunk_hash in enumerate(chunk_hashes):
+        chunk_indexes.setdefault(chunk_hash, idx)
+
+    missing = client.getMissingStoreChunks(upload_token, chunk_hashes)
+    for retry in range(UPLOAD_RETRIES + 1):
+        if not missing:
+            break
+
+        if retry:
+            LOG.warning("Failed to upload %d chunk(s), trying again...",
+                        len(missing))
+            time.sleep(2 ** retry)
+
+        encoded_chunks = iter_encoded_chunks(
+            zip_file, [chunk_indexes[h] for h in missing], compression_level,
+            chunk_size)
+
+        for chunk_hash, b64chunk in zip(missing, encoded_chunks):
+            try:
+                client.uploadStoreChunk(upload_token, chunk_hash, b64chunk)
+            except (OSError, HTTPException, TException) as ex:
+                LOG.debug("Failed to upload chunk '%s': %s", chunk_hash, ex)
+
+        # The server knows which chunks were received successfully.
+        missing = client.getMissingStoreChunks(upload_token, chunk_hashes)
+
+    return missing
+
+
 def should_be_zipped(input_file, input_files):
     """
     Determine whether a given input file should be included in the zip.
@@ -846,27 +1060,22 @@ def main(args):
     _, zip_file = tempfile.mkstemp('.zip')
     LOG.debug("Will write mass store ZIP to '%s'...", zip_file)
 
+    hash_cache = ContentHashCache()
     try:
         LOG.debug("Assembling zip file.")
         try:
-            assemble_zip(args.input, zip_file, client)
+            assemble_zip(args.input, zip_file, client, hash_cache)
         except Exception as ex:
             print(ex)
             import traceback
             traceback.print_stack()
             LOG.error("Failed to assemble zip file.")
             sys.exit(1)
+        finally:
+            hash_cache.close()
 
         zip_size = os.stat(zip_file).st_size
-        if zip_size > MAX_UPLOAD_SIZE:
-            LOG.error("The result list to upload is too big (max: %s): %s.",
-                      sizeof_fmt(MAX_UPLOAD_SIZE), sizeof_fmt(zip_size))
-            sys.exit(1)
-
-        b64zip = ""
-        with open(zip_file, 'rb') as zf:
-            b64zip = base64.b64encode(zf.read()).decode("utf-8")
-        if len(b64zip) == 0:
+        if zip_size == 0:
             LOG.info("Zip content is empty, nothing to store!")
             sys.exit(1)
 
@@ -877,15 +1086,40 @@ def main(args):
 
         description = args.description if 'description' in args else None
 
+        chunk_hashes = get_zip_chunk_hashes(zip_file)
+
+        if 'dry_run_size' in args:
+            start = time.time()
+            upload_size = get_upload_size(zip_file, chunk_hashes,
+                                          args.compression_level)
+            LOG.info("Results to store: %s in %d chunk(s).",
+                     sizeof_fmt(zip_size), len(chunk_hashes))
+            LOG.info("Bytes to send with compression level %d: %d (%s), "
+                     "compressed in %.2f seconds.", args.compression_level,
+                     upload_size, sizeof_fmt(upload_size),
+                     time.time() - start)
+            return
+
         LOG.info("Storing results (%s) to the server...", sizeof_fmt(zip_size))
 
-        client.massStoreRun(args.name,
-                            args.tag if 'tag' in args else None,
-                            str(context.version),
-                            b64zip,
-                            'force' in args,
-                            trim_path_prefixes,
-                            description)
+        upload_token = client.beginStoreUpload()
+
+        missing_chunks = upload_zip_chunks(
+            client, upload_token, zip_file, chunk_hashes,
+            compression_level=args.compression_level)
+        if missing_chunks:
+            LOG.error("Failed to upload %d chunk(s) of the results to the "
+                      "server.", len(missing_chunks))
+            sys.exit(1)
+
+        client.massStoreRunFromUpload(upload_token,
+                                      chunk_hashes,
+                                      args.name,
+                                      args.tag if 'tag' in args else None,
+                                      str(context.version),
+                                      'force' in args,
+                                      trim_path_prefixes,
+                                      description)
 
         # Storing analysis statistics if the server allows them.
         if client.allowsStoringAnalysisStatistics():
@@ -31,7 +31,7 @@ from codechecker_common import logger, plist_parser, util
 from codechecker_common.report import Report
 from codechecker_common.output import twodim, gerrit, codeclimate
 from codechecker_common.source_code_comment_handler import \
-    SourceCodeCommentHandler, SpellException
+    SpellException, get_source_code_comment_index
 from codechecker_report_hash.hash import get_report_path_hash
 
 from codechecker_web.shared import webserver_context
@@ -221,7 +221,6 @@ def process_run_args(client, run_args_with_tag):
 def get_suppressed_reports(reports: List[Report]) -> List[str]:
     """Returns a list of suppressed report hashes."""
     suppressed_in_code = []
-    sc_handler = SourceCodeCommentHandler()
 
     for rep in reports:
         bughash = rep.report_hash
@@ -229,16 +228,15 @@ def get_suppressed_reports(reports: List[Report]) -> List[str]:
         bug_line = rep.main['location']['line']
         checker_name = rep.main['check_name']
         src_comment_data = []
-        with open(source_file, encoding='utf-8', errors='ignore') as sf:
-            try:
-                src_comment_data = sc_handler.filter_source_line_comments(
-                    sf,
-                    bug_line,
-                    checker_name)
-            except SpellException as ex:
-                LOG.warning("%s contains %s",
-                            os.path.basename(source_file),
-                            str(ex))
+        comment_index = get_source_code_comment_index(source_file)
+        try:
+            src_comment_data = comment_index.filter_source_line_comments(
+                bug_line,
+                checker_name)
+        except SpellException as ex:
+            LOG.warning("%s contains %s",
+                        os.path.basename(source_file),
+                        str(ex))
 
         if len(src_comment_data) == 1:
             suppressed_in_code.append(bughash)
@@ -269,9 +267,10 @@ def get_report_dir_results(report_dirs: List[str],
 
             file_path = os.path.join(report_dir, filename)
             LOG.debug("Parsing: %s", file_path)
-            _, reports = plist_parser.parse_plist_file(file_path)
-            LOG.debug("Parsing: %s done %s", file_path, len(reports))
-            for report in reports:
+
+            # The bug path is needed by the path hash of the reports.
+            for report in plist_parser.iter_plist_reports(file_path,
+                                                          use_cache=True):
                 LOG.debug("get report hash")
                 path_hash = get_report_path_hash(report)
                 if path_hash in processed_path_hashes:
@@ -0,0 +1,161 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Cache of the content hashes of the source files stored by the client.
+
+The content hashes are stored in an SQLite database in the workspace of the
+user, so the source files which have not changed since the previous storage
+are not read and hashed again. The entries are keyed on the path, the size,
+the modification time and the inode of the source files.
+
+The cache is optional: if it can not be read or written, the content hashes
+are computed as without the cache.
+"""
+
+import os
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+from codechecker_common.logger import get_logger
+
+from codechecker_web.shared.env import get_default_workspace
+
+LOG = get_logger('system')
+
+# Name of the cache file in the workspace.
+CONTENT_HASH_CACHE_FILE = 'content_hash_cache.sqlite'
+
+# Version of the cache format. The cache is rebuilt if it was written in an
+# other format.
+CONTENT_HASH_CACHE_VERSION = 1
+
+# Number of paths looked up in the cache by one query.
+LOOKUP_CHUNK_SIZE = 500
+
+
+def get_cache_key(file_path: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Returns the size, the modification time and the inode of the file or
+    None if the file can not be accessed.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class ContentHashCache(object):
+    """ Content hashes of the source files. """
+
+    def __init__(self, cache_file: Optional[str] = None):
+        self.cache_file = cache_file or \
+            os.path.join(get_default_workspace(), CONTENT_HASH_CACHE_FILE)
+
+        self.__connection = None
+        self.__disabled = False
+
+    def __connect(self):
+        """
+        Returns the connection to the cache database or None if the cache
+        can not be used.
+        """
+        if self.__disabled:
+            return None
+
+        if self.__connection is not None:
+            return self.__connection
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+
+            connection = sqlite3.connect(self.cache_file, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != CONTENT_HASH_CACHE_VERSION:
+                connection.execute("DROP TABLE IF EXISTS content_hashes")
+                connection.execute("PRAGMA user_version = %d" %
+                                   CONTENT_HASH_CACHE_VERSION)
+
+            connection.execute("CREATE TABLE IF NOT EXISTS content_hashes ("
+                               "path TEXT PRIMARY KEY, "
+                               "size INTEGER, "
+                               "mtime INTEGER, "
+                               "inode INTEGER, "
+                               "hash TEXT)")
+            connection.commit()
+        except (OSError, sqlite3.Error) as ex:
+            LOG.debug("Content hash cache '%s' can not be used: %s",
+                      self.cache_file, ex)
+            self.__disabled = True
+            return None
+
+        self.__connection = connection
+
+        return connection
+
+    def get(self, keys: Dict[str, Tuple[int, int, int]]) -> Dict[str, str]:
+        """
+        Returns the cached content hashes of the given files by their paths.
+        The keys are the size, the modification time and the inode of the
+        files. The files which are not cached or have changed since they
+        were cached are not in the result.
+        """
+        connection = self.__connect()
+        if connection is None:
+            return {}
+
+        paths = list(keys)
+        hashes = {}
+        try:
+            for i in range(0, len(paths), LOOKUP_CHUNK_SIZE):
+                chunk = paths[i:i + LOOKUP_CHUNK_SIZE]
+                rows = connection.execute(
+                    "SELECT path, size, mtime, inode, hash "
+                    "FROM content_hashes WHERE path IN (%s)" %
+                    ', '.join('?' * len(chunk)), chunk)
+
+                for path, size, mtime, inode, content_hash in rows:
+                    if keys[path] == (size, mtime, inode):
+                        hashes[path] = content_hash
+        except sqlite3.Error as ex:
+            LOG.debug("Failed to read the content hash cache '%s': %s",
+                      self.cache_file, ex)
+            return {}
+
+        return hashes
+
+    def put(self, entries: Iterable[Tuple[str, Tuple[int, int, int], str]]):
+        """
+        Cache the content hashes of the files. The entries are the path, the
+        key and the content hash of the files.
+        """
+        connection = self.__connect()
+        if connection is None:
+            return
+
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO content_hashes "
+                "(path, size, mtime, inode, hash) VALUES (?, ?, ?, ?, ?)",
+                ((path,) + tuple(key) + (content_hash,)
+                 for path, key, content_hash in entries))
+            connection.commit()
+        except sqlite3.Error as ex:
+            LOG.debug("Failed to write the content hash cache '%s': %s",
+                      self.cache_file, ex)
+            self.__disabled = True
+
+    def close(self):
+        """ Close the connection to the cache database. """
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
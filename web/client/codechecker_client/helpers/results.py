@@ -9,6 +9,8 @@
 Helper functions for Thrift api calls.
 """
 
+from thrift.Thrift import TApplicationException
+
 from codechecker_api.codeCheckerDBAccess_v6 import codeCheckerDBAccess
 
 from codechecker_client.thrift_call import ThriftClientCall
@@ -166,6 +168,42 @@ class ThriftResultsHelper(BaseClientHelper):
                      trim_path_prefixes, description):
         pass
 
+    @ThriftClientCall
+    def beginStoreUpload(self):
+        pass
+
+    @ThriftClientCall
+    def getMissingStoreChunks(self, upload_token, chunk_hashes):
+        pass
+
+    def uploadStoreChunk(self, upload_token, chunk_hash, chunk):
+        """
+        Unlike the other API calls, the errors of the chunk upload are raised
+        to the caller, so the upload of the chunk can be tried again.
+        """
+        self.transport.open()
+        try:
+            try:
+                return self.client.uploadStoreChunk(upload_token, chunk_hash,
+                                                    chunk)
+            except TApplicationException as ex:
+                # The session may expire during a long upload.
+                if "Error code 401" not in ex.message:
+                    raise ex
+
+                self._reset_token()
+
+                return self.client.uploadStoreChunk(upload_token, chunk_hash,
+                                                    chunk)
+        finally:
+            self.transport.close()
+
+    @ThriftClientCall
+    def massStoreRunFromUpload(self, upload_token, chunk_hashes, name, tag,
+                               version, force, trim_path_prefixes,
+                               description):
+        pass
+
     @ThriftClientCall
     def allowsStoringAnalysisStatistics(self):
         pass
@@ -21,3 +21,4 @@ PKG_ROOT = os.path.join(REPO_ROOT, 'build', 'CodeChecker')
 
 sys.path.append(REPO_ROOT)
 sys.path.append(os.path.join(REPO_ROOT, 'web'))
+sys.path.append(os.path.join(REPO_ROOT, 'tools', 'codechecker_report_hash'))
@@ -0,0 +1,75 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+""" Test the cache of the content hashes of the stored source files. """
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from codechecker_client.cmd import store
+from codechecker_client.content_hash_cache import ContentHashCache
+
+
+class ContentHashCacheTest(unittest.TestCase):
+    """
+    Test computing the content hashes of the source files with the cache.
+    """
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = ContentHashCache(
+            os.path.join(self.test_dir, 'cache', 'hashes.sqlite'))
+
+        self.files = []
+        for i in range(3):
+            file_path = os.path.join(self.test_dir, 'file_{0}.cpp'.format(i))
+            with open(file_path, 'w') as f:
+                f.write('int f{0}() {{ return {0}; }}\n'.format(i))
+            self.files.append(file_path)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_cached_hashes(self):
+        """ Only the changed source files are hashed again. """
+        expected = {f: store.get_file_content_hash(f) for f in self.files}
+
+        self.assertEqual(
+            store.get_file_content_hashes(self.files, self.cache), expected)
+
+        with open(self.files[0], 'a') as f:
+            f.write('// changed\n')
+        expected[self.files[0]] = store.get_file_content_hash(self.files[0])
+
+        with mock.patch.object(store, 'get_file_content_hash',
+                               wraps=store.get_file_content_hash) as hasher:
+            self.assertEqual(
+                store.get_file_content_hashes(self.files, self.cache),
+                expected)
+            hasher.assert_called_once_with(self.files[0])
+
+    def test_missing_file(self):
+        """ The missing files have no content hash. """
+        missing_file = os.path.join(self.test_dir, 'missing.cpp')
+
+        hashes = store.get_file_content_hashes(
+            self.files + [missing_file], self.cache)
+        self.assertEqual(set(hashes), set(self.files))
+
+    def test_unusable_cache(self):
+        """ The content hashes are computed if the cache can not be used. """
+        cache = ContentHashCache(os.path.join(self.files[0], 'hashes.sqlite'))
+
+        hashes = store.get_file_content_hashes(self.files, cache)
+        self.assertEqual(hashes,
+                         {f: store.get_file_content_hash(f)
+                          for f in self.files})
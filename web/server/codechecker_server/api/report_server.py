@@ -11,12 +11,14 @@ Handle Thrift requests.
 
 
 import base64
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from datetime import datetime, timedelta
+import multiprocessing
 import os
 import re
 import shlex
 import tempfile
+import threading
 import time
 import zipfile
 import zlib
@@ -35,7 +37,7 @@ from codechecker_api.codeCheckerDBAccess_v6.ttypes import BugPathPos, \
 
 from codechecker_common import plist_parser, skiplist_handler
 from codechecker_common.source_code_comment_handler import \
-    SourceCodeCommentHandler, SpellException, contains_codechecker_comment
+    SpellException, get_source_code_comment_index
 from codechecker_common import util
 from codechecker_common.logger import get_logger
 from codechecker_report_hash.hash import get_report_path_hash
@@ -61,11 +63,19 @@ from .thrift_enum_helper import detection_status_enum, \
     report_extended_data_type_enum
 
 from . import store_handler
+from . import store_upload
 
 LOG = get_logger('server')
 
 GEN_OTHER_COMPONENT_NAME = "Other (auto-generated)"
 
+# Number of plist files which are worth preparing for the storage in a
+# separate process.
+PLIST_FILES_PER_PROCESS = 20
+
+# Number of prepared plist files per process which may wait for the storage.
+PREPARED_PLISTS_PER_PROCESS = 2
+
 
 class CommentKindValue(object):
     USER = 0
@@ -154,23 +164,268 @@ def parse_codechecker_review_comment(source_file_name,
                                      checker_name):
     """Parse the CodeChecker review comments from a source file at a given
     position.  Returns an empty list if there are no comments.
+
+    The source file is read once and the comments are looked up in its
+    review comment index.
     """
     src_comment_data = []
-    with open(source_file_name,
-              encoding='utf-8',
-              errors='ignore') as sf:
-        if contains_codechecker_comment(sf):
-            sc_handler = SourceCodeCommentHandler()
-            try:
-                src_comment_data = sc_handler.filter_source_line_comments(
-                    sf,
-                    report_line,
-                    checker_name)
-            except SpellException as ex:
-                LOG.warning(f"File {source_file_name} contains {ex}")
+    try:
+        comment_index = get_source_code_comment_index(source_file_name)
+
+        src_comment_data = comment_index.filter_source_line_comments(
+            report_line,
+            checker_name)
+    except SpellException as ex:
+        LOG.warning(f"File {source_file_name} contains {ex}")
     return src_comment_data
 
 
+def collect_checkers(checkers):
+    """
+    Returns the enabled and the disabled checkers of the analysis and the
+    analyzers of the checkers from the checkers of the metadata file.
+    """
+    enabled_checkers = set()
+    disabled_checkers = set()
+    checker_to_analyzer = dict()
+    for analyzer_name, analyzer_checkers in checkers.items():
+        if isinstance(analyzer_checkers, dict):
+            for checker_name, enabled in analyzer_checkers.items():
+                checker_to_analyzer[checker_name] = analyzer_name
+                if enabled:
+                    enabled_checkers.add(checker_name)
+                else:
+                    disabled_checkers.add(checker_name)
+        else:
+            enabled_checkers.update(analyzer_checkers)
+
+            for checker_name in analyzer_checkers:
+                checker_to_analyzer[checker_name] = analyzer_name
+
+    return enabled_checkers, disabled_checkers, checker_to_analyzer
+
+
+"""Report of a plist file which is prepared for the storage.
+
+bug_id: the report hash
+path_hash: the report path hash which identifies the duplicated reports
+file_id: the id of the source file of the report
+review_comments: the review comments of the report in the source file
+source_file: the name of the file of the last bug path event
+report_line: the line of the last bug path event
+"""
+PreparedReport = namedtuple('PreparedReport',
+                            ['bug_id', 'checker_name', 'path_hash', 'file_id',
+                             'main', 'bug_paths', 'bug_events',
+                             'bug_extended_data', 'analyzer_name',
+                             'review_comments', 'source_file',
+                             'report_line'])
+
+
+"""Prepared reports of a plist file.
+
+checker_names: the checkers of every report in the plist file
+reports: the prepared reports which are not skipped
+error: the reason why the reports of the plist file can not be stored
+"""
+PreparedPlist = namedtuple('PreparedPlist',
+                           ['checker_names', 'reports', 'error'])
+
+
+class PlistReportPreparer(object):
+    """
+    Parse the plist files of a storage and prepare their reports for the
+    storage. The database is not accessed, so the plist files can be
+    prepared in parallel before the storage transaction is started.
+    """
+
+    def __init__(self, report_dir, source_root, file_path_to_id,
+                 skip_handler, checker_to_analyzer, trim_path_prefixes):
+        self.report_dir = report_dir
+        self.source_root = source_root
+        self.file_path_to_id = file_path_to_id
+        self.skip_handler = skip_handler
+        self.checker_to_analyzer = checker_to_analyzer
+        self.trim_path_prefixes = trim_path_prefixes
+
+    def get_analyzer_name(self, report):
+        """ Get analyzer name for the given report. """
+        analyzer_name = self.checker_to_analyzer.get(report.check_name)
+        if analyzer_name:
+            return analyzer_name
+
+        if report.metadata:
+            return report.metadata.get("analyzer", {}).get("name")
+
+        if report.check_name.startswith('clang-diagnostic-'):
+            return 'clang-tidy'
+
+    def prepare(self, plist_file):
+        """
+        Parse the plist file of the report directory and prepare its reports.
+        """
+        LOG.debug("Parsing input file '%s'", plist_file)
+
+        try:
+            files, reports = plist_parser.parse_plist_file(
+                os.path.join(self.report_dir, plist_file))
+        except Exception as ex:
+            return PreparedPlist(set(), [],
+                                 'Parsing the plist failed: {0}'.format(ex))
+
+        trimmed_files = {}
+        file_ids = {}
+        if reports:
+            missing_ids_for_files = []
+
+            for k, v in files.items():
+                trimmed_files[k] = \
+                    util.trim_path_prefixes(v, self.trim_path_prefixes)
+
+            for file_name in trimmed_files.values():
+
+                file_id = self.file_path_to_id.get(file_name, -1)
+                if file_id == -1:
+                    missing_ids_for_files.append(file_name)
+                    continue
+
+                file_ids[file_name] = file_id
+
+            if missing_ids_for_files:
+                return PreparedPlist(
+                    set(), [], "Failed to get file path id for '{0}'!".format(
+                        ' '.join(missing_ids_for_files)))
+
+        checker_names = set()
+        prepared_reports = []
+        for report in reports:
+            checker_name = report.main['check_name']
+            checker_names.add(checker_name)
+
+            report.trim_path_prefixes(self.trim_path_prefixes)
+            source_file = report.file_path
+
+            if self.skip_handler.should_skip(source_file):
+                continue
+            bug_paths, bug_events, bug_extended_data = \
+                store_handler.collect_paths_events(report, file_ids,
+                                                   trimmed_files)
+            report_path_hash = get_report_path_hash(report)
+
+            last_report_event = report.bug_path[-1]
+
+            # The original file path is needed here not the trimmed
+            # because the source files are extracted as the original
+            # file path.
+            file_name = files[last_report_event['location']['file']]
+
+            source_file_name = os.path.realpath(
+                os.path.join(self.source_root, file_name.strip("/")))
+
+            report_line = last_report_event['location']['line']
+
+            # The review comments are read only from the source files of
+            # the zip file. The client sends every source file which has
+            # review comments at the reports.
+            review_comments = []
+            if os.path.isfile(source_file_name):
+                review_comments = \
+                    parse_codechecker_review_comment(source_file_name,
+                                                     report_line,
+                                                     checker_name)
+
+            prepared_reports.append(PreparedReport(
+                report.main['issue_hash_content_of_line_in_context'],
+                checker_name,
+                report_path_hash,
+                file_ids[source_file],
+                report.main,
+                bug_paths,
+                bug_events,
+                bug_extended_data,
+                self.get_analyzer_name(report),
+                review_comments,
+                os.path.basename(file_name),
+                report_line))
+
+        return PreparedPlist(checker_names, prepared_reports, None)
+
+
+# Preparer of the plist files in the worker processes.
+_PREPARER = None
+
+
+def _init_preparer(preparer):
+    """ Initialize the worker processes which prepare the plist files. """
+    global _PREPARER
+    _PREPARER = preparer
+
+
+def _prepare_plist_file(plist_file):
+    return _PREPARER.prepare(plist_file)
+
+
+def prepare_plist_reports(preparer, jobs=None, max_jobs=None):
+    """
+    Prepare the reports of the plist files in the report directory of the
+    preparer. The plist files are prepared by multiple processes if there
+    are enough plist files, but at most by max_jobs processes if it is given.
+    Yields the prepared plist files in the order of the plist files in the
+    report directory as soon as they are prepared, so only a few prepared
+    plist files are held in the memory at once.
+    """
+    _, _, report_files = next(os.walk(preparer.report_dir), ([], [], []))
+    plist_files = [f for f in report_files if f.endswith('.plist')]
+
+    if jobs is None:
+        jobs = min(multiprocessing.cpu_count(),
+                   len(plist_files) // PLIST_FILES_PER_PROCESS)
+
+        if max_jobs is not None:
+            jobs = min(jobs, max_jobs)
+
+    if jobs > 1:
+        # The plist files are passed to the worker processes only when there
+        # is room for their results, otherwise the prepared plist files would
+        # pile up while the earlier ones are stored.
+        window = threading.Semaphore(jobs * PREPARED_PLISTS_PER_PROCESS)
+
+        def plist_files_to_prepare():
+            for plist_file in plist_files:
+                window.acquire()
+                yield plist_file
+
+        # The server handles the requests in threads, so the worker processes
+        # are started by a fork server instead of forking this process.
+        context = multiprocessing.get_context('forkserver')
+        with context.Pool(jobs,
+                          initializer=_init_preparer,
+                          initargs=(preparer,)) as pool:
+            try:
+                prepared_plists = pool.imap(_prepare_plist_file,
+                                            plist_files_to_prepare())
+
+                for plist_file, prepared_plist in \
+                        zip(plist_files, prepared_plists):
+                    window.release()
+                    if prepared_plist.error:
+                        LOG.error("%s: %s", plist_file, prepared_plist.error)
+                    else:
+                        yield prepared_plist
+            finally:
+                # Let the task feeder of the pool finish if the storage is
+                # stopped before every plist file is prepared.
+                for _ in plist_files:
+                    window.release()
+    else:
+        for plist_file in plist_files:
+            prepared_plist = preparer.prepare(plist_file)
+            if prepared_plist.error:
+                LOG.error("%s: %s", plist_file, prepared_plist.error)
+            else:
+                yield prepared_plist
+
+
 def get_component_values(session, component_name):
     """
     Get component values by component names and returns a tuple where the
@@ -742,6 +997,22 @@ def get_comment_msg(comment):
     return message
 
 
+def extract_zip(zip_file, output_dir):
+    """
+    Extract the zip file object to the output directory. The function returns
+    the size of the zip file.
+    """
+    with zipfile.ZipFile(zip_file, 'r', allowZip64=True) as zipf:
+        try:
+            zipf.extractall(output_dir)
+            return os.stat(zip_file.name).st_size
+        except Exception:
+            LOG.error("Failed to extract received ZIP.")
+            import traceback
+            traceback.print_exc()
+            raise
+
+
 def unzip(b64zip, output_dir):
     """
     This function unzips the base64 encoded zip file. This zip is extracted
@@ -756,16 +1027,24 @@ def unzip(b64zip, output_dir):
                   zip_file.name, output_dir)
 
         zip_file.write(zlib.decompress(base64.b64decode(b64zip)))
-        with zipfile.ZipFile(zip_file, 'r', allowZip64=True) as zipf:
-            try:
-                zipf.extractall(output_dir)
-                return os.stat(zip_file.name).st_size
-            except Exception:
-                LOG.error("Failed to extract received ZIP.")
-                import traceback
-                traceback.print_exc()
-                raise
-    return 0
+        return extract_zip(zip_file, output_dir)
+
+
+def unzip_upload(store_upload, upload_token, chunk_hashes, output_dir):
+    """
+    This function assembles the zip file from the uploaded chunks of the
+    upload session and extracts it to the output directory. The function
+    returns the size of the assembled zip file.
+    """
+    if not chunk_hashes:
+        return 0
+
+    with tempfile.NamedTemporaryFile(suffix='.zip') as zip_file:
+        LOG.debug("Unzipping uploaded mass storage ZIP '%s' to '%s'...",
+                  zip_file.name, output_dir)
+
+        store_upload.assemble(upload_token, chunk_hashes, zip_file)
+        return extract_zip(zip_file, output_dir)
 
 
 def create_review_data(review_status):
@@ -2636,8 +2915,7 @@ class ThriftRequestHandler(object):
         Storing file contents from plist.
         """
 
-        file_path_to_id = {}
-
+        files = []
         for file_name, file_hash in filename_to_hash.items():
             source_file_name = os.path.join(source_root,
                                             file_name.strip("/"))
@@ -2650,36 +2928,31 @@ class ThriftRequestHandler(object):
                 # The file was not in the ZIP file, because we already
                 # have the content. Let's check if we already have a file
                 # record in the database or we need to add one.
-
                 LOG.debug('%s not found or already stored.', trimmed_file_path)
-                with DBSession(self.__Session) as session:
-                    fid = store_handler.addFileRecord(session,
-                                                      trimmed_file_path,
-                                                      file_hash)
-                if not fid:
-                    LOG.error("File ID for %s is not found in the DB with "
-                              "content hash %s. Missing from ZIP?",
-                              source_file_name, file_hash)
-                file_path_to_id[trimmed_file_path] = fid
-                LOG.debug("%d fileid found", fid)
-                continue
+                files.append((trimmed_file_path, None, file_hash))
+            else:
+                files.append((trimmed_file_path, source_file_name, file_hash))
 
-            with DBSession(self.__Session) as session:
-                file_path_to_id[trimmed_file_path] = \
-                    store_handler.addFileContent(session,
-                                                 trimmed_file_path,
-                                                 source_file_name,
-                                                 file_hash,
-                                                 None)
+        with DBSession(self.__Session) as session:
+            file_ids = store_handler.addFiles(session, files)
+
+        file_path_to_id = {}
+        for file_name, (trimmed_file_path, _, file_hash) in \
+                zip(filename_to_hash, files):
+            fid = file_ids.get((trimmed_file_path, file_hash))
+            if not fid:
+                LOG.error("File ID for %s is not found in the DB with "
+                          "content hash %s. Missing from ZIP?",
+                          file_name, file_hash)
+            file_path_to_id[trimmed_file_path] = fid
 
         return file_path_to_id
 
-    def __store_reports(self, session, report_dir, source_root, run_id,
-                        file_path_to_id, run_history_time, severity_map,
-                        wrong_src_code_comments, skip_handler,
-                        checkers, trim_path_prefixes):
+    def __store_reports(self, session, prepared_plists, run_id,
+                        run_history_time, severity_map,
+                        wrong_src_code_comments, checkers):
         """
-        Parse up and store the plist report files.
+        Store the prepared reports of the plist files.
         """
 
         all_reports = session.query(Report) \
@@ -2693,23 +2966,11 @@ class ThriftRequestHandler(object):
         already_added = set()
         new_bug_hashes = set()
 
-        # Get checker names which was enabled during the analysis.
-        enabled_checkers = set()
-        disabled_checkers = set()
-        checker_to_analyzer = dict()
-        for analyzer_name, analyzer_checkers in checkers.items():
-            if isinstance(analyzer_checkers, dict):
-                for checker_name, enabled in analyzer_checkers.items():
-                    checker_to_analyzer[checker_name] = analyzer_name
-                    if enabled:
-                        enabled_checkers.add(checker_name)
-                    else:
-                        disabled_checkers.add(checker_name)
-            else:
-                enabled_checkers.update(analyzer_checkers)
+        report_storage = store_handler.ReportBulkStorage(session,
+                                                         severity_map)
 
-                for checker_name in analyzer_checkers:
-                    checker_to_analyzer[checker_name] = analyzer_name
+        # Get checker names which was enabled during the analysis.
+        enabled_checkers, disabled_checkers, _ = collect_checkers(checkers)
 
         def checker_is_unavailable(checker_name):
             """
@@ -2724,80 +2985,21 @@ class ThriftRequestHandler(object):
             return not checker_name.startswith('clang-diagnostic-') and \
                 enabled_checkers and checker_name not in enabled_checkers
 
-        def get_analyzer_name(report):
-            """ Get analyzer name for the given report. """
-            analyzer_name = checker_to_analyzer.get(report.check_name)
-            if analyzer_name:
-                return analyzer_name
-
-            if report.metadata:
-                return report.metadata.get("analyzer", {}).get("name")
-
-            if report.check_name.startswith('clang-diagnostic-'):
-                return 'clang-tidy'
-
-        # Processing PList files.
-        _, _, report_files = next(os.walk(report_dir), ([], [], []))
         all_report_checkers = set()
-        for f in report_files:
-            if not f.endswith('.plist'):
-                continue
-
-            LOG.debug("Parsing input file '%s'", f)
-
-            try:
-                files, reports = plist_parser.parse_plist_file(
-                    os.path.join(report_dir, f))
-            except Exception as ex:
-                LOG.error('Parsing the plist failed: %s', str(ex))
-                continue
-            trimmed_files = {}
-            file_ids = {}
-            if reports:
-                missing_ids_for_files = []
-
-                for k, v in files.items():
-                    trimmed_files[k] = \
-                        util.trim_path_prefixes(v, trim_path_prefixes)
-
-                for file_name in trimmed_files.values():
-
-                    file_id = file_path_to_id.get(file_name, -1)
-                    if file_id == -1:
-                        missing_ids_for_files.append(file_name)
-                        continue
-
-                    file_ids[file_name] = file_id
-
-                if missing_ids_for_files:
-                    LOG.error("Failed to get file path id for '%s'!",
-                              ' '.join(missing_ids_for_files))
-                    continue
+        for prepared_plist in prepared_plists:
+            all_report_checkers.update(prepared_plist.checker_names)
 
             # Store report.
-            for report in reports:
-                checker_name = report.main['check_name']
-                all_report_checkers.add(checker_name)
-
-                report.trim_path_prefixes(trim_path_prefixes)
-                source_file = report.file_path
-
-                if skip_handler.should_skip(source_file):
-                    continue
-                bug_paths, bug_events, bug_extended_data = \
-                    store_handler.collect_paths_events(report, file_ids,
-                                                       trimmed_files)
-                report_path_hash = get_report_path_hash(report)
-                if report_path_hash in already_added:
+            for report in prepared_plist.reports:
+                if report.path_hash in already_added:
                     LOG.debug('Not storing report. Already added')
-                    LOG.debug(report)
+                    LOG.debug(report.main)
                     continue
 
                 LOG.debug("Storing check results to the database.")
 
                 LOG.debug("Storing report")
-                bug_id = report.main[
-                    'issue_hash_content_of_line_in_context']
+                bug_id = report.bug_id
 
                 detection_status = 'new'
                 detected_at = run_history_time
@@ -2809,67 +3011,49 @@ class ThriftRequestHandler(object):
                         if old_status == 'resolved' else 'unresolved'
                     detected_at = old_report.detected_at
 
-                analyzer_name = get_analyzer_name(report)
-                report_id = store_handler.addReport(
-                    session,
-                    run_id,
-                    file_ids[source_file],
-                    report.main,
-                    bug_paths,
-                    bug_events,
-                    bug_extended_data,
-                    detection_status,
-                    detected_at,
-                    severity_map,
-                    analyzer_name)
+                report_storage.add(run_id,
+                                   report.file_id,
+                                   report.main,
+                                   report.bug_paths,
+                                   report.bug_events,
+                                   report.bug_extended_data,
+                                   detection_status,
+                                   detected_at,
+                                   report.analyzer_name)
 
                 new_bug_hashes.add(bug_id)
-                already_added.add(report_path_hash)
-
-                last_report_event = report.bug_path[-1]
-
-                # The original file path is needed here not the trimmed
-                # because the source files are extracted as the original
-                # file path.
-                file_name = \
-                    files[last_report_event['location']['file']]
-
-                source_file_name = os.path.realpath(
-                    os.path.join(source_root, file_name.strip("/")))
-
-                if os.path.isfile(source_file_name):
-                    report_line = last_report_event['location']['line']
-                    source_file = os.path.basename(file_name)
-                    src_comment_data = \
-                        parse_codechecker_review_comment(source_file_name,
-                                                         report_line,
-                                                         checker_name)
-                    if len(src_comment_data) == 1:
-                        status = src_comment_data[0]['status']
-                        rw_status = ttypes.ReviewStatus.FALSE_POSITIVE
-                        if status == 'confirmed':
-                            rw_status = ttypes.ReviewStatus.CONFIRMED
-                        elif status == 'intentional':
-                            rw_status = ttypes.ReviewStatus.INTENTIONAL
-
-                        self._setReviewStatus(session,
-                                              bug_id,
-                                              rw_status,
-                                              src_comment_data[0]['message'],
-                                              run_history_time)
-                    elif len(src_comment_data) > 1:
-                        LOG.warning(
-                            "Multiple source code comment can be found "
-                            "for '%s' checker in '%s' at line %s. "
-                            "This bug will not be suppressed!",
-                            checker_name, source_file, report_line)
-
-                        wrong_src_code = "{0}|{1}|{2}".format(source_file,
-                                                              report_line,
-                                                              checker_name)
-                        wrong_src_code_comments.append(wrong_src_code)
-
-                LOG.debug("Storing done for report %d", report_id)
+                already_added.add(report.path_hash)
+
+                src_comment_data = report.review_comments
+                if len(src_comment_data) == 1:
+                    status = src_comment_data[0]['status']
+                    rw_status = ttypes.ReviewStatus.FALSE_POSITIVE
+                    if status == 'confirmed':
+                        rw_status = ttypes.ReviewStatus.CONFIRMED
+                    elif status == 'intentional':
+                        rw_status = ttypes.ReviewStatus.INTENTIONAL
+
+                    self._setReviewStatus(session,
+                                          bug_id,
+                                          rw_status,
+                                          src_comment_data[0]['message'],
+                                          run_history_time)
+                elif len(src_comment_data) > 1:
+                    LOG.warning(
+                        "Multiple source code comment can be found "
+                        "for '%s' checker in '%s' at line %s. "
+                        "This bug will not be suppressed!",
+                        report.checker_name, report.source_file,
+                        report.report_line)
+
+                    wrong_src_code = "{0}|{1}|{2}".format(
+                        report.source_file, report.report_line,
+                        report.checker_name)
+                    wrong_src_code_comments.append(wrong_src_code)
+
+                LOG.debug("Storing done for report %s", bug_id)
+
+        report_storage.flush()
 
         # If a checker was found in a plist file it can not be disabled so we
         # will remove these checkers from the disabled checkers list and add
@@ -3035,11 +3219,82 @@ class ThriftRequestHandler(object):
                                                    max_run_count,
                                                    remove_run_count))
 
+    def __get_store_upload(self):
+        """ Returns the handler of the upload sessions of the product. """
+        return store_upload.StoreUploadManager(
+            store_upload.get_upload_dir(self.__product.endpoint))
+
+    @exc_to_thrift_reqfail
+    @timeit
+    def beginStoreUpload(self):
+        self.__require_store()
+
+        upload_token = self.__get_store_upload().begin()
+        LOG.debug("Upload session '%s' started by '%s'.", upload_token,
+                  self.__get_username())
+
+        return upload_token
+
+    @exc_to_thrift_reqfail
+    @timeit
+    def getMissingStoreChunks(self, upload_token, chunk_hashes):
+        self.__require_store()
+
+        return self.__get_store_upload().get_missing_chunks(upload_token,
+                                                            chunk_hashes)
+
+    @exc_to_thrift_reqfail
+    @timeit
+    def uploadStoreChunk(self, upload_token, chunk_hash, b64chunk):
+        self.__require_store()
+
+        self.__get_store_upload().add_chunk(upload_token, chunk_hash,
+                                            b64chunk)
+        return True
+
+    @exc_to_thrift_reqfail
+    @timeit
+    def massStoreRunFromUpload(self, upload_token, chunk_hashes, name, tag,
+                               version, force, trim_path_prefixes,
+                               description):
+        self.__require_store()
+
+        upload = self.__get_store_upload()
+
+        # The upload session is kept if some chunks are missing, so the
+        # client can upload them and try to store the run again.
+        missing = upload.get_missing_chunks(upload_token, chunk_hashes)
+        if missing:
+            raise codechecker_api_shared.ttypes.RequestFailed(
+                codechecker_api_shared.ttypes.ErrorCode.GENERAL,
+                "{0} chunk(s) of the upload are missing, nothing was "
+                "stored.".format(len(missing)),
+                missing)
+
+        try:
+            return self.__mass_store_run(
+                name, tag, version, force, trim_path_prefixes, description,
+                lambda zip_dir: unzip_upload(upload, upload_token,
+                                             chunk_hashes, zip_dir))
+        finally:
+            upload.remove(upload_token)
+
     @exc_to_thrift_reqfail
     @timeit
     def massStoreRun(self, name, tag, version, b64zip, force,
                      trim_path_prefixes, description):
         self.__require_store()
+
+        return self.__mass_store_run(
+            name, tag, version, force, trim_path_prefixes, description,
+            lambda zip_dir: unzip(b64zip, zip_dir))
+
+    def __mass_store_run(self, name, tag, version, force, trim_path_prefixes,
+                         description, unzip_func):
+        """
+        Store the run of the zip file which is extracted to the storage
+        directory by the unzip_func function.
+        """
         start_time = time.time()
 
         user = self.__auth_session.user if self.__auth_session else None
@@ -3054,7 +3309,7 @@ class ThriftRequestHandler(object):
         try:
             with TemporaryDirectory() as zip_dir:
                 LOG.info("[%s] Unzip storage file...", name)
-                zip_size = unzip(b64zip, zip_dir)
+                zip_size = unzip_func(zip_dir)
                 LOG.info("[%s] Unzip storage file done.", name)
 
                 if zip_size == 0:
@@ -3097,12 +3352,22 @@ class ThriftRequestHandler(object):
                                                             trim_path_prefixes)
                 LOG.info("[%s] Store source files done.", name)
 
-                run_history_time = datetime.now()
-
                 metadata_parser = MetadataInfoParser()
                 check_commands, check_durations, cc_version, statistics, \
                     checkers = metadata_parser.get_metadata_info(metadata_file)
 
+                # The reports are parsed and prepared by worker processes
+                # and they are written to the database as they arrive.
+                _, _, checker_to_analyzer = collect_checkers(checkers)
+                preparer = PlistReportPreparer(report_dir,
+                                               source_root,
+                                               file_path_to_id,
+                                               skip_handler,
+                                               checker_to_analyzer,
+                                               trim_path_prefixes)
+
+                run_history_time = datetime.now()
+
                 command = ''
                 if len(check_commands) == 1:
                     command = list(check_commands)[0]
@@ -3168,17 +3433,16 @@ class ThriftRequestHandler(object):
                                                             description)
 
                             LOG.info("[%s] Store reports...", name)
+                            prepared_plists = prepare_plist_reports(
+                                preparer,
+                                max_jobs=self.__manager.get_parse_processes())
                             self.__store_reports(session,
-                                                 report_dir,
-                                                 source_root,
+                                                 prepared_plists,
                                                  run_id,
-                                                 file_path_to_id,
                                                  run_history_time,
                                                  self.__context.severity_map,
                                                  wrong_src_code_comments,
-                                                 skip_handler,
-                                                 checkers,
-                                                 trim_path_prefixes)
+                                                 checkers)
                             LOG.info("[%s] Store reports done.", name)
 
                             store_handler.setRunDuration(session,
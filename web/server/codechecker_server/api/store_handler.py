@@ -10,12 +10,14 @@ Helpers to store analysis reports.
 """
 
 import base64
+import concurrent.futures
 from datetime import datetime
 from hashlib import sha256
 import os
 import zlib
 
 import sqlalchemy
+from sqlalchemy.dialects import postgresql
 
 import codechecker_api_shared
 from codechecker_api.codeCheckerDBAccess_v6 import ttypes
@@ -31,6 +33,22 @@ from .thrift_enum_helper import report_extended_data_type_str
 
 LOG = get_logger('system')
 
+# Number of reports which are collected before they are written into the
+# database by ReportBulkStorage.
+BULK_REPORT_BATCH_SIZE = 10000
+
+# Number of rows which are inserted into a table with one statement.
+BULK_INSERT_CHUNK_SIZE = 10000
+
+# Maximum number of the bound parameters of a PostgreSQL statement.
+POSTGRESQL_MAX_PARAMETERS = 32767
+
+# Number of values in the IN clause of a query.
+IN_QUERY_CHUNK_SIZE = 500
+
+# Number of file contents which are compressed and inserted together.
+FILE_CONTENT_BATCH_SIZE = 100
+
 
 def metadata_info(metadata_file):
     check_commands = []
@@ -473,6 +491,170 @@ def addReport(session,
             str(ex))
 
 
+def allocate_report_ids(session, count):
+    """
+    Reserve the given number of new report ids and return them in increasing
+    order.
+
+    On PostgreSQL the ids are taken from the sequence of the report table. On
+    SQLite the ids following the largest report id are used. The run is
+    locked during the storage and the storage transaction already holds the
+    write lock of the SQLite database, so these ids can not be taken by an
+    other storage.
+    """
+    if session.get_bind().dialect.name == 'postgresql':
+        result = session.execute(
+            sqlalchemy.text("SELECT nextval('reports_id_seq') "
+                            "FROM generate_series(1, :count)"),
+            {'count': count})
+        return sorted(row[0] for row in result)
+
+    max_id = session.query(sqlalchemy.func.max(Report.id)).scalar() or 0
+    return list(range(max_id + 1, max_id + 1 + count))
+
+
+def bulk_insert(session, table, rows):
+    """
+    Insert the rows into the table in chunks. Every row is a dictionary with
+    the same column names.
+    """
+    if not rows:
+        return
+
+    if session.get_bind().dialect.name == 'postgresql':
+        # Multi-row INSERT statements save the round trip of every row. The
+        # number of the bound parameters of a statement is limited.
+        chunk_size = max(1, POSTGRESQL_MAX_PARAMETERS // len(rows[0]))
+        for i in range(0, len(rows), chunk_size):
+            session.execute(table.insert().values(rows[i:i + chunk_size]))
+    else:
+        for i in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            session.execute(table.insert(),
+                            rows[i:i + BULK_INSERT_CHUNK_SIZE])
+
+
+class ReportBulkStorage(object):
+    """
+    Collect the reports of a storage and insert them together with their bug
+    paths, events and extended data into the database in batches. The stored
+    rows are the same as the ones stored by addReport().
+    """
+
+    def __init__(self, session, severity_map,
+                 batch_size=BULK_REPORT_BATCH_SIZE):
+        self.__session = session
+        self.__severity_map = severity_map
+        self.__batch_size = batch_size
+        self.__reports = []
+
+    def add(self,
+            run_id,
+            file_id,
+            main_section,
+            bugpath,
+            events,
+            bug_extended_data,
+            detection_status,
+            detection_time,
+            analyzer_name=None):
+        """
+        Add a report to the current batch. The batch is written into the
+        database when it is full.
+        """
+        try:
+            checker_name = main_section['check_name']
+            severity_name = self.__severity_map.get(checker_name)
+            severity = ttypes.Severity._NAMES_TO_VALUES[severity_name]
+
+            report = {
+                'run_id': run_id,
+                'bug_id':
+                    main_section['issue_hash_content_of_line_in_context'],
+                'file_id': file_id,
+                'checker_message': main_section['description'],
+                'checker_id': checker_name or 'NOT FOUND',
+                'checker_cat': main_section['category'],
+                'bug_type': main_section['type'],
+                'line': main_section['location']['line'],
+                'column': main_section['location']['col'],
+                'severity': severity,
+                'detection_status': detection_status,
+                'detected_at': detection_time,
+                'fixed_at': None,
+                'path_length': len(events),
+                # The default value of the column is used by addReport() if
+                # the analyzer is unknown.
+                'analyzer_name': analyzer_name or 'unknown'}
+
+            extended_data = [
+                {'line_begin': data.startLine,
+                 'col_begin': data.startCol,
+                 'line_end': data.endLine,
+                 'col_end': data.endCol,
+                 'message': data.message,
+                 'file_id': data.fileId,
+                 'type': report_extended_data_type_str(data.type)}
+                for data in bug_extended_data]
+        except Exception as ex:
+            raise codechecker_api_shared.ttypes.RequestFailed(
+                codechecker_api_shared.ttypes.ErrorCode.GENERAL,
+                str(ex))
+
+        self.__reports.append((report, bugpath, events, extended_data))
+
+        if len(self.__reports) >= self.__batch_size:
+            self.flush()
+
+    def flush(self):
+        """ Write the reports of the current batch into the database. """
+        if not self.__reports:
+            return
+
+        report_ids = allocate_report_ids(self.__session, len(self.__reports))
+
+        reports = []
+        bug_path = []
+        bug_events = []
+        extended_data = []
+        for report_id, (report, bugpath, events, report_extended_data) in \
+                zip(report_ids, self.__reports):
+            report['id'] = report_id
+            reports.append(report)
+
+            for i, piece in enumerate(bugpath):
+                bug_path.append({'line_begin': piece.startLine,
+                                 'col_begin': piece.startCol,
+                                 'line_end': piece.endLine,
+                                 'col_end': piece.endCol,
+                                 'order': i,
+                                 'file_id': piece.fileId,
+                                 'report_id': report_id})
+
+            for i, event in enumerate(events):
+                bug_events.append({'line_begin': event.startLine,
+                                   'col_begin': event.startCol,
+                                   'line_end': event.endLine,
+                                   'col_end': event.endCol,
+                                   'order': i,
+                                   'msg': event.msg,
+                                   'file_id': event.fileId,
+                                   'report_id': report_id})
+
+            for data in report_extended_data:
+                data['report_id'] = report_id
+                extended_data.append(data)
+
+        LOG.debug("Storing %d reports.", len(reports))
+
+        bulk_insert(self.__session, Report.__table__, reports)
+        bulk_insert(self.__session, BugReportPoint.__table__, bug_path)
+        bulk_insert(self.__session, BugPathEvent.__table__, bug_events)
+        bulk_insert(self.__session, ExtendedReportData.__table__,
+                    extended_data)
+
+        self.__reports = []
+
+
 def changePathAndEvents(session, run_id, report_path_map):
     report_ids = list(report_path_map.keys())
 
@@ -597,3 +779,128 @@ def addFileRecord(session, filepath, content_hash):
                     File.filepath == filepath).one_or_none()
 
     return file_record.id if file_record else None
+
+
+def insert_or_ignore(session, table, rows):
+    """
+    Insert the rows into the table. The rows which violate a unique
+    constraint, because they were already inserted by an other transaction,
+    are ignored.
+    """
+    if not rows:
+        return
+
+    if session.get_bind().dialect.name == 'postgresql':
+        statement = postgresql.insert(table).on_conflict_do_nothing()
+    else:
+        statement = table.insert().prefix_with('OR IGNORE')
+
+    session.execute(statement, rows)
+
+
+def compress_file_content(source_file_name):
+    """ Returns the compressed content of the source file. """
+    return zlib.compress(get_file_content(source_file_name, None),
+                         zlib.Z_BEST_COMPRESSION)
+
+
+def get_stored_content_hashes(session, content_hashes):
+    """ Returns the given content hashes which are stored in the database. """
+    content_hashes = list(content_hashes)
+
+    stored = set()
+    for i in range(0, len(content_hashes), IN_QUERY_CHUNK_SIZE):
+        q = session.query(FileContent.content_hash) \
+            .filter(FileContent.content_hash.in_(
+                content_hashes[i:i + IN_QUERY_CHUNK_SIZE]))
+        stored.update(row.content_hash for row in q)
+
+    return stored
+
+
+def get_file_ids(session, file_records):
+    """
+    Returns the ids of the stored file records by the (filepath,
+    content_hash) pairs of the given file records.
+    """
+    file_paths = list({file_path for file_path, _ in file_records})
+
+    file_ids = {}
+    for i in range(0, len(file_paths), IN_QUERY_CHUNK_SIZE):
+        q = session.query(File.id, File.filepath, File.content_hash) \
+            .filter(File.filepath.in_(file_paths[i:i + IN_QUERY_CHUNK_SIZE]))
+        for file_id, file_path, content_hash in q:
+            if (file_path, content_hash) in file_records:
+                file_ids[(file_path, content_hash)] = file_id
+
+    return file_ids
+
+
+def addFiles(session, files, jobs=None):
+    """
+    Add the file contents and the file records of the given files which are
+    not stored in the database yet. This is the batch version of
+    addFileContent() and addFileRecord().
+
+    files -- A list of (filepath, source_file_name, content_hash) tuples.
+             source_file_name is the file which contains the content of the
+             file or None if the content has to be stored in the database
+             already.
+    jobs -- The number of threads which compress the file contents.
+
+    Returns the file record ids by the (filepath, content_hash) pairs. The
+    file records of the files without stored content are not added, so they
+    have no id.
+
+    Like the other functions which add files, this function must not be
+    called between addCheckerRun() and finishCheckerRun().
+    """
+    stored_hashes = get_stored_content_hashes(
+        session, {content_hash for _, _, content_hash in files})
+
+    # Contents which have to be added from the source files.
+    new_contents = {}
+    for _, source_file_name, content_hash in files:
+        if source_file_name and content_hash not in stored_hashes:
+            new_contents.setdefault(content_hash, source_file_name)
+
+    new_contents = list(new_contents.items())
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        for i in range(0, len(new_contents), FILE_CONTENT_BATCH_SIZE):
+            batch = new_contents[i:i + FILE_CONTENT_BATCH_SIZE]
+
+            # The GIL is released while zlib compresses the contents.
+            contents = executor.map(compress_file_content,
+                                    [f for _, f in batch])
+
+            insert_or_ignore(session, FileContent.__table__,
+                             [{'content_hash': content_hash,
+                               'content': content}
+                              for (content_hash, _), content
+                              in zip(batch, contents)])
+            session.commit()
+
+            stored_hashes.update(content_hash for content_hash, _ in batch)
+
+    # The file records are added in the order of the files.
+    file_records = dict.fromkeys((file_path, content_hash)
+                                 for file_path, _, content_hash in files
+                                 if content_hash in stored_hashes)
+
+    file_ids = get_file_ids(session, file_records)
+
+    new_records = [{'filepath': file_path,
+                    'filename': os.path.basename(file_path),
+                    'content_hash': content_hash}
+                   for file_path, content_hash in file_records
+                   if (file_path, content_hash) not in file_ids]
+
+    for i in range(0, len(new_records), BULK_INSERT_CHUNK_SIZE):
+        insert_or_ignore(session, File.__table__,
+                         new_records[i:i + BULK_INSERT_CHUNK_SIZE])
+    session.commit()
+
+    if new_records:
+        file_ids = get_file_ids(session, file_records)
+
+    return file_ids
@@ -0,0 +1,195 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+"""
+Chunked upload of the mass store ZIP files.
+
+The ZIP file of a store is uploaded in chunks. Every chunk of an upload
+session is written into the directory of the session, named after the sha256
+hash of its content. This way a chunk which failed to upload can be sent
+again alone, and the ZIP file is assembled on the disk without holding it in
+the memory.
+"""
+
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+import zlib
+
+from codechecker_common.logger import get_logger
+
+LOG = get_logger('server')
+
+# Maximum size of an uncompressed chunk.
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Upload sessions which have not been used for this many seconds are removed.
+UPLOAD_SESSION_EXPIRY = 24 * 60 * 60
+
+_TOKEN_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+_CHUNK_HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+def get_upload_dir(product_endpoint):
+    """
+    Returns the directory of the upload sessions of the given product. The
+    directory is shared by the worker processes of the server.
+    """
+    return os.path.join(tempfile.gettempdir(), 'codechecker_store_uploads',
+                        product_endpoint)
+
+
+class StoreUploadManager(object):
+    """
+    Handles the upload sessions of a product.
+    """
+
+    def __init__(self, upload_dir):
+        self.upload_dir = upload_dir
+
+    def __get_session_dir(self, upload_token):
+        """
+        Returns the directory of the upload session. Raise ValueError if the
+        upload session does not exist.
+        """
+        if not isinstance(upload_token, str) or \
+                not _TOKEN_PATTERN.match(upload_token):
+            raise ValueError("Invalid upload token: {0}".format(upload_token))
+
+        session_dir = os.path.join(self.upload_dir, upload_token)
+        if not os.path.isdir(session_dir):
+            raise ValueError("Upload session '{0}' does not exist or it has "
+                             "expired.".format(upload_token))
+
+        return session_dir
+
+    @staticmethod
+    def __check_chunk_hash(chunk_hash):
+        """ Raise ValueError if the chunk hash is not a sha256 hash. """
+        if not isinstance(chunk_hash, str) or \
+                not _CHUNK_HASH_PATTERN.match(chunk_hash):
+            raise ValueError("Invalid chunk hash: {0}".format(chunk_hash))
+
+    def __remove_expired_sessions(self):
+        """ Remove the upload sessions which were abandoned by the clients. """
+        try:
+            session_dirs = os.listdir(self.upload_dir)
+        except OSError:
+            return
+
+        expiry = time.time() - UPLOAD_SESSION_EXPIRY
+        for upload_token in session_dirs:
+            session_dir = os.path.join(self.upload_dir, upload_token)
+            try:
+                if os.stat(session_dir).st_mtime < expiry:
+                    LOG.debug("Removing expired upload session '%s'.",
+                              upload_token)
+                    shutil.rmtree(session_dir, ignore_errors=True)
+            except OSError:
+                pass
+
+    def begin(self):
+        """ Create a new upload session and return its token. """
+        self.__remove_expired_sessions()
+
+        upload_token = uuid.UUID(bytes=os.urandom(16)).hex
+        os.makedirs(os.path.join(self.upload_dir, upload_token))
+
+        return upload_token
+
+    def get_missing_chunks(self, upload_token, chunk_hashes):
+        """
+        Returns the hashes of the given chunks which have not been uploaded
+        to the upload session yet. Every hash is returned once in the order
+        of the given hashes.
+        """
+        session_dir = self.__get_session_dir(upload_token)
+
+        missing = []
+        for chunk_hash in dict.fromkeys(chunk_hashes):
+            self.__check_chunk_hash(chunk_hash)
+            if not os.path.isfile(os.path.join(session_dir, chunk_hash)):
+                missing.append(chunk_hash)
+
+        return missing
+
+    def add_chunk(self, upload_token, chunk_hash, b64chunk):
+        """
+        Write the base64 encoded, zlib compressed chunk to the upload session.
+        Raise ValueError if the content of the chunk does not match its hash.
+        """
+        session_dir = self.__get_session_dir(upload_token)
+        self.__check_chunk_hash(chunk_hash)
+
+        try:
+            decompressor = zlib.decompressobj()
+            chunk = decompressor.decompress(base64.b64decode(b64chunk),
+                                            MAX_CHUNK_SIZE)
+        except (binascii.Error, zlib.error) as ex:
+            raise ValueError("Failed to decode chunk '{0}': {1}".format(
+                chunk_hash, ex))
+
+        if decompressor.unconsumed_tail:
+            raise ValueError("Chunk '{0}' is larger than {1} bytes.".format(
+                chunk_hash, MAX_CHUNK_SIZE))
+
+        if hashlib.sha256(chunk).hexdigest() != chunk_hash:
+            raise ValueError("The content of chunk '{0}' does not match its "
+                             "hash.".format(chunk_hash))
+
+        # The chunk is renamed to its final name only when it is written
+        # completely, so a partially written chunk is never used.
+        fd, tmp_file = tempfile.mkstemp(suffix='.part', dir=session_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(chunk)
+            os.replace(tmp_file, os.path.join(session_dir, chunk_hash))
+        except OSError:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+
+        # Keep the session alive while the client is uploading.
+        os.utime(session_dir)
+
+    def assemble(self, upload_token, chunk_hashes, output):
+        """
+        Write the chunks of the upload session into the output file object in
+        the given order and return the number of the written bytes.
+        """
+        missing = self.get_missing_chunks(upload_token, chunk_hashes)
+        if missing:
+            raise ValueError("{0} chunk(s) of upload session '{1}' are "
+                             "missing.".format(len(missing), upload_token))
+
+        session_dir = self.__get_session_dir(upload_token)
+
+        size = 0
+        for chunk_hash in chunk_hashes:
+            with open(os.path.join(session_dir, chunk_hash), 'rb') as chunk:
+                shutil.copyfileobj(chunk, output)
+                size += chunk.tell()
+
+        output.flush()
+
+        return size
+
+    def remove(self, upload_token):
+        """ Remove the upload session with its chunks. """
+        try:
+            session_dir = self.__get_session_dir(upload_token)
+        except ValueError:
+            return
+
+        shutil.rmtree(session_dir, ignore_errors=True)
@@ -643,6 +643,13 @@ class SessionManager(object):
 
         return self.__store_config.get('analysis_statistics_dir')
 
+    def get_parse_processes(self):
+        """
+        Maximum number of processes which parse the report files of a
+        storage. If the value is None it means the number of CPUs.
+        """
+        return self.__store_config.get('parse_processes')
+
     def get_failure_zip_size(self):
         """
         Maximum size of the collected failed zips which can be store on the
@@ -0,0 +1,130 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+""" Test preparing the reports of the plist files for the storage. """
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from codechecker_common import plist_parser
+from codechecker_common.skiplist_handler import SkipListHandler
+
+from codechecker_server.api.report_server import PlistReportPreparer, \
+    prepare_plist_reports
+
+
+class PrepareReports(unittest.TestCase):
+    """
+    Test preparing the reports of the plist files.
+    """
+
+    def setUp(self):
+        plist_test_files = os.path.join(os.path.dirname(__file__),
+                                        'plist_test_files')
+
+        self.report_dir = tempfile.mkdtemp()
+        self.file_path_to_id = {}
+        for plist_file in os.listdir(plist_test_files):
+            if not plist_file.endswith('.plist'):
+                continue
+
+            plist_path = os.path.join(plist_test_files, plist_file)
+            files, _ = plist_parser.parse_plist_file(plist_path, False)
+            for file_path in files.values():
+                self.file_path_to_id.setdefault(file_path,
+                                                len(self.file_path_to_id))
+
+            for i in range(3):
+                shutil.copy(plist_path, os.path.join(
+                    self.report_dir, '{0}_{1}'.format(i, plist_file)))
+
+    def tearDown(self):
+        shutil.rmtree(self.report_dir)
+
+    def __get_preparer(self, file_path_to_id):
+        return PlistReportPreparer(self.report_dir, self.report_dir,
+                                   file_path_to_id, SkipListHandler(),
+                                   {'core.DivideZero': 'clangsa'}, None)
+
+    def test_parallel_prepare(self):
+        """ The same reports are prepared by multiple processes. """
+        preparer = self.__get_preparer(self.file_path_to_id)
+
+        prepared_plists = list(prepare_plist_reports(preparer, 1))
+        self.assertEqual(len(prepared_plists), 15)
+        self.assertTrue(any(p.reports for p in prepared_plists))
+
+        self.assertEqual(list(prepare_plist_reports(preparer, 2)),
+                         prepared_plists)
+
+        for prepared_plist in prepared_plists:
+            for report in prepared_plist.reports:
+                self.assertIn(report.checker_name,
+                              prepared_plist.checker_names)
+                self.assertIn(report.file_id,
+                              self.file_path_to_id.values())
+
+    def test_missing_file_id(self):
+        """ The plist files with unknown source files are not stored. """
+        preparer = self.__get_preparer({})
+
+        prepared_plists = list(prepare_plist_reports(preparer, 1))
+        self.assertEqual(len(prepared_plists), 3)
+        self.assertFalse(any(p.reports for p in prepared_plists))
+
+    def test_review_comments(self):
+        """ The review comments are read from the extracted source files. """
+        preparer = self.__get_preparer(self.file_path_to_id)
+
+        prepared_plist = next(p for p in prepare_plist_reports(preparer, 1)
+                              if p.reports)
+        report = prepared_plist.reports[0]
+        self.assertEqual(report.review_comments, [])
+
+        source_file = next(
+            f for f in self.file_path_to_id
+            if os.path.basename(f) == report.source_file)
+        source_path = os.path.join(self.report_dir, source_file.strip('/'))
+        os.makedirs(os.path.dirname(source_path), exist_ok=True)
+        with open(source_path, 'w', encoding='utf-8') as f:
+            f.write('\n' * (report.report_line - 2))
+            f.write('// codechecker_confirmed [all] real bug\n')
+
+        prepared_plist = next(p for p in prepare_plist_reports(preparer, 1)
+                              if p.reports)
+        review_comments = prepared_plist.reports[0].review_comments
+        self.assertEqual(len(review_comments), 1)
+        self.assertEqual(review_comments[0]['status'], 'confirmed')
+        self.assertEqual(review_comments[0]['message'], 'real bug')
+
+    def test_stop_parallel_prepare(self):
+        """ The worker processes are stopped with the storage. """
+        preparer = self.__get_preparer(self.file_path_to_id)
+
+        prepared_plists = prepare_plist_reports(preparer, 2)
+        self.assertEqual(next(prepared_plists),
+                         next(prepare_plist_reports(preparer, 1)))
+        prepared_plists.close()
+
+    def test_max_jobs(self):
+        """ The plist files are prepared by at most max_jobs processes. """
+        preparer = self.__get_preparer(self.file_path_to_id)
+
+        with mock.patch('multiprocessing.cpu_count', return_value=4), \
+                mock.patch('codechecker_server.api.report_server.'
+                           'PLIST_FILES_PER_PROCESS', 1), \
+                mock.patch('multiprocessing.get_context',
+                           side_effect=AssertionError):
+            prepared_plists = list(prepare_plist_reports(preparer,
+                                                         max_jobs=1))
+
+        self.assertEqual(prepared_plists,
+                         list(prepare_plist_reports(preparer, 1)))
@@ -15,7 +15,8 @@ import os
 import unittest
 
 from codechecker_common.source_code_comment_handler import \
-    SourceCodeCommentHandler
+    SourceCodeCommentHandler, SourceCodeCommentIndex, \
+    SourceCodeCommentIndexCache, SpellException
 
 
 class SourceCodeCommentTestCase(unittest.TestCase):
@@ -817,3 +818,45 @@ class SourceCodeCommentTestCase(unittest.TestCase):
                                                    bug_line,
                                                    'my.dummy')
         self.assertEqual(len(current_line_comments), 0)
+
+    def test_comment_index(self):
+        """
+        The source code comment index contains the same comments for every
+        line as the ones found by scanning the source file.
+        """
+        sc_handler = SourceCodeCommentHandler()
+
+        def get_comments(get):
+            try:
+                return get()
+            except SpellException as ex:
+                return str(ex)
+
+        for src_file in [self.__tmp_srcfile_1,
+                         self.__tmp_srcfile_2,
+                         self.__tmp_srcfile_3]:
+            index = SourceCodeCommentIndex.from_file(src_file)
+
+            src_file.seek(0)
+            line_count = len(src_file.readlines())
+            for bug_line in range(line_count + 2):
+                expected = get_comments(
+                    lambda: sc_handler.get_source_line_comments(src_file,
+                                                                bug_line))
+                self.assertEqual(get_comments(
+                    lambda: index.get_source_line_comments(bug_line)),
+                    expected)
+
+        self.assertTrue(SourceCodeCommentIndex.from_file(
+            self.__tmp_srcfile_1))
+        self.assertFalse(SourceCodeCommentIndex.from_file(
+            self.__tmp_srcfile_2))
+
+    def test_comment_index_cache(self):
+        """ The same content is indexed once. """
+        cache = SourceCodeCommentIndexCache()
+        file_path = os.path.join(self.__test_src_dir, 'test_file_1')
+
+        index = cache.get_index(file_path)
+        self.assertIs(cache.get_index(file_path), index)
+        self.assertEqual(len(index.filter_source_line_comments(16, 'all')), 1)
@@ -8,14 +8,23 @@
 """ Test Store handler features.  """
 
 
+from hashlib import sha256
+import datetime
 import os
+import shutil
+import tempfile
 import unittest
 
+import sqlalchemy
+from sqlalchemy.orm import sessionmaker
+
 from codechecker_api.codeCheckerDBAccess_v6 import ttypes
 
 from codechecker_common import plist_parser
 
 from codechecker_server.api import store_handler
+from codechecker_server.database.run_db_model import Base, BugPathEvent, \
+    BugReportPoint, ExtendedReportData, File, FileContent, Report, Run
 
 
 class StoreHandler(unittest.TestCase):
@@ -143,3 +152,186 @@ class StoreHandler(unittest.TestCase):
                                                              files)
         self.assertEqual(path, report3_path)
         self.assertEqual(events, report3_events)
+
+
+class StoreFiles(unittest.TestCase):
+    """
+    Test adding the source files of a storage in batch.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+
+        self.__files = []
+        for i in range(6):
+            content = 'int f{0}() {{ return 0; }}\n'.format(i % 4)
+            source_file = os.path.join(self.__tmp_dir, 'f{0}.c'.format(i))
+            with open(source_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+
+            content_hash = sha256(content.encode('utf-8')).hexdigest()
+            self.__files.append(('/src/f{0}.c'.format(i), source_file,
+                                 content_hash))
+
+        # The content of a file is already stored and the content of an other
+        # file is neither stored nor sent.
+        self.__files.append(('/src/g.c', None, self.__files[0][2]))
+        self.__files.append(('/src/missing.c', None, '0' * 64))
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmp_dir)
+
+    def __create_session(self):
+        engine = sqlalchemy.create_engine('sqlite://')
+
+        def set_sqlite_pragma(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+        sqlalchemy.event.listen(engine, 'connect', set_sqlite_pragma)
+
+        Base.metadata.create_all(engine)
+        return sessionmaker(bind=engine)()
+
+    def test_same_file_ids(self):
+        """ The same file records are added as one by one. """
+        session = self.__create_session()
+        expected = {}
+        for file_path, source_file, content_hash in self.__files:
+            if source_file:
+                file_id = store_handler.addFileContent(
+                    session, file_path, source_file, content_hash, None)
+            else:
+                file_id = store_handler.addFileRecord(
+                    session, file_path, content_hash)
+
+            if file_id:
+                expected[(file_path, content_hash)] = file_id
+
+        session = self.__create_session()
+        file_ids = store_handler.addFiles(session, self.__files)
+        self.assertEqual(file_ids, expected)
+
+        self.assertEqual(session.query(FileContent).count(), 4)
+
+        # Files which are already stored are not added again.
+        self.assertEqual(store_handler.addFiles(session, self.__files),
+                         expected)
+        self.assertEqual(session.query(File).count(), len(expected))
+
+
+class StoreReports(unittest.TestCase):
+    """
+    Test adding the reports of a storage in bulk.
+    """
+
+    SEVERITY_MAP = {'core.NullDereference': 'HIGH',
+                    'core.DivideZero': 'HIGH',
+                    'deadcode.DeadStores': 'LOW'}
+
+    def setUp(self):
+        self.__detected_at = datetime.datetime(2020, 1, 1)
+
+        checkers = sorted(self.SEVERITY_MAP)
+        self.__reports = []
+        for i in range(8):
+            line = 10 + i
+            checker_name = checkers[i % len(checkers)]
+            main = {'check_name': checker_name,
+                    'issue_hash_content_of_line_in_context': '%032x' % i,
+                    'description': 'Report {0}'.format(i),
+                    'category': 'Logic error',
+                    'type': checker_name,
+                    'location': {'line': line, 'col': 5, 'file': 0}}
+
+            bug_path = [ttypes.BugPathPos(line - d, 3, line - d, 9, 1)
+                        for d in range(i % 3 + 1)]
+            events = [ttypes.BugPathEvent(line - d, 5, line - d, 9,
+                                          'Event {0}'.format(d), 1)
+                      for d in range(i % 3 + 1)]
+            extended_data = [ttypes.ExtendedReportData(
+                ttypes.ExtendedReportDataType.NOTE, line, 1, line, 2,
+                'Note', 1)] if i % 2 else []
+
+            # The analyzer of some reports is unknown.
+            analyzer_name = 'clangsa' if i % 4 else None
+
+            self.__reports.append((main, bug_path, events, extended_data,
+                                   analyzer_name))
+
+    def __create_session(self):
+        engine = sqlalchemy.create_engine('sqlite://')
+
+        def set_sqlite_pragma(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+        sqlalchemy.event.listen(engine, 'connect', set_sqlite_pragma)
+
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+
+        session.add(FileContent('0' * 64, b''))
+        session.add(File('/src/main.c', '0' * 64))
+        session.add(Run('run', 'v6.40', 'CodeChecker analyze'))
+        session.flush()
+
+        return session
+
+    def __get_stored_rows(self, session):
+        """
+        Returns the stored rows of the reports. The ids of the reports are
+        replaced by their index.
+        """
+        report_ids = {}
+        reports = []
+        for report in session.query(Report).order_by(Report.id):
+            report_ids[report.id] = len(report_ids)
+            reports.append((
+                report.bug_id, report.file_id, report.run_id,
+                report.checker_message, report.checker_id,
+                report.checker_cat, report.bug_type, report.line,
+                report.column, report.severity, report.detection_status,
+                report.detected_at, report.path_length,
+                report.analyzer_name))
+
+        def positions(model, *columns):
+            return sorted(
+                (report_ids[row.report_id], row.file_id, row.line_begin,
+                 row.col_begin, row.line_end, row.col_end) +
+                tuple(getattr(row, c) for c in columns)
+                for row in session.query(model))
+
+        return {'reports': reports,
+                'bug_report_points': positions(BugReportPoint, 'order'),
+                'bug_path_events': positions(BugPathEvent, 'order', 'msg'),
+                'extended_report_data': positions(ExtendedReportData, 'type',
+                                                  'message')}
+
+    def test_same_rows(self):
+        """ The same rows are stored as by adding the reports one by one. """
+        session = self.__create_session()
+        for main, bug_path, events, extended_data, analyzer_name \
+                in self.__reports:
+            store_handler.addReport(session, 1, 1, main, bug_path, events,
+                                    extended_data, 'new',
+                                    self.__detected_at, self.SEVERITY_MAP,
+                                    analyzer_name)
+        session.flush()
+        expected = self.__get_stored_rows(session)
+
+        session = self.__create_session()
+        report_storage = store_handler.ReportBulkStorage(
+            session, self.SEVERITY_MAP, batch_size=3)
+        for main, bug_path, events, extended_data, analyzer_name \
+                in self.__reports:
+            report_storage.add(1, 1, main, bug_path, events, extended_data,
+                               'new', self.__detected_at, analyzer_name)
+        report_storage.flush()
+        stored = self.__get_stored_rows(session)
+
+        self.assertEqual(len(stored['reports']), len(self.__reports))
+        self.assertIn('unknown', [r[-1] for r in stored['reports']])
+        self.assertEqual(stored, expected)
@@ -0,0 +1,104 @@
+# -------------------------------------------------------------------------
+#
+#  Part of the CodeChecker project, under the Apache License v2.0 with
+#  LLVM Exceptions. See LICENSE for license information.
+#  SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# -------------------------------------------------------------------------
+""" Test the chunked upload of the mass store zip files. """
+
+
+import base64
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+
+from codechecker_server.api.store_upload import StoreUploadManager
+
+
+def encode_chunk(chunk):
+    return base64.b64encode(zlib.compress(chunk)).decode('utf-8')
+
+
+class StoreUpload(unittest.TestCase):
+    """
+    Test the upload sessions of the mass store zip files.
+    """
+
+    def setUp(self):
+        self.upload_dir = tempfile.mkdtemp()
+        self.upload = StoreUploadManager(self.upload_dir)
+
+        self.chunks = [os.urandom(1024), b'\0' * 1024, os.urandom(100)]
+        self.chunks.append(self.chunks[1])
+        self.chunk_hashes = [hashlib.sha256(c).hexdigest()
+                             for c in self.chunks]
+
+    def tearDown(self):
+        shutil.rmtree(self.upload_dir)
+
+    def test_upload(self):
+        """
+        The zip file is assembled from the chunks in order and only the
+        chunks which were not uploaded yet are missing.
+        """
+        token = self.upload.begin()
+
+        unique_hashes = self.chunk_hashes[:3]
+        self.assertEqual(
+            self.upload.get_missing_chunks(token, self.chunk_hashes),
+            unique_hashes)
+
+        self.upload.add_chunk(token, self.chunk_hashes[1],
+                              encode_chunk(self.chunks[1]))
+        self.assertEqual(
+            self.upload.get_missing_chunks(token, self.chunk_hashes),
+            [unique_hashes[0], unique_hashes[2]])
+
+        with self.assertRaises(ValueError):
+            self.upload.assemble(token, self.chunk_hashes, io.BytesIO())
+
+        for chunk_hash, chunk in zip(unique_hashes, self.chunks):
+            self.upload.add_chunk(token, chunk_hash, encode_chunk(chunk))
+
+        self.assertEqual(
+            self.upload.get_missing_chunks(token, self.chunk_hashes), [])
+
+        output = io.BytesIO()
+        size = self.upload.assemble(token, self.chunk_hashes, output)
+        self.assertEqual(output.getvalue(), b''.join(self.chunks))
+        self.assertEqual(size, len(output.getvalue()))
+
+        self.upload.remove(token)
+        with self.assertRaises(ValueError):
+            self.upload.get_missing_chunks(token, self.chunk_hashes)
+
+    def test_invalid_chunk(self):
+        """ Chunks which do not match their hash are rejected. """
+        token = self.upload.begin()
+
+        with self.assertRaises(ValueError):
+            self.upload.add_chunk(token, self.chunk_hashes[0],
+                                  encode_chunk(self.chunks[2]))
+
+        with self.assertRaises(ValueError):
+            self.upload.add_chunk(token, self.chunk_hashes[0], "not base64")
+
+        with self.assertRaises(ValueError):
+            self.upload.add_chunk(token, '../' + self.chunk_hashes[0],
+                                  encode_chunk(self.chunks[0]))
+
+        self.assertEqual(
+            self.upload.get_missing_chunks(token, self.chunk_hashes[:1]),
+            self.chunk_hashes[:1])
+
+    def test_invalid_token(self):
+        """ Only the existing upload sessions can be used. """
+        for token in ['0' * 32, '../' + self.upload.begin(), None]:
+            with self.assertRaises(ValueError):
+                self.upload.add_chunk(token, self.chunk_hashes[0],
+                                      encode_chunk(self.chunks[0]))